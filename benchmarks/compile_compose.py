@@ -0,0 +1,113 @@
+"""Benchmark compiling a large compose file into the local and launchable targets.
+
+Compares the single-parse pipeline of `devx sync` with parsing the compose file once
+per target through the pure-Python YAML classes, on a synthetic compose file of
+anchor-merged NIM services:
+
+    python benchmarks/compile_compose.py --services 1000
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+from devx import sync
+from devx.sync import dump_compose, read_compose_source, transform_launchable_compose, transform_local_compose
+
+IMAGE_URL = 'ghcr.io/nvidia/workshop'
+WORKSPACE_GROUP = 'GCP'
+NIM_SERVICE = """\
+  nim-base: &nim-base
+    image: nvcr.io/nim/meta/llama-3.1-8b-instruct:1.3.3
+    restart: always
+    shm_size: 16gb
+    environment:
+      - NGC_API_KEY=${NGC_API_KEY}
+      - NIM_LOW_MEMORY_MODE=1
+    volumes:
+      - nim-cache:/opt/nim/.cache
+    deploy:
+      resources:
+        reservations:
+          devices:
+            - driver: nvidia
+              count: 1
+              capabilities: [ gpu ]
+    networks:
+      - devx
+    profiles: [ "nim" ]
+"""
+
+
+def write_compose(path: Path, services: int) -> None:
+    """Write a compose file with the given number of anchor-merged NIM services."""
+    lines = ["services:", NIM_SERVICE]
+    for index in range(services):
+        lines.append(
+            f"  nim-{index}:\n    <<: *nim-base\n    hostname: nim-{index}\n    ports:\n      - \"{9000 + index}:8000\""
+        )
+    lines.append("volumes:\n  nim-cache: {}\nnetworks:\n  devx:\n    driver: bridge\n")
+    path.write_text("\n".join(lines), encoding='utf-8')
+
+
+def compile_single_parse(compose_path: Path, env_path: Path) -> tuple[str, str]:
+    """Compile both targets from one parse, as `devx sync` does."""
+    source = read_compose_source(compose_path, env_path)
+    local = dump_compose(transform_local_compose(source, 8888))
+    launchable = dump_compose(transform_launchable_compose(source, IMAGE_URL, WORKSPACE_GROUP))
+    return local, launchable
+
+
+def compile_per_target(compose_path: Path, env_path: Path) -> tuple[str, str]:
+    """Compile both targets with a parse per target and the pure-Python YAML classes."""
+    loader, dumper = sync.YAML_LOADER, sync.YAML_DUMPER
+    try:
+        sync.YAML_LOADER, sync.YAML_DUMPER = yaml.SafeLoader, yaml.Dumper
+        local = dump_compose(transform_local_compose(read_compose_source(compose_path, env_path), 8888))
+        launchable = dump_compose(
+            transform_launchable_compose(read_compose_source(compose_path, env_path), IMAGE_URL, WORKSPACE_GROUP)
+        )
+        return local, launchable
+    finally:
+        sync.YAML_LOADER, sync.YAML_DUMPER = loader, dumper
+
+
+def best_of(repeat: int, function, *args) -> float:
+    """Run a function repeatedly and return its fastest time in seconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    """Run the benchmark and print the timings."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--services', type=int, default=1000, help="number of NIM services in the compose file")
+    parser.add_argument('--repeat', type=int, default=5, help="number of runs, the fastest is reported")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        compose_path, env_path = Path(tmp, 'compose.yaml'), Path(tmp, 'variables.env')
+        write_compose(compose_path, args.services)
+        env_path.write_text("RUNTIME_VAR=5\n", encoding='utf-8')
+
+        if compile_single_parse(compose_path, env_path) != compile_per_target(compose_path, env_path):
+            raise SystemExit("❌ The single-parse pipeline compiled a different compose file")
+
+        lines = len(compose_path.read_text(encoding='utf-8').splitlines())
+        per_target = best_of(args.repeat, compile_per_target, compose_path, env_path)
+        single_parse = best_of(args.repeat, compile_single_parse, compose_path, env_path)
+
+    print(f"📋 {args.services} services, {lines} lines, libyaml {'on' if yaml.__with_libyaml__ else 'off'}")
+    print(f"   parse per target: {per_target:.3f}s")
+    print(f"   single parse:     {single_parse:.3f}s ({per_target / single_parse:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+"""Brev API client.
+
+The client keeps a pooled HTTP session for the life of the process and retries
+rate limited (429) and server side (5xx) failures with exponential backoff. The API
+location can be overridden with the `DEVX_BREV_API_URL` environment variable, which
+is useful for pointing devx at a local stand-in server.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, NamedTuple, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+BREV_API_URL = os.environ.get(
+    "DEVX_BREV_API_URL", "https://brevapi2.us-west-2-prod.control-plane.brev.dev/api"
+)
+BREV_CONFIG_DIR = Path.home() / ".brev"
+USER_AGENT = "devx-cli"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class BrevAPIError(RuntimeError):
+    """An error returned by, or while talking to, the Brev API.
+
+    Attributes:
+        status: The HTTP status code, or None if no response was received.
+        method: The HTTP method of the failed request.
+        path: The API path of the failed request.
+        body: The decoded response body, if any.
+    """
+
+    def __init__(
+        self, message: str, status: Optional[int] = None, method: str = "", path: str = "", body: Any = None
+    ):
+        super().__init__(message)
+        self.status = status
+        self.method = method
+        self.path = path
+        self.body = body
+
+    def __str__(self) -> str:
+        status = f" (HTTP {self.status})" if self.status else ""
+        return f"{self.method} {self.path} failed{status}: {super().__str__()}"
+
+
+class RateLimiter:
+    """Spaces out calls so that at most `rate` happen per second, across threads.
+
+    Attributes:
+        rate: The maximum number of calls per second. None or 0 disables the limit.
+    """
+
+    def __init__(self, rate: Optional[float] = None):
+        self.rate = rate
+        self._interval = 1 / rate if rate else 0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        """Block until the next call is allowed."""
+        if not self._interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            delay = max(0.0, self._next - now)
+            self._next = max(now, self._next) + self._interval
+        if delay:
+            time.sleep(delay)
+
+
+class BrevCredentials(NamedTuple):
+    """The credentials and active organization of the local Brev CLI login.
+
+    Attributes:
+        access_token: The Brev API access token.
+        org_id: The ID of the active organization.
+        org_name: The name of the active organization, if known.
+    """
+    access_token: str
+    org_id: str
+    org_name: Optional[str] = None
+
+
+@functools.cache
+def load_credentials(brev_dir: Path = BREV_CONFIG_DIR) -> BrevCredentials:
+    """Read the Brev CLI credentials and active organization once per process.
+
+    Args:
+        brev_dir: The Brev CLI configuration directory.
+
+    Returns:
+        The Brev credentials.
+
+    Raises:
+        BrevAPIError: If the Brev CLI is not logged in.
+    """
+    try:
+        with open(brev_dir / "credentials.json", encoding="utf-8") as f:
+            access_token = json.load(f)["access_token"]
+        with open(brev_dir / "active_org.json", encoding="utf-8") as f:
+            org = json.load(f)
+    except (OSError, KeyError, json.JSONDecodeError) as e:
+        raise BrevAPIError(f"Could not read Brev credentials from {brev_dir}, run `brev login`: {e}") from e
+
+    return BrevCredentials(access_token, org["id"], org.get("name"))
+
+
+class BrevClient:
+    """A pooled, retrying client for the Brev API.
+
+    The client is safe to share between threads. Requests from all threads count
+    towards the same optional rate limit.
+
+    Attributes:
+        base_url: The root URL of the Brev API.
+        org_id: The organization requests are made for.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        access_token: str,
+        org_id: str,
+        base_url: str = BREV_API_URL,
+        timeout: float = 10,
+        max_retries: int = 4,
+        backoff: float = 0.5,
+        pool_size: int = 10,
+        rate_limit: Optional[float] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.org_id = org_id
+        self._timeout = timeout
+        self._max_retries = max_retries
+        self._backoff = backoff
+        self._limiter = RateLimiter(rate_limit)
+        self._session = requests.Session()
+        self._session.headers.update({
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/json",
+            "User-Agent": USER_AGENT,
+        })
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    @classmethod
+    def from_credentials(cls, credentials: Optional[BrevCredentials] = None, **kwargs) -> "BrevClient":
+        """Create a client from the local Brev CLI login.
+
+        Args:
+            credentials: The credentials to use. Defaults to the Brev CLI login.
+            **kwargs: Additional arguments for the client.
+
+        Returns:
+            The Brev client.
+        """
+        credentials = credentials or load_credentials()
+        return cls(credentials.access_token, credentials.org_id, **kwargs)
+
+    def __enter__(self) -> "BrevClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the pooled connections."""
+        self._session.close()
+
+    def _retry_delay(self, attempt: int, response: Optional[requests.Response]) -> float:
+        """Get the delay before the next attempt, honoring Retry-After when it is given."""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return float(retry_after)
+        return self._backoff * (2 ** attempt)
+
+    def request(self, method: str, path: str, **kwargs) -> Any:
+        """Make an API request, retrying rate limited and server errors.
+
+        Args:
+            method: The HTTP method.
+            path: The API path, relative to the base URL.
+            **kwargs: Additional arguments for `requests.Session.request`.
+
+        Returns:
+            The decoded JSON response body, or None for empty responses.
+
+        Raises:
+            BrevAPIError: If the request fails.
+        """
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        params = {"utm_source": USER_AGENT, **kwargs.pop("params", {})}
+
+        for attempt in range(self._max_retries + 1):
+            response = None
+            self._limiter.wait()
+            try:
+                response = self._session.request(method, url, params=params, timeout=self._timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self._max_retries:
+                    raise BrevAPIError(str(e), method=method, path=path) from e
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == self._max_retries:
+                    break
+            time.sleep(self._retry_delay(attempt, response))
+
+        try:
+            body = response.json() if response.content else None
+        except ValueError:
+            body = response.text
+
+        if not response.ok:
+            message = body.get("message", response.reason) if isinstance(body, dict) else (body or response.reason)
+            raise BrevAPIError(str(message), status=response.status_code, method=method, path=path, body=body)
+        return body
+
+    def create_launchable(self, payload: dict) -> dict:
+        """Create a launchable.
+
+        Args:
+            payload: The launchable definition.
+
+        Returns:
+            The created launchable.
+        """
+        return self.request("POST", f"organizations/{self.org_id}/v2/launchables", json=payload)
+
+    def list_launchables(self) -> list[dict]:
+        """List the launchables of the organization.
+
+        Returns:
+            The launchables.
+        """
+        body = self.request("GET", f"organizations/{self.org_id}/v2/launchables")
+        if isinstance(body, dict):
+            body = body.get("items") or body.get("launchables") or []
+        return body or []
+
+    def update_launchable(self, launchable_id: str, payload: dict) -> dict:
+        """Update an existing launchable.
+
+        Args:
+            launchable_id: The ID of the launchable.
+            payload: The new launchable definition.
+
+        Returns:
+            The updated launchable.
+        """
+        return self.request("PATCH", f"organizations/{self.org_id}/v2/launchables/{launchable_id}", json=payload)
+
+    def list_workspaces(self) -> list[dict]:
+        """List every workspace of the organization, following pagination.
+
+        Returns:
+            The workspaces.
+        """
+        workspaces: list[dict] = []
+        params: dict = {}
+        while True:
+            body = self.request("GET", f"organizations/{self.org_id}/workspaces", params=params)
+            if not isinstance(body, dict):
+                return workspaces + (body or [])
+            workspaces += body.get("items") or body.get("workspaces") or []
+            if not body.get("nextPageToken"):
+                return workspaces
+            params = {"pageToken": body["nextPageToken"]}
+
+    def get_workspace(self, workspace_id: str) -> dict:
+        """Get a workspace."""
+        return self.request("GET", f"workspaces/{workspace_id}")
+
+    def start_workspace(self, workspace_id: str) -> dict:
+        """Start a stopped workspace."""
+        return self.request("PUT", f"workspaces/{workspace_id}/start")
+
+    def stop_workspace(self, workspace_id: str) -> dict:
+        """Stop a running workspace."""
+        return self.request("PUT", f"workspaces/{workspace_id}/stop")
+
+    def delete_workspace(self, workspace_id: str) -> dict:
+        """Delete a workspace."""
+        return self.request("DELETE", f"workspaces/{workspace_id}")
+
+    def launchables_url(self) -> str:
+        """Get the URL of the launchables endpoint for the organization."""
+        return f"{self.base_url}/organizations/{self.org_id}/v2/launchables?utm_source={USER_AGENT}"
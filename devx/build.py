@@ -0,0 +1,393 @@
+"""Workshop image build fingerprint.
+
+`docker compose up --build` sends the whole build context to the Docker engine on every
+start. Instead, the files the Dockerfile actually copies into the image, or binds into
+a build step with `RUN --mount=type=bind`, are fingerprinted, and the image is only
+rebuilt when that fingerprint, the build arguments or the built image change.
+
+Files copied by the Dockerfile are fingerprinted by size and modification time, so
+large datasets are not read on every start. The Dockerfile and the files every
+workshop copies are fingerprinted by content.
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+
+from devx.constants import DEVX_DIR, TARGET_LOCAL_FILE, WHEELHOUSE_DIR
+from devx.docker import DockerError, compose_project_name, image_id
+from devx.hashing import hash_file
+
+BUILD_STATE_FILE = DEVX_DIR / 'build.json'
+BUILD_STATE_VERSION = 1
+DOCKERFILE = Path('Dockerfile')
+DOCKERIGNORE = Path('.dockerignore')
+BUILD_SERVICE = 'devx'
+CONTENT_INPUTS = [DOCKERFILE, DOCKERIGNORE, Path('pyproject.toml'), DEVX_DIR / 'jp_app_launcher.yaml']
+MAX_REPORTED_FILES = 5
+# where the devx service mounts the project root
+CONTAINER_PROJECT_DIR = '/project'
+
+
+def _glob_regex(pattern: str) -> re.Pattern:
+    """Translate a .dockerignore pattern to a regular expression."""
+    regex = ''
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            regex += '(.*/)?'
+            i += 3
+        elif pattern.startswith('**', i):
+            regex += '.*'
+            i += 2
+        elif pattern[i] == '*':
+            regex += '[^/]*'
+            i += 1
+        elif pattern[i] == '?':
+            regex += '[^/]'
+            i += 1
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+    return re.compile(f'^{regex}$')
+
+
+def _dockerignore_rules() -> list[tuple[re.Pattern, bool]]:
+    """Parse .dockerignore into (pattern, is_exception) rules."""
+    try:
+        lines = DOCKERIGNORE.read_text(encoding='utf-8').splitlines()
+    except FileNotFoundError:
+        return []
+
+    rules = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        exception = line.startswith('!')
+        pattern = os.path.normpath(line.lstrip('!').strip()).lstrip('/')
+        rules.append((_glob_regex(pattern), exception))
+    return rules
+
+
+def _is_ignored(path: str, rules: list[tuple[re.Pattern, bool]]) -> bool:
+    """Check whether .dockerignore excludes a path. The last matching rule wins."""
+    parts = path.split('/')
+    candidates = ['/'.join(parts[:i]) for i in range(1, len(parts) + 1)]
+    ignored = False
+    for regex, exception in rules:
+        if any(regex.match(candidate) for candidate in candidates):
+            ignored = not exception
+    return ignored
+
+
+def _dockerfile_instructions(text: str) -> list[list[str]]:
+    """Split a Dockerfile into instructions, joining continuation lines."""
+    instructions = []
+    current = ''
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not current and (not stripped or stripped.startswith('#')):
+            continue
+        if stripped.endswith('\\'):
+            current += stripped[:-1] + ' '
+            continue
+        current += stripped
+
+        # flags come first, followed by either JSON or whitespace separated arguments
+        words = current.split(None, 1)
+        instruction, rest = words[0], words[1] if len(words) > 1 else ''
+        flags = []
+        while rest.startswith('--'):
+            flag, _, rest = rest.partition(' ')
+            flags.append(flag)
+            rest = rest.strip()
+        try:
+            args = json.loads(rest) if rest.startswith('[') else rest.split()
+        except ValueError:
+            args = rest.split()
+        instructions.append([instruction, *flags, *args])
+        current = ''
+    return instructions
+
+
+def _bind_mount_sources(flags: list[str]) -> list[str]:
+    """Get the build context paths that the `--mount` flags of a RUN instruction bind."""
+    sources = []
+    for flag in flags:
+        if not flag.startswith('--mount='):
+            continue
+        options = dict(option.partition('=')[::2] for option in flag.removeprefix('--mount=').split(','))
+        # bind mounts from other stages or images are not part of the context
+        if options.get('type', 'bind') != 'bind' or 'from' in options:
+            continue
+        source = options.get('source') or options.get('src') or '.'
+        sources.append('.' if '$' in source else source)
+    return sources
+
+
+def copy_sources() -> list[str]:
+    """Get the build context paths the Dockerfile copies into the image or binds into a build step.
+
+    Returns:
+        The source paths of every COPY and ADD instruction and of every bind mount of a
+        RUN instruction, relative to the build context. Copies and mounts from other
+        stages or images are skipped, and remote ADD sources are returned as URLs.
+    """
+    try:
+        text = DOCKERFILE.read_text(encoding='utf-8')
+    except FileNotFoundError:
+        return []
+
+    sources = []
+    for instruction in _dockerfile_instructions(text):
+        if not instruction:
+            continue
+        if instruction[0].upper() == 'RUN':
+            sources += _bind_mount_sources(instruction[1:])
+            continue
+        if instruction[0].upper() not in ('COPY', 'ADD'):
+            continue
+        args = instruction[1:]
+        if any(arg.startswith('--from') for arg in args):
+            continue
+        args = [arg for arg in args if not arg.startswith('--')]
+        # a source that uses build arguments cannot be resolved here, so fingerprint the whole context
+        sources += ['.' if '$' in arg else arg for arg in args[:-1]]
+    return sources
+
+
+def base_images() -> list[str]:
+    """Get the images the Dockerfile builds from.
+
+    Returns:
+        The image of every FROM instruction, skipping earlier build stages, `scratch`
+        and images chosen by build arguments.
+    """
+    try:
+        text = DOCKERFILE.read_text(encoding='utf-8')
+    except FileNotFoundError:
+        return []
+
+    images = []
+    stages = {'scratch'}
+    for instruction in _dockerfile_instructions(text):
+        if not instruction or instruction[0].upper() != 'FROM':
+            continue
+        args = [arg for arg in instruction[1:] if not arg.startswith('--')]
+        if not args:
+            continue
+        if args[0].lower() not in stages and '$' not in args[0] and args[0] not in images:
+            images.append(args[0])
+        if len(args) >= 3 and args[1].upper() == 'AS':
+            stages.add(args[2].lower())
+    return images
+
+
+def _context_files(sources: list[str]) -> dict[str, str]:
+    """Fingerprint the build context files matched by the COPY, ADD and bind mount sources.
+
+    Returns:
+        Mapping of each file path to its size and modification time.
+    """
+    rules = _dockerignore_rules()
+    files = {}
+
+    def add(path: Path) -> None:
+        name = path.as_posix()
+        if name in files or _is_ignored(name, rules):
+            return
+        try:
+            stat = path.stat()
+        except OSError:
+            return
+        files[name] = f"{stat.st_size}:{stat.st_mtime_ns}"
+
+    for source in sources:
+        if '://' in source:
+            files[source] = 'remote'
+            continue
+        source = os.path.normpath(source).lstrip('/')
+        paths = Path('.').glob(source) if any(c in source for c in '*?[') else [Path(source)]
+        for path in paths:
+            if not path.is_dir():
+                add(path)
+                continue
+            for root, dirs, names in os.walk(path):
+                root_path = Path(root)
+                # exception rules may re-include files below an ignored directory
+                if not any(exception for _, exception in rules):
+                    dirs[:] = [d for d in dirs if not _is_ignored((root_path / d).as_posix(), rules)]
+                for name in names:
+                    add(root_path / name)
+    return files
+
+
+def fingerprint() -> dict:
+    """Fingerprint the inputs of the workshop image build.
+
+    Returns:
+        The content hashes of the Dockerfile and the files every workshop copies, the
+        build arguments, and the size and modification time of every other copied file.
+    """
+    content_inputs = {path.as_posix() for path in CONTENT_INPUTS}
+    return {
+        "inputs": {path.as_posix(): hash_file(path) for path in CONTENT_INPUTS},
+        "build_args": {"USER_UID": os.getuid(), "USER_GID": os.getgid()},
+        "files": {
+            path: signature for path, signature in _context_files(copy_sources()).items()
+            if path not in content_inputs
+        },
+    }
+
+
+def _load_build_state() -> dict:
+    """Load the record of the last build, or an empty record if there is none."""
+    try:
+        with open(BUILD_STATE_FILE, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return state if state.get('version') == BUILD_STATE_VERSION else {}
+
+
+def _image_name(state: dict) -> str:
+    """Get the name compose gives the built workshop image."""
+    return state.get('image') or f"{compose_project_name(TARGET_LOCAL_FILE)}-{BUILD_SERVICE}"
+
+
+def built_image() -> str:
+    """Get the name of the built workshop image.
+
+    Raises:
+        DockerError: If no build was recorded and the compose project name cannot be read.
+    """
+    return _image_name(_load_build_state())
+
+
+def rebuild_reasons(force: bool = False) -> list[str]:
+    """Explain why the workshop image needs to be rebuilt.
+
+    Args:
+        force: Whether a rebuild was requested regardless of the fingerprint.
+
+    Returns:
+        A list of human readable reasons. Empty if the image is up to date.
+
+    Raises:
+        DockerError: If Docker cannot be reached.
+    """
+    if force:
+        return ["rebuild requested"]
+
+    state = _load_build_state()
+    if not state:
+        return ["no previous build recorded"]
+
+    current_id = image_id(_image_name(state))
+    if current_id is None:
+        return [f"image {state['image']} not found"]
+    if current_id != state.get('image_id'):
+        return [f"image {state['image']} was rebuilt outside devx"]
+
+    current = fingerprint()
+    reasons = [
+        f"{name} changed" for name, digest in current['inputs'].items()
+        if state['fingerprint']['inputs'].get(name) != digest
+    ]
+    if current['build_args'] != state['fingerprint']['build_args']:
+        reasons.append("build arguments changed")
+
+    recorded_files = state['fingerprint']['files']
+    changed = sorted(
+        name for name in current['files'].keys() | recorded_files.keys()
+        if current['files'].get(name) != recorded_files.get(name)
+    )
+    reasons += [f"{name} changed" for name in changed[:MAX_REPORTED_FILES]]
+    if len(changed) > MAX_REPORTED_FILES:
+        reasons.append(f"{len(changed) - MAX_REPORTED_FILES} more copied files changed")
+    return reasons
+
+
+def record_build() -> None:
+    """Record the fingerprint of the image that was just built."""
+    state = _load_build_state()
+    try:
+        image = _image_name(state)
+        built_id = image_id(image)
+    except DockerError:
+        return
+    if built_id is None or not DEVX_DIR.is_dir():
+        return
+
+    with open(BUILD_STATE_FILE, 'w', encoding='utf-8') as f:
+        json.dump({
+            "version": BUILD_STATE_VERSION,
+            "image": image,
+            "image_id": built_id,
+            "fingerprint": fingerprint(),
+        }, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def write_cache_override(path: Path, cache_from: list[str], cache_to: list[str]) -> None:
+    """Write a compose override file that adds BuildKit cache settings to the build.
+
+    Args:
+        path: Path of the override file.
+        cache_from: BuildKit cache sources.
+        cache_to: BuildKit cache destinations.
+    """
+    # imported here to keep the compose dependencies out of the start up path
+    from devx.sync import resolve_build_cache  # pylint: disable=import-outside-toplevel
+
+    build = {}
+    if cache_from:
+        build['cache_from'] = resolve_build_cache(cache_from)
+    if cache_to:
+        build['cache_to'] = resolve_build_cache(cache_to)
+    # JSON is valid YAML
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"services": {BUILD_SERVICE: {"build": build}}}, f, indent=2)
+
+
+def project_dependencies(pyproject: Path = Path('pyproject.toml')) -> list[str]:
+    """Read the `[project]` dependencies of the workshop.
+
+    Args:
+        pyproject: The workshop's pyproject.toml.
+
+    Returns:
+        The dependency specifiers, or an empty list if there are none.
+    """
+    try:
+        import tomllib  # pylint: disable=import-outside-toplevel
+    except ModuleNotFoundError:  # Python < 3.11
+        import tomli as tomllib  # pylint: disable=import-outside-toplevel
+
+    try:
+        with open(pyproject, 'rb') as f:
+            return list((tomllib.load(f).get('project') or {}).get('dependencies') or [])
+    except FileNotFoundError:
+        return []
+
+
+def wheelhouse_command(dependencies: list[str]) -> list[str]:
+    """Get the command that collects the image's Python dependencies into the wheelhouse.
+
+    The wheels are built inside the workshop image, so they match its platform and
+    Python version, and written to `.devx/wheelhouse` through the project mount. Only
+    the dependencies are collected, not a wheel of the workshop project itself.
+
+    Args:
+        dependencies: The dependency specifiers to collect, with their own dependencies.
+
+    Returns:
+        The docker compose command.
+    """
+    return [
+        'docker', 'compose', '-f', str(TARGET_LOCAL_FILE), 'run', '--rm', '--no-deps', '--entrypoint', 'pip',
+        BUILD_SERVICE, 'wheel', '--wheel-dir', f"{CONTAINER_PROJECT_DIR}/{WHEELHOUSE_DIR.as_posix()}",
+        *dependencies,
+    ]
@@ -1,15 +1,22 @@
-"""Workshop manager cli."""
+"""Workshop manager cli.
 
+Command implementations are imported inside each command, after the project root is
+found, so that a subcommand only loads the modules it uses. Keep module level imports
+limited to the standard library and click.
+"""
+
+import json
 import os
+import sys
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
 import click
 
-from devx.init import init
-from devx.models import BrevWorkspace, Project
-from devx.publish import publish as publish_to_brev
-from devx.run import build, restart, start, status, stop
-from devx.sync import sync
+from devx.repository import repository_metadata
+
+if TYPE_CHECKING:
+    from devx.models import BrevWorkspace, Project
 
 
 def _find_project_root() -> Path:
@@ -21,17 +28,15 @@ def _find_project_root() -> Path:
     Raises:
         click.ClickException: If no pyproject.toml or .devx directory is found.
     """
-    current = Path.cwd()
-    while current != current.parent:
-        if (current / 'pyproject.toml').exists() and (current / '.devx').exists():
-            os.chdir(current)
-            return current
-        current = current.parent
+    project_root = repository_metadata().project_root
+    if project_root:
+        os.chdir(project_root)
+        return project_root
 
     raise click.ClickException("No pyproject.toml and .devx directory found in current directory or any parent directory")
 
 
-def load_project_context() -> tuple[Project, BrevWorkspace]:
+def load_project_context() -> tuple["Project", "BrevWorkspace"]:
     """Load project and workspace configuration.
 
     Returns:
@@ -40,14 +45,31 @@ def load_project_context() -> tuple[Project, BrevWorkspace]:
     Raises:
         click.ClickException: If loading fails.
     """
+    from devx.snapshot import load_config  # pylint: disable=import-outside-toplevel
+
     try:
-        project = Project()
-        workspace = BrevWorkspace()
+        project, workspace, _ = load_config()
         return project, workspace
     except Exception as e:
         raise click.ClickException(f"Failed to load configuration: {e}")
 
 
+def sync_project(
+    project: "Project", workspace: "BrevWorkspace", force: bool = False, gpus: Optional[int] = None
+) -> None:
+    """Synchronize the generated workshop files.
+
+    Raises:
+        click.ClickException: If the compose file does not fit the workspace.
+    """
+    from devx.sync import sync  # pylint: disable=import-outside-toplevel
+
+    try:
+        sync(workspace, project, force=force, gpus=gpus)
+    except ValueError as e:
+        raise click.ClickException(f"Failed to compile the compose file: {e}")
+
+
 @click.group(context_settings={"help_option_names": ["-h", "--help"]})
 @click.version_option()
 def cli():
@@ -65,23 +87,99 @@ def devel():
 @devel.command("init")
 @click.option("-f", "--force", is_flag=True, help="Overwrite existing files")
 @click.option("-t", "--template", default="simple", help="Name of the template to use")
-def init_cmd(force: bool, template: str):
+@click.option("--offline", is_flag=True, help="Only use the local template cache")
+@click.option(
+    "--template-dir",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    help="Local directory of templates to use instead of downloading",
+)
+def init_cmd(force: bool, template: str, offline: bool, template_dir: Optional[Path]):
     """Initialize a workshop repository."""
+    from devx.init import init  # pylint: disable=import-outside-toplevel
+
     # Create a mock args object for backward compatibility
     class Args:
-        def __init__(self, force, template):
+        def __init__(self, force, template, offline, template_dir):
             self.force = force
             self.template = template
+            self.offline = offline
+            self.template_dir = template_dir
+
+    init(Args(force, template, offline, template_dir))
+
 
-    init(Args(force, template))
+@devel.command("templates")
+def templates_cmd():
+    """List the cached workshop templates."""
+    from devx.init import list_templates  # pylint: disable=import-outside-toplevel
+    list_templates()
 
 
 @devel.command("sync")
-def sync_cmd():
+@click.option("--check", "check_only", is_flag=True, help="Report drift without writing anything")
+@click.option(
+    "--gpus", type=click.IntRange(min=0),
+    help="Number of GPUs to allocate the launchable for instead of the instance type's, kept until 0 resets it"
+)
+def sync_cmd(check_only: bool, gpus: Optional[int]):
     """Force sync of runtime config."""
     _find_project_root()
+    from devx.sync import check  # pylint: disable=import-outside-toplevel
     project, workspace = load_project_context()
-    sync(workspace, project, force=True)
+    if check_only:
+        try:
+            drifted = check(workspace, project, gpus)
+        except ValueError as e:
+            raise click.ClickException(f"Failed to compile the compose file: {e}")
+        if drifted:
+            sys.exit(1)
+        return
+    sync_project(project, workspace, force=True, gpus=gpus)
+
+
+@devel.command("plan")
+def plan_cmd():
+    """Show the memory, CPU and shared memory planned for every service without writing anything."""
+    _find_project_root()
+    from devx.sync import plan  # pylint: disable=import-outside-toplevel
+    _, workspace = load_project_context()
+    try:
+        plan(workspace)
+    except ValueError as e:
+        raise click.ClickException(f"Failed to plan the service resources: {e}")
+
+
+@devel.command("watch")
+@click.option("--poll", is_flag=True, help="Poll for changes instead of using inotify")
+@click.option("--interval", default=1.0, show_default=True, help="Seconds between polls")
+def watch_cmd(poll: bool, interval: float):
+    """Apply edits to the compose file and variables to the running workshop."""
+    _find_project_root()
+    from devx.watch import watch  # pylint: disable=import-outside-toplevel
+    try:
+        watch(poll, interval)
+    except KeyboardInterrupt:
+        pass
+
+
+@devel.command("config")
+@click.option("--json", "as_json", is_flag=True, help="Print the resolved configuration as JSON")
+def config_cmd(as_json: bool):
+    """Show the resolved workshop configuration."""
+    _find_project_root()
+    from devx.snapshot import load_config  # pylint: disable=import-outside-toplevel
+    try:
+        _, _, config = load_config()
+    except Exception as e:
+        raise click.ClickException(f"Failed to load configuration: {e}")
+
+    if as_json:
+        click.echo(json.dumps(config, indent=2, sort_keys=True))
+        return
+    for section, values in config.items():
+        click.echo(f"[{section}]")
+        for key, value in values.items():
+            click.echo(f"  {key}: {value}")
 
 
 # Workshop Commands
@@ -91,44 +189,251 @@ def workshop():
     pass
 
 
+def _docker_command(func, *args) -> None:
+    """Run a workshop command, reporting Docker failures as CLI errors.
+
+    Raises:
+        click.ClickException: If Docker reports an error.
+    """
+    from devx.docker import DockerError  # pylint: disable=import-outside-toplevel
+
+    try:
+        func(*args)
+    except DockerError as e:
+        raise click.ClickException(str(e))
+
+
 @workshop.command("start")
 @click.option("--no-browser", is_flag=True, help="Don't open the browser automatically")
-def start_cmd(no_browser: bool):
-    """Start the workshop locally."""
+@click.option("--wait", is_flag=True, help="Wait until every service is ready, opening the browser once Jupyter is")
+@click.option("--timeout", default=1800, show_default=True, help="Seconds to wait for every service with --wait")
+@click.option("--rebuild", is_flag=True, help="Rebuild the workshop image even if its inputs are unchanged")
+@click.option("-p", "--profile", "profiles", multiple=True, help="Compose profile to enable (repeatable)")
+@click.option("--instances", default=0, help="Start this many isolated copies of the workshop, named t1 to tN")
+@click.option("--tenant", "tenants", multiple=True, help="Start an isolated copy of the workshop by name (repeatable)")
+@click.option("-j", "--jobs", default=4, show_default=True, help="Number of copies to start at once")
+@click.argument("services", nargs=-1)
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
+def start_cmd(
+    no_browser: bool, wait: bool, timeout: int, rebuild: bool, profiles: tuple[str, ...], instances: int,
+    tenants: tuple[str, ...], jobs: int, services: tuple[str, ...],
+):
+    """Start the workshop locally, or only the given SERVICES."""
     _find_project_root()
     project, workspace = load_project_context()
-    sync(workspace, project)
-    start(no_browser)
+    if instances or tenants:
+        if services or wait:
+            raise click.UsageError("--instances and --tenant cannot be combined with service names or --wait")
+        from devx.tenants import start_tenants, tenant_names  # pylint: disable=import-outside-toplevel
+        try:
+            names = tenant_names(instances, list(tenants))
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="--tenant")
+        sync_project(project, workspace)
+        _docker_command(start_tenants, names, list(profiles), rebuild, jobs)
+        return
+
+    from devx.run import start  # pylint: disable=import-outside-toplevel
+    sync_project(project, workspace)
+    _docker_command(start, no_browser, wait, timeout, rebuild, list(services), list(profiles))
 
 
 @workshop.command("stop")
-def stop_cmd():
+@click.option("--tenant", "tenants", multiple=True, help="Stop an isolated copy of the workshop (repeatable)")
+@click.option("--all-tenants", is_flag=True, help="Stop every isolated copy of the workshop")
+@click.option("-j", "--jobs", default=4, show_default=True, help="Number of copies to stop at once")
+def stop_cmd(tenants: tuple[str, ...], all_tenants: bool, jobs: int):
     """Stop the workshop."""
     _find_project_root()
-    stop()
+    if tenants or all_tenants:
+        from devx.tenants import stop_tenants  # pylint: disable=import-outside-toplevel
+        _docker_command(stop_tenants, list(tenants), jobs)
+        return
+
+    from devx.run import stop  # pylint: disable=import-outside-toplevel
+    _docker_command(stop)
+
+
+@workshop.command("tenants")
+def tenants_cmd():
+    """List the isolated copies of the workshop and their URLs."""
+    _find_project_root()
+    from devx.tenants import print_tenants, recorded_tenants  # pylint: disable=import-outside-toplevel
+    _docker_command(lambda: print_tenants(recorded_tenants()))
+
+
+@workshop.command("snapshot")
+@click.option(
+    "-v", "--volume", "volumes", multiple=True, help="Compose volume to snapshot (repeatable, default devx_home)"
+)
+@click.option("--tenant", help="Snapshot the volumes of an isolated copy of the workshop instead")
+def snapshot_cmd(volumes: tuple[str, ...], tenant: Optional[str]):
+    """Archive the workshop volumes to .devx/snapshots, to reset them later."""
+    _find_project_root()
+    from devx.reset import snapshot  # pylint: disable=import-outside-toplevel
+    from devx.tenants import select_tenants  # pylint: disable=import-outside-toplevel
+
+    def run():
+        snapshot(list(volumes), select_tenants([tenant])[tenant] if tenant else None)
+
+    _docker_command(run)
+
+
+@workshop.command("reset")
+@click.option(
+    "-v", "--volume", "volumes", multiple=True, help="Compose volume to reset (repeatable, default devx_home)"
+)
+@click.option("--tenant", "tenants", multiple=True, help="Reset an isolated copy of the workshop (repeatable)")
+@click.option("--all-tenants", is_flag=True, help="Reset every isolated copy of the workshop")
+@click.option("-j", "--jobs", default=4, show_default=True, help="Number of copies to reset at once")
+def reset_cmd(volumes: tuple[str, ...], tenants: tuple[str, ...], all_tenants: bool, jobs: int):
+    """Reset the workshop volumes to their last snapshot."""
+    _find_project_root()
+    from devx.reset import reset  # pylint: disable=import-outside-toplevel
+    from devx.tenants import select_tenants  # pylint: disable=import-outside-toplevel
+
+    def run():
+        selected = list(select_tenants(list(tenants)).values()) if tenants or all_tenants else None
+        reset(list(volumes), selected, jobs)
+
+    _docker_command(run)
 
 
 @workshop.command("build")
-def build_cmd():
+@click.option("--rebuild", is_flag=True, help="Build even if the image inputs are unchanged")
+@click.option(
+    "--cache-from", multiple=True, help="BuildKit cache source, e.g. type=local,src=.devx/cache (repeatable)"
+)
+@click.option(
+    "--cache-to", multiple=True,
+    help="BuildKit cache destination, e.g. type=local,dest=.devx/cache,mode=max (repeatable)",
+)
+@click.option("--wheelhouse", is_flag=True, help="Collect the Python dependencies into .devx/wheelhouse after building")
+def build_cmd(rebuild: bool, cache_from: tuple[str, ...], cache_to: tuple[str, ...], wheelhouse: bool):
     """Build the workshop container."""
     _find_project_root()
+    from devx.run import build  # pylint: disable=import-outside-toplevel
+    project, workspace = load_project_context()
+    sync_project(project, workspace)
+    _docker_command(build, rebuild, list(cache_from), list(cache_to), wheelhouse)
+
+
+@workshop.command("pull")
+@click.option("-p", "--profile", "profiles", multiple=True, help="Compose profile to pull images for (repeatable)")
+@click.option("-j", "--jobs", default=3, show_default=True, help="Number of images to pull at once")
+def pull_cmd(profiles: tuple[str, ...], jobs: int):
+    """Pull every image the workshop uses, to warm a host before an event."""
+    _find_project_root()
+    from devx.pull import pull  # pylint: disable=import-outside-toplevel
     project, workspace = load_project_context()
-    sync(workspace, project)
-    build()
+    sync_project(project, workspace)
+    _docker_command(pull, list(profiles), jobs)
 
 
 @workshop.command("restart")
-def restart_cmd():
-    """Restart the workshop."""
+@click.option(
+    "-p", "--profile", "profiles", multiple=True, help="Restart the services of a compose profile (repeatable)"
+)
+@click.option("--changed", is_flag=True, help="Only recreate services whose definition changed since they were created")
+@click.argument("services", nargs=-1)
+def restart_cmd(profiles: tuple[str, ...], changed: bool, services: tuple[str, ...]):
+    """Restart the workshop, or only the given SERVICES."""
     _find_project_root()
-    restart()
+    from devx.run import restart  # pylint: disable=import-outside-toplevel
+    if changed and services:
+        raise click.UsageError("--changed cannot be combined with service names")
+    _docker_command(restart, list(services), list(profiles), changed)
 
 
 @workshop.command("status")
-def status_cmd():
+@click.option("--json", "as_json", is_flag=True, help="Print the container state as JSON")
+def status_cmd(as_json: bool):
     """Check the status of the workshop containers."""
     _find_project_root()
-    status()
+    from devx.run import status  # pylint: disable=import-outside-toplevel
+    _docker_command(status, as_json)
+
+
+@workshop.group("test", context_settings={"help_option_names": ["-h", "--help"]})
+def test():
+    """Check the workshop before publishing it."""
+    pass
+
+
+@test.command("notebooks")
+@click.option("--junit", type=click.Path(dir_okay=False, path_type=Path), help="Write a JUnit XML report to this file")
+@click.option("-j", "--jobs", type=int, help="Number of notebooks to check at once  [default: number of CPUs]")
+@click.option("--no-cache", is_flag=True, help="Check every notebook, even the ones that did not change")
+@click.argument("notebooks", nargs=-1, type=click.Path(exists=True, dir_okay=False, path_type=Path))
+def test_notebooks_cmd(junit: Optional[Path], jobs: Optional[int], no_cache: bool, notebooks: tuple[Path, ...]):
+    """Check that every notebook, or the given NOTEBOOKS, is valid, stripped of outputs and free of secrets."""
+    # the paths are relative to where devx was started, not the project root
+    notebooks = [path.resolve() for path in notebooks]
+    junit = junit.resolve() if junit else None
+    _find_project_root()
+    from devx.notebooks import test_notebooks  # pylint: disable=import-outside-toplevel
+
+    failed = test_notebooks([Path(os.path.relpath(path)) for path in notebooks], junit, jobs, not no_cache)
+    if failed:
+        raise click.ClickException(f"{failed} notebook(s) failed the checks")
+
+
+def _parse_shard(ctx, param, value: Optional[str]) -> Optional[tuple[int, int]]:
+    """Parse a `--shard INDEX/COUNT` option."""
+    if value is None:
+        return None
+    index, _, count = value.partition("/")
+    if not index.isdigit() or not count.isdigit() or not 1 <= int(index) <= int(count):
+        raise click.BadParameter("use INDEX/COUNT, e.g. 2/4", ctx=ctx, param=param)
+    return int(index), int(count)
+
+
+@test.command("execute")
+@click.option("-p", "--profile", "profiles", multiple=True, help="Compose profile the workshop runs with (repeatable)")
+@click.option("--cpu-only", is_flag=True, help="Hide the GPUs and skip the notebooks that need one")
+@click.option("-j", "--jobs", default=2, show_default=True, help="Number of notebooks to execute at once")
+@click.option("--shard", callback=_parse_shard, help="Only execute one shard of the notebooks, e.g. 2/4")
+@click.option("--junit", type=click.Path(dir_okay=False, path_type=Path), help="Write a JUnit XML report to this file")
+@click.option("--no-cache", is_flag=True, help="Execute every notebook, even the ones that passed and did not change")
+@click.option("--cells", is_flag=True, help="Print the duration of every cell")
+@click.argument("notebooks", nargs=-1, type=click.Path(exists=True, dir_okay=False, path_type=Path))
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
+def test_execute_cmd(
+    profiles: tuple[str, ...], cpu_only: bool, jobs: int, shard: Optional[tuple[int, int]], junit: Optional[Path],
+    no_cache: bool, cells: bool, notebooks: tuple[Path, ...],
+):
+    """Execute every notebook, or the given NOTEBOOKS, in the running workshop."""
+    # the paths are relative to where devx was started, not the project root
+    notebooks = [path.resolve() for path in notebooks]
+    junit = junit.resolve() if junit else None
+    _find_project_root()
+    from devx.docker import DockerError  # pylint: disable=import-outside-toplevel
+    from devx.execute import test_execute  # pylint: disable=import-outside-toplevel
+
+    try:
+        failed = test_execute(
+            [Path(os.path.relpath(path)) for path in notebooks], list(profiles), cpu_only, jobs, shard, junit,
+            not no_cache, cells,
+        )
+    except (DockerError, ValueError) as e:
+        raise click.ClickException(str(e))
+    if failed:
+        raise click.ClickException(f"{failed} notebook(s) failed")
+
+
+@test.command("docs")
+@click.option("--junit", type=click.Path(dir_okay=False, path_type=Path), help="Write a JUnit XML report to this file")
+@click.option("--no-cache", is_flag=True, help="Parse every markdown file, even the ones that did not change")
+def test_docs_cmd(junit: Optional[Path], no_cache: bool):
+    """Check the links, anchors and images of the lab manual."""
+    # the report path is relative to where devx was started, not the project root
+    junit = junit.resolve() if junit else None
+    _find_project_root()
+    from devx.docs import test_docs  # pylint: disable=import-outside-toplevel
+
+    failed = test_docs(junit, not no_cache)
+    if failed:
+        raise click.ClickException(f"{failed} markdown file(s) have problems")
 
 
 # Publish Commands
@@ -141,12 +446,127 @@ def publish():
 @publish.command("brev")
 @click.option("-y", "--yes", is_flag=True, help="Automatically answer yes to prompts")
 @click.option("--dry-run", is_flag=True, help="Show API request details without making the request")
-def brev_cmd(yes: bool, dry_run: bool):
+@click.option("--brev-org", is_flag=True, help="Run `brev org` to show the active organization")
+@click.option("-f", "--force", is_flag=True, help="Publish even if the launchable has not changed")
+@click.option("-t", "--target", "targets", multiple=True, help="Only publish the named target (repeatable)")
+@click.option("-j", "--jobs", default=4, show_default=True, help="Number of targets to publish concurrently")
+@click.option("--rate-limit", default=5.0, show_default=True, help="Maximum Brev API requests per second")
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
+def brev_cmd(
+    yes: bool, dry_run: bool, brev_org: bool, force: bool, targets: tuple[str, ...], jobs: int, rate_limit: float
+):
     """Create a launchable workshop on Brev."""
     _find_project_root()
+    from devx.publish import publish as publish_to_brev  # pylint: disable=import-outside-toplevel
     project, workspace = load_project_context()
-    sync(workspace, project, force=True)
-    publish_to_brev(workspace, project, yes, dry_run)
+    sync_project(project, workspace, force=True)
+    publish_to_brev(workspace, project, yes, dry_run, brev_org, force, list(targets), jobs, rate_limit)
+
+
+# Lab Commands
+@cli.group(context_settings={"help_option_names": ["-h", "--help"]})
+def labs():
+    """Manage lab instances deployed from the workshop's launchables (experimental).
+
+    The Brev workspace endpoints these commands use are not documented and may change.
+    """
+    click.echo("⚠️  devx labs is experimental: it relies on undocumented Brev workspace endpoints.", err=True)
+
+
+def _labs_options(func):
+    """Add the options shared by every labs command."""
+    func = click.option(
+        "-l", "--launchable", "launchables", multiple=True,
+        help="Launchable ID to manage (repeatable). Defaults to the launchables published from this workshop",
+    )(func)
+    func = click.option("--json", "as_json", is_flag=True, help="Print the results as JSON")(func)
+    func = click.option("--refresh", is_flag=True, help="Ignore the cached lab inventory")(func)
+    func = click.option("-j", "--jobs", default=8, show_default=True, help="Number of concurrent API calls")(func)
+    return func
+
+
+def _load_labs(launchables: tuple[str, ...], refresh: bool, jobs: int):
+    """Create a Brev client and load the lab inventory.
+
+    Returns:
+        Tuple of (client, workspace summaries).
+
+    Raises:
+        click.ClickException: If there are no launchables or the inventory cannot be loaded.
+    """
+    from devx.brev import BrevAPIError, BrevClient  # pylint: disable=import-outside-toplevel
+    from devx.labs import load_inventory, recorded_launchables  # pylint: disable=import-outside-toplevel
+
+    try:
+        client = BrevClient.from_credentials(pool_size=jobs)
+        if not launchables:
+            _find_project_root()
+            launchables = tuple(recorded_launchables(client.org_id))
+        if not launchables:
+            raise click.ClickException("No published launchables found. Use --launchable or run `devx publish brev`.")
+        return client, load_inventory(client, list(launchables), refresh)
+    except BrevAPIError as e:
+        raise click.ClickException(str(e))
+
+
+@labs.command("list")
+@_labs_options
+def labs_list_cmd(launchables: tuple[str, ...], as_json: bool, refresh: bool, jobs: int):
+    """List lab instances."""
+    from devx.labs import print_table  # pylint: disable=import-outside-toplevel
+    client, workspaces = _load_labs(launchables, refresh, jobs)
+    client.close()
+    print_table(workspaces, as_json)
+
+
+def _labs_action(action: str, help_text: str):
+    """Create a labs command that runs an action on every lab instance."""
+
+    @labs.command(action, help=help_text)
+    @_labs_options
+    @click.option("--wait/--no-wait", default=True, show_default=True, help="Wait until every instance changes state")
+    @click.option("--timeout", default=1800, show_default=True, help="Seconds to wait for each instance")
+    @click.option("-y", "--yes", is_flag=True, help="Automatically answer yes to prompts")
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def action_cmd(
+        launchables: tuple[str, ...], as_json: bool, refresh: bool, jobs: int, wait: bool, timeout: int, yes: bool
+    ):
+        from devx.labs import print_table, run  # pylint: disable=import-outside-toplevel
+        client, workspaces = _load_labs(launchables, refresh, jobs)
+        if not workspaces:
+            print_table([], as_json)
+            return
+        if action == "delete" and not yes:
+            click.confirm(f"Delete {len(workspaces)} lab instance(s)?", abort=True)
+
+        with client:
+            results = run(client, workspaces, action, jobs=jobs, wait=wait, timeout=timeout, as_json=as_json)
+        print_table(results, as_json)
+        if any(result["error"] for result in results):
+            sys.exit(1)
+
+    return action_cmd
+
+
+_labs_action("start", "Start every lab instance.")
+_labs_action("stop", "Stop every lab instance.")
+_labs_action("delete", "Delete every lab instance.")
+
+
+@labs.command("health")
+@_labs_options
+def labs_health_cmd(launchables: tuple[str, ...], as_json: bool, refresh: bool, jobs: int):
+    """Check that every lab instance is running and healthy."""
+    from devx.labs import is_healthy, print_table, run  # pylint: disable=import-outside-toplevel
+    client, workspaces = _load_labs(launchables, refresh, jobs)
+    with client:
+        results = run(client, workspaces, None, jobs=jobs, as_json=as_json)
+    print_table(results, as_json)
+    unhealthy = [result for result in results if not is_healthy(result)]
+    if unhealthy:
+        if not as_json:
+            print(f"\n❌ {len(unhealthy)} of {len(results)} lab instance(s) are not healthy")
+        sys.exit(1)
 
 
 def main():
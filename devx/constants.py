@@ -0,0 +1,19 @@
+"""Shared paths and settings for the workshop tooling.
+
+This module must stay free of third party imports so that lightweight commands can
+use it without paying for the configuration and compose machinery.
+"""
+
+import os
+from pathlib import Path
+
+DEVX_DIR = Path('.devx')
+PYPROJECT_FILE = Path('pyproject.toml')
+TARGET_BRANCH = 'main'
+TARGET_LAUNCHABLE_FILE = DEVX_DIR / 'compose.yaml'
+TARGET_LOCAL_FILE = DEVX_DIR / 'compose.local.yaml'
+WHEELHOUSE_DIR = DEVX_DIR / 'wheelhouse'
+LOCAL_JUPYTER_PORT = 8888
+USER_CONFIG_DIR = Path(os.environ.get('XDG_CONFIG_HOME') or Path.home() / '.config') / 'devx'
+USER_CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'devx'
+SITE_CONFIG_DIR = Path('/etc/devx')
@@ -0,0 +1,551 @@
+"""Docker Engine API client.
+
+Container state is read from the Docker Engine API over its Unix socket, using one
+persistent connection per process, instead of parsing `docker compose` output. When
+the socket is not reachable, for example with a remote `DOCKER_HOST`, callers fall
+back to the docker CLI, which reports containers in the same shape.
+"""
+
+import base64
+import functools
+import http.client
+import json
+import os
+import re
+import socket
+import subprocess
+import threading
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+from urllib.parse import quote, urlencode
+
+DOCKER_SOCKET = Path("/var/run/docker.sock")
+DOCKER_CONFIG_FILE = Path(os.environ.get("DOCKER_CONFIG", Path.home() / ".docker")) / "config.json"
+DOCKER_HUB_AUTH_KEY = "https://index.docker.io/v1/"
+COMPOSE_PROJECT_LABEL = "com.docker.compose.project"
+COMPOSE_CONFIG_FILES_LABEL = "com.docker.compose.project.config_files"
+COMPOSE_SERVICE_LABEL = "com.docker.compose.service"
+COMPOSE_CONFIG_HASH_LABEL = "com.docker.compose.config-hash"
+HEALTH_PATTERN = re.compile(r"\((healthy|unhealthy|health: starting)\)")
+
+
+class DockerError(RuntimeError):
+    """An error returned by the Docker Engine API or the docker CLI.
+
+    Attributes:
+        status: The HTTP status code, or None if the error did not come from the API.
+    """
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """An HTTP connection over a Unix domain socket."""
+
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+class DockerEngine:
+    """A client for the Docker Engine API that keeps its connection open.
+
+    The client is safe to share between threads; requests are serialized over the
+    single connection.
+
+    Attributes:
+        socket_path: The path of the Docker Engine socket.
+    """
+
+    def __init__(self, socket_path: Path | str = DOCKER_SOCKET, timeout: float = 30):
+        self.socket_path = str(socket_path)
+        self._connection = _UnixHTTPConnection(self.socket_path, timeout)
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "DockerEngine":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the connection."""
+        self._connection.close()
+
+    def _send(self, method: str, url: str) -> tuple[int, bytes]:
+        """Send one request over the persistent connection."""
+        self._connection.request(method, url, headers={"Host": "docker"})
+        response = self._connection.getresponse()
+        return response.status, response.read()
+
+    def request(self, method: str, path: str, params: Optional[dict] = None) -> Any:
+        """Make an API request.
+
+        Args:
+            method: The HTTP method.
+            path: The API path.
+            params: Query parameters.
+
+        Returns:
+            The decoded JSON response body, or None for empty responses.
+
+        Raises:
+            DockerError: If the engine cannot be reached or returns an error.
+        """
+        url = f"{path}?{urlencode(params)}" if params else path
+        with self._lock:
+            try:
+                try:
+                    status, body = self._send(method, url)
+                except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                    # the engine closed the idle connection, reconnect once
+                    self._connection.close()
+                    status, body = self._send(method, url)
+            except (OSError, http.client.HTTPException) as e:
+                self._connection.close()
+                raise DockerError(f"Could not reach the Docker engine at {self.socket_path}: {e}") from e
+
+        try:
+            data = json.loads(body) if body else None
+        except ValueError:
+            data = body.decode("utf-8", errors="replace")
+        if status >= 400:
+            message = data.get("message", data) if isinstance(data, dict) else data
+            raise DockerError(f"{method} {path} failed (HTTP {status}): {message}", status=status)
+        return data
+
+    def ping(self) -> bool:
+        """Check whether the engine is reachable."""
+        try:
+            self.request("GET", "/_ping")
+        except DockerError:
+            return False
+        return True
+
+    def containers(self, filters: Optional[dict[str, list[str]]] = None) -> list[dict]:
+        """List containers, including stopped ones.
+
+        Args:
+            filters: Docker Engine API container filters.
+
+        Returns:
+            The containers.
+        """
+        params = {"all": "true"}
+        if filters:
+            params["filters"] = json.dumps(filters)
+        return self.request("GET", "/containers/json", params) or []
+
+    def inspect_container(self, container_id: str) -> dict:
+        """Get the low level state of a container."""
+        return self.request("GET", f"/containers/{quote(container_id)}/json")
+
+    def inspect_image(self, image: str) -> Optional[dict]:
+        """Get the low level details of a local image, or None if it does not exist."""
+        try:
+            return self.request("GET", f"/images/{quote(image)}/json")
+        except DockerError as e:
+            if e.status == 404:
+                return None
+            raise
+
+    def image_id(self, image: str) -> Optional[str]:
+        """Get the ID of an image, or None if it does not exist."""
+        info = self.inspect_image(image)
+        return info["Id"] if info else None
+
+    def distribution_digest(self, image: str) -> Optional[str]:
+        """Get the digest of an image in its registry, or None if the registry cannot be queried."""
+        headers = {"Host": "docker"}
+        auth = registry_auth(image)
+        if auth:
+            headers["X-Registry-Auth"] = auth
+        connection = _UnixHTTPConnection(self.socket_path, self._connection.timeout)
+        try:
+            connection.request("GET", f"/distribution/{quote(image)}/json", headers=headers)
+            response = connection.getresponse()
+            if response.status != 200:
+                return None
+            return json.loads(response.read())["Descriptor"]["digest"]
+        except (OSError, http.client.HTTPException, ValueError, KeyError):
+            return None
+        finally:
+            connection.close()
+
+    def pull(self, image: str, on_progress: Callable[[dict], None]) -> None:
+        """Pull an image, reporting every progress message.
+
+        Each pull uses its own connection, so several images can be pulled at once.
+
+        Args:
+            image: The image reference.
+            on_progress: Called with every progress message of the pull.
+
+        Raises:
+            DockerError: If the pull fails.
+        """
+        headers = {"Host": "docker"}
+        auth = registry_auth(image)
+        if auth:
+            headers["X-Registry-Auth"] = auth
+        connection = _UnixHTTPConnection(self.socket_path, timeout=None)
+        try:
+            repository, tag = split_image_reference(image)
+            params = urlencode({"fromImage": repository, "tag": tag})
+            connection.request("POST", f"/images/create?{params}", headers=headers)
+            response = connection.getresponse()
+            if response.status >= 400:
+                body = response.read()
+                try:
+                    message = json.loads(body).get("message", body)
+                except ValueError:
+                    message = body.decode("utf-8", errors="replace")
+                raise DockerError(f"Pulling {image} failed (HTTP {response.status}): {message}", status=response.status)
+            for line in response:
+                if not line.strip():
+                    continue
+                progress = json.loads(line)
+                if "error" in progress:
+                    raise DockerError(f"Pulling {image} failed: {progress['error']}")
+                on_progress(progress)
+        except (OSError, http.client.HTTPException) as e:
+            raise DockerError(f"Could not reach the Docker engine at {self.socket_path}: {e}") from e
+        finally:
+            connection.close()
+
+    def restart_container(self, container_id: str) -> None:
+        """Restart a container."""
+        self.request("POST", f"/containers/{quote(container_id)}/restart")
+
+    def events(self, filters: dict[str, list[str]]) -> "EventStream":
+        """Open a stream of engine events.
+
+        Args:
+            filters: Docker Engine API event filters.
+
+        Returns:
+            The event stream, on its own connection so the client stays usable.
+
+        Raises:
+            DockerError: If the engine cannot be reached or returns an error.
+        """
+        return EventStream(self.socket_path, filters)
+
+
+class EventStream:
+    """A stream of Docker Engine events on a dedicated connection.
+
+    Iterating blocks until the next event. `close` may be called from another thread
+    to end the iteration.
+    """
+
+    def __init__(self, socket_path: str, filters: dict[str, list[str]]):
+        self._connection = _UnixHTTPConnection(socket_path, timeout=None)
+        try:
+            self._connection.request(
+                "GET", f"/events?{urlencode({'filters': json.dumps(filters)})}", headers={"Host": "docker"}
+            )
+            self._response = self._connection.getresponse()
+        except (OSError, http.client.HTTPException) as e:
+            self._connection.close()
+            raise DockerError(f"Could not reach the Docker engine at {socket_path}: {e}") from e
+        if self._response.status >= 400:
+            self._connection.close()
+            raise DockerError(f"GET /events failed (HTTP {self._response.status})", status=self._response.status)
+
+    def __iter__(self) -> Iterator[dict]:
+        try:
+            while True:
+                try:
+                    line = self._response.readline()
+                except (OSError, ValueError, http.client.HTTPException):
+                    return
+                if not line:
+                    return
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            self._connection.close()
+
+    def close(self) -> None:
+        """Close the stream, ending the iteration in whichever thread is reading it."""
+        sock = self._connection.sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+@functools.cache
+def engine() -> Optional[DockerEngine]:
+    """Get the shared Docker Engine client, if the engine is reachable over a Unix socket.
+
+    Returns:
+        The Docker Engine client, or None to fall back to the docker CLI.
+    """
+    docker_host = os.environ.get("DOCKER_HOST", "")
+    if docker_host and not docker_host.startswith("unix://"):
+        return None
+    socket_path = Path(docker_host.removeprefix("unix://")) if docker_host else DOCKER_SOCKET
+    if not socket_path.exists():
+        return None
+
+    client = DockerEngine(socket_path)
+    if not client.ping():
+        client.close()
+        return None
+    return client
+
+
+def _format_ports(ports: list[dict]) -> list[str]:
+    """Format published container ports as `host:port->port/protocol`."""
+    formatted = []
+    for port in ports:
+        if not port.get("PublicPort"):
+            continue
+        entry = f"{port.get('IP') or '0.0.0.0'}:{port['PublicPort']}->{port['PrivatePort']}/{port.get('Type', 'tcp')}"
+        if entry not in formatted:
+            formatted.append(entry)
+    return formatted
+
+
+def _summarize(container: dict) -> dict:
+    """Reduce a Docker Engine API container to the fields devx reports."""
+    labels = container.get("Labels") or {}
+    status = container.get("Status", "")
+    health = HEALTH_PATTERN.search(status)
+    return {
+        "service": labels.get(COMPOSE_SERVICE_LABEL),
+        "name": (container.get("Names") or ["/"])[0].lstrip("/"),
+        "id": container.get("Id", "")[:12],
+        "image": container.get("Image"),
+        "state": container.get("State"),
+        "status": status,
+        "health": health.group(1).removeprefix("health: ") if health else None,
+        "ports": _format_ports(container.get("Ports") or []),
+        "config_hash": labels.get(COMPOSE_CONFIG_HASH_LABEL),
+    }
+
+
+def compose_containers(client: DockerEngine, compose_file: Path) -> list[dict]:
+    """List the containers created from a compose file.
+
+    Args:
+        client: The Docker Engine client.
+        compose_file: The compose file the containers were created from.
+
+    Returns:
+        The container summaries, sorted by service.
+    """
+    compose_file = str(Path(compose_file).resolve())
+    containers = [
+        container for container in client.containers({"label": [COMPOSE_PROJECT_LABEL]})
+        if compose_file in (container.get("Labels") or {}).get(COMPOSE_CONFIG_FILES_LABEL, "").split(",")
+    ]
+    return sorted((_summarize(container) for container in containers), key=lambda c: (c["service"] or "", c["name"]))
+
+
+def split_image_reference(image: str) -> tuple[str, str]:
+    """Split an image reference into its repository and its tag or digest.
+
+    The Engine API pulls every tag of a repository when no tag is given, so untagged
+    references get `latest`, as with `docker pull`.
+
+    Args:
+        image: The image reference, such as `postgres`, `nvcr.io/nim/llama:1.0` or `redis@sha256:...`.
+
+    Returns:
+        Tuple of (repository, tag or digest).
+    """
+    if "@" in image:
+        # a digest pins the image, so a tag next to it is ignored
+        repository, _, digest = image.partition("@")
+        return split_image_reference(repository)[0], digest
+    repository, _, tag = image.rpartition(":")
+    # a colon before the last slash belongs to a registry port, not a tag
+    if not repository or "/" in tag:
+        return image, "latest"
+    return repository, tag
+
+
+def registry_auth(image: str) -> Optional[str]:
+    """Get the X-Registry-Auth header for an image from the docker CLI login.
+
+    Only credentials stored in the docker configuration file are used. Registries
+    logged in through a credential helper are pulled without credentials.
+
+    Args:
+        image: The image reference.
+
+    Returns:
+        The encoded credentials, or None if there are none.
+    """
+    first = image.split("/", 1)[0]
+    is_registry = "/" in image and ("." in first or ":" in first or first == "localhost")
+    registry = first if is_registry else DOCKER_HUB_AUTH_KEY
+    try:
+        with open(DOCKER_CONFIG_FILE, encoding="utf-8") as f:
+            auths = json.load(f).get("auths") or {}
+    except (OSError, ValueError):
+        return None
+
+    entry = auths.get(registry) or auths.get(f"https://{registry}") or {}
+    if entry.get("identitytoken"):
+        credentials = {"identitytoken": entry["identitytoken"]}
+    elif entry.get("auth"):
+        username, _, password = base64.b64decode(entry["auth"]).decode("utf-8").partition(":")
+        credentials = {"username": username, "password": password, "serveraddress": registry}
+    else:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(credentials).encode("utf-8")).decode("ascii")
+
+
+def image_id(image: str) -> Optional[str]:
+    """Get the ID of a local image, using the Docker Engine API or the docker CLI.
+
+    Args:
+        image: The image name.
+
+    Returns:
+        The image ID, or None if the image does not exist.
+
+    Raises:
+        DockerError: If Docker cannot be reached.
+    """
+    client = engine()
+    if client:
+        return client.image_id(image)
+
+    cmd = ["docker", "image", "inspect", "--format", "{{.Id}}", image]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+    except FileNotFoundError as e:
+        raise DockerError("The docker CLI is not installed") from e
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip() or None
+
+
+def _parse_labels(labels: str) -> dict[str, str]:
+    """Parse the comma separated `key=value` labels printed by the docker CLI."""
+    return dict(label.split("=", 1) for label in labels.split(",") if "=" in label)
+
+
+def compose_cli(compose_file: Path, profiles: Optional[list[str]], *args: str) -> str:
+    """Run a docker compose command and return its output.
+
+    Raises:
+        DockerError: If the docker CLI fails.
+    """
+    cmd = ["docker", "compose", "-f", str(compose_file)]
+    for profile in profiles or []:
+        cmd.extend(["--profile", profile])
+    cmd.extend(args)
+    try:
+        return subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+    except FileNotFoundError as e:
+        raise DockerError("The docker CLI is not installed") from e
+    except subprocess.CalledProcessError as e:
+        raise DockerError(f"`{' '.join(cmd)}` failed: {e.stderr.strip() or e.returncode}") from e
+
+
+def load_compose_file(compose_file: Path) -> dict:
+    """Load a compiled compose file, or an empty definition if it does not exist."""
+    # imported here to keep YAML parsing out of the commands that only talk to the engine
+    import yaml  # pylint: disable=import-outside-toplevel
+
+    try:
+        with open(compose_file, "r", encoding="utf-8") as f:
+            return yaml.load(f, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader)) or {}
+    except FileNotFoundError:
+        return {}
+
+
+def profile_services(compose_file: Path, profiles: list[str]) -> list[str]:
+    """Get the services of a compose file that belong to any of the given profiles."""
+    services = load_compose_file(compose_file).get("services") or {}
+    return [
+        name for name, service in services.items()
+        if set((service or {}).get("profiles") or []) & set(profiles)
+    ]
+
+
+def compose_config_hashes(compose_file: Path, profiles: Optional[list[str]] = None) -> dict[str, str]:
+    """Get the configuration hash docker compose labels each service's container with.
+
+    Args:
+        compose_file: The compose file.
+        profiles: The compose profiles to enable.
+
+    Returns:
+        Mapping of service name to its configuration hash.
+
+    Raises:
+        DockerError: If the docker CLI fails.
+    """
+    output = compose_cli(compose_file, profiles, "config", "--hash", "*")
+    return dict(line.split(None, 1) for line in output.splitlines() if len(line.split()) == 2)
+
+
+def compose_project_name(compose_file: Path) -> str:
+    """Get the compose project name of a compose file.
+
+    Raises:
+        DockerError: If the docker CLI fails.
+    """
+    return json.loads(compose_cli(compose_file, None, "config", "--format", "json"))["name"]
+
+
+def compose_containers_cli(compose_file: Path) -> list[dict]:
+    """List the containers created from a compose file using the docker CLI.
+
+    Args:
+        compose_file: The compose file the containers were created from.
+
+    Returns:
+        The container summaries, sorted by service.
+
+    Raises:
+        DockerError: If the docker CLI fails.
+    """
+    output = compose_cli(compose_file, None, "ps", "--all", "--format", "json")
+
+    # docker compose prints a JSON array in older releases and JSON lines in newer ones
+    output = output.strip()
+    if output.startswith("["):
+        containers = json.loads(output)
+    else:
+        containers = [json.loads(line) for line in output.splitlines() if line.strip()]
+
+    summaries = []
+    for container in containers:
+        ports = [
+            f"{publisher.get('URL') or '0.0.0.0'}:{publisher['PublishedPort']}->"
+            f"{publisher['TargetPort']}/{publisher.get('Protocol', 'tcp')}"
+            for publisher in container.get("Publishers") or [] if publisher.get("PublishedPort")
+        ]
+        summaries.append({
+            "service": container.get("Service"),
+            "name": container.get("Name"),
+            "id": container.get("ID", "")[:12],
+            "image": container.get("Image"),
+            "state": container.get("State"),
+            "status": container.get("Status"),
+            "health": container.get("Health") or None,
+            "ports": list(dict.fromkeys(ports)),
+            "config_hash": _parse_labels(container.get("Labels") or "").get(COMPOSE_CONFIG_HASH_LABEL),
+        })
+    return sorted(summaries, key=lambda c: (c["service"] or "", c["name"] or ""))
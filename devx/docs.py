@@ -0,0 +1,306 @@
+"""Check the links, anchors and images of the markdown lab manual.
+
+The lab manual in `.devx` is served by docsify. Every markdown file is parsed once
+into an index of its headings and references, and the files and sizes of every asset
+are indexed with a single directory walk. References are then resolved against the
+index in memory. The parsed files are cached in `.devx/docs.json` by size and
+modification time, so later runs only parse the files that changed, while every
+reference is still resolved against the current files.
+"""
+
+import json
+import os
+import posixpath
+import re
+import time
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from devx.constants import DEVX_DIR
+from devx.junit import TestCase
+
+DOCS_DIR = DEVX_DIR
+CACHE_FILE = DEVX_DIR / 'docs.json'
+# bump when the parser changes, so cached files are parsed again
+PARSER_VERSION = 1
+# generated or private directories of `.devx` that are not part of the lab manual
+IGNORED_DIRS = {'tenants', 'snapshots', 'wheelhouse', 'cache'}
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.avif', '.bmp'}
+FENCE_PATTERN = re.compile(r'^\s*(```|~~~)')
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+# docsify sets a heading's ID with `:id=name` at its end
+HEADING_ID_PATTERN = re.compile(r'\s*:id=(\S+)')
+CODE_SPAN_PATTERN = re.compile(r'`[^`]*`')
+MARKDOWN_LINK_PATTERN = re.compile(
+    r'(!?)\[(?:[^\[\]]|\[[^\]]*\])*\]\(\s*<?([^)\s>]+)>?(?:\s+["\'][^)]*["\'])?\s*\)'
+)
+HTML_LINK_PATTERN = re.compile(r'<(img|a|source|video)\b[^>]*?\s(src|href)\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+# docsify's slugger drops these characters from heading IDs
+SLUG_PUNCTUATION = re.compile(r'[\u2000-\u206F\u2E00-\u2E7F\\\'!"#$%&()*+,./:;<=>?@\[\]^`{|}~]')
+EXTERNAL_PATTERN = re.compile(r'^([a-z][a-z0-9+.-]*:|//)', re.IGNORECASE)
+
+
+class Reference(NamedTuple):
+    """A link or image in a markdown file.
+
+    Attributes:
+        line: The line number of the reference.
+        image: Whether the reference is an image.
+        target: The referenced URL, as written.
+    """
+    line: int
+    image: bool
+    target: str
+
+
+class DocsIndex(NamedTuple):
+    """Everything the references of the lab manual are resolved against.
+
+    Attributes:
+        headings: Mapping of every markdown file to the IDs of its headings.
+        references: Mapping of every markdown file to its references.
+        files: Mapping of every file of the lab manual to its size in bytes.
+    """
+    headings: dict[str, list[str]]
+    references: dict[str, list[Reference]]
+    files: dict[str, int]
+
+
+def slugify(text: str, seen: dict[str, int]) -> str:
+    """Compute the ID docsify gives a heading.
+
+    Args:
+        text: The heading text.
+        seen: How often every ID was used on the page so far. Updated with the ID.
+
+    Returns:
+        The ID, with a counter appended when the page already has it.
+    """
+    slug = re.sub(r'<[^>]+>', '', text.strip().lower())
+    slug = SLUG_PUNCTUATION.sub('', slug)
+    slug = re.sub(r'-+', '-', re.sub(r'\s', '-', slug))
+    slug = re.sub(r'^(\d)', r'_\1', slug)
+    count = seen.get(slug)
+    seen[slug] = 0 if count is None else count + 1
+    return f"{slug}-{seen[slug]}" if count is not None else slug
+
+
+def parse_markdown(text: str) -> tuple[list[str], list[Reference]]:
+    """Collect the heading IDs and references of a markdown file, outside of code.
+
+    Returns:
+        Tuple of (heading IDs, references).
+    """
+    headings: list[str] = []
+    references: list[Reference] = []
+    seen: dict[str, int] = {}
+    fence = None
+    for number, line in enumerate(text.splitlines(), start=1):
+        match = FENCE_PATTERN.match(line)
+        if match:
+            fence = None if fence == match.group(1) else fence or match.group(1)
+            continue
+        if fence:
+            continue
+
+        heading = HEADING_PATTERN.match(line)
+        if heading:
+            title = heading.group(2)
+            custom = HEADING_ID_PATTERN.search(title)
+            headings.append(custom.group(1) if custom else slugify(title, seen))
+
+        line = CODE_SPAN_PATTERN.sub('', line)
+        for match in MARKDOWN_LINK_PATTERN.finditer(line):
+            references.append(Reference(number, bool(match.group(1)), match.group(2)))
+        for match in HTML_LINK_PATTERN.finditer(line):
+            references.append(Reference(number, match.group(1).lower() != 'a', match.group(3)))
+    return headings, references
+
+
+def _load_cache() -> dict:
+    """Load the parsed files of the previous run."""
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return cache.get('files', {}) if cache.get('version') == PARSER_VERSION else {}
+
+
+def _save_cache(files: dict) -> None:
+    """Cache the parsed files."""
+    if not DEVX_DIR.is_dir():
+        return
+    with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump({"version": PARSER_VERSION, "files": files}, f, indent=1, sort_keys=True)
+        f.write('\n')
+
+
+def build_index(use_cache: bool = True) -> tuple[DocsIndex, int]:
+    """Index the files of the lab manual, parsing the markdown files that changed.
+
+    Args:
+        use_cache: Whether to reuse the parsed markdown files that did not change.
+
+    Returns:
+        Tuple of (the index, number of markdown files parsed).
+    """
+    cache = _load_cache() if use_cache else {}
+    files: dict[str, int] = {}
+    parsed: dict[str, dict] = {}
+    changed = 0
+    for root, dirs, names in os.walk(DOCS_DIR):
+        relative_root = Path(root).relative_to(DOCS_DIR)
+        dirs[:] = [
+            name for name in dirs
+            if not name.startswith('.') and not (relative_root == Path('.') and name in IGNORED_DIRS)
+        ]
+        for name in names:
+            path = Path(root, name)
+            key = (relative_root / name).as_posix()
+            stat = path.stat()
+            files[key] = stat.st_size
+            if not name.endswith('.md'):
+                continue
+            signature = f"{stat.st_size}:{stat.st_mtime_ns}"
+            cached = cache.get(key)
+            if cached and cached.get('signature') == signature:
+                parsed[key] = cached
+                continue
+            headings, references = parse_markdown(path.read_text(encoding='utf-8', errors='replace'))
+            parsed[key] = {"signature": signature, "headings": headings, "references": references}
+            changed += 1
+
+    _save_cache(parsed)
+    index = DocsIndex(
+        {key: entry['headings'] for key, entry in parsed.items()},
+        {key: [Reference(*reference) for reference in entry['references']] for key, entry in parsed.items()},
+        files,
+    )
+    return index, changed
+
+
+def _resolve_page(index: DocsIndex, page: str, path: str) -> Optional[str]:
+    """Find the file a link path refers to, relative to the linking page or the docs root.
+
+    docsify serves `page`, `page.md` and `dir/` (its README.md) for the same file.
+    """
+    directory = posixpath.dirname(page)
+    bases = [directory, ''] if not path.startswith('/') else ['']
+    for base in bases:
+        resolved = posixpath.normpath(posixpath.join(base, path.lstrip('/')))
+        candidates = [resolved, f"{resolved}.md", posixpath.join(resolved, 'README.md')]
+        if resolved == '.':
+            candidates = ['README.md']
+        for candidate in candidates:
+            if candidate in index.files:
+                return candidate
+    return None
+
+
+def check_reference(index: DocsIndex, page: str, reference: Reference) -> Optional[str]:
+    """Resolve one reference against the index.
+
+    Args:
+        index: The lab manual index.
+        page: The markdown file the reference is in.
+        reference: The reference.
+
+    Returns:
+        The file the reference resolves to, or None for external references.
+
+    Raises:
+        ValueError: If the reference does not resolve.
+    """
+    target = reference.target.strip()
+    if EXTERNAL_PATTERN.match(target) or '{{' in target or target.startswith('$'):
+        return None
+
+    # docsify routes look like `#/page?id=anchor` and start at the docs root
+    if target.startswith('#/'):
+        target = target[1:]
+    path, _, fragment = target.partition('#')
+    path, _, query = path.partition('?')
+    anchor = fragment or dict(
+        part.partition('=')[::2] for part in query.split('&') if part.startswith('id=')
+    ).get('id')
+
+    resolved = _resolve_page(index, page, path) if path else page
+    if resolved is None:
+        raise ValueError(f"broken {'image' if reference.image else 'link'} to {reference.target}")
+    if anchor and resolved in index.headings and anchor not in index.headings[resolved]:
+        raise ValueError(f"anchor #{anchor} not found in {resolved}")
+    return resolved
+
+
+def check_docs(index: DocsIndex, max_image_size: int) -> list[TestCase]:
+    """Resolve every reference of the lab manual in one pass over the index.
+
+    Broken links and anchors fail the markdown file they are in. Images larger than
+    `max_image_size` slow down the page, but only add a warning to the output.
+
+    Args:
+        index: The lab manual index.
+        max_image_size: The largest image allowed without a warning, in bytes.
+
+    Returns:
+        One result per markdown file, with one failure per broken reference.
+    """
+    results = []
+    for page in sorted(index.references):
+        started = time.monotonic()
+        problems, warnings = [], []
+        for reference in index.references[page]:
+            try:
+                resolved = check_reference(index, page, reference)
+            except ValueError as e:
+                problems.append(f"line {reference.line}: {e}")
+                continue
+            size = index.files.get(resolved or '', 0)
+            if Path(resolved or '').suffix.lower() in IMAGE_EXTENSIONS and size > max_image_size:
+                warnings.append(
+                    f"line {reference.line}: image {resolved} is {size / 1024:.0f} KiB, "
+                    f"larger than the {max_image_size / 1024:.0f} KiB limit"
+                )
+        results.append(TestCase(page, time.monotonic() - started, problems, output="\n".join(warnings)))
+    return results
+
+
+def test_docs(junit: Optional[Path] = None, use_cache: bool = True) -> int:
+    """Check the lab manual and report the problems found.
+
+    Args:
+        junit: Path of a JUnit XML report to write.
+        use_cache: Whether to reuse the parsed markdown files that did not change.
+
+    Returns:
+        The number of markdown files with problems.
+    """
+    # imported here to keep pydantic out of the parsing
+    from devx.junit import write_junit  # pylint: disable=import-outside-toplevel
+    from devx.models import TestSettings  # pylint: disable=import-outside-toplevel
+    from devx.resources import parse_size  # pylint: disable=import-outside-toplevel
+
+    if not DOCS_DIR.is_dir():
+        print("No lab manual found.")
+        return 0
+
+    started = time.monotonic()
+    index, parsed = build_index(use_cache)
+    results = check_docs(index, parse_size(TestSettings().max_image_size))
+    for result in results:
+        for failure in result.failures:
+            print(f"❌ {DOCS_DIR / result.name}: {failure}")
+        for warning in filter(None, result.output.splitlines()):
+            print(f"⚠️  {DOCS_DIR / result.name}: {warning}")
+
+    failed = sum(1 for result in results if result.failures)
+    references = sum(len(references) for references in index.references.values())
+    print(
+        f"📋 {len(results)} markdown file(s) with {references} reference(s) checked, {failed} with problems, "
+        f"{parsed} parsed in {time.monotonic() - started:.1f}s"
+    )
+    if junit:
+        write_junit(junit, 'docs', results)
+        print(f"📝 JUnit report written to {junit}")
+    return failed
@@ -0,0 +1,525 @@
+"""Execute the workshop notebooks inside the running `devx` container.
+
+Notebooks run with nbclient in the container, so they see the workshop image and the
+compose services exactly as attendees do, and several notebooks run at once. A
+notebook can declare, in its `devx` metadata, the notebooks that must run before it,
+its own timeout, the compose profiles whose services it needs, and whether it needs a
+GPU:
+
+    "metadata": {
+      "devx": {"depends_on": ["01-setup.ipynb"], "timeout": 600, "profiles": ["nim"], "gpu": true}
+    }
+
+Results are cached in `.devx/executions.json` by the content of the notebook and its
+dependencies and the ID of the workshop image, so only changed notebooks run again.
+Only passing runs are cached. A cached notebook still runs again when a notebook that
+depends on it runs, so a fresh container has its side effects.
+"""
+
+import hashlib
+import json
+import posixpath
+import re
+import subprocess
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from devx.build import CONTAINER_PROJECT_DIR
+from devx.constants import DEVX_DIR
+from devx.docker import DockerError, image_id
+from devx.junit import TestCase
+
+CACHE_FILE = DEVX_DIR / 'executions.json'
+DEVX_SERVICE = 'devx'
+METADATA_KEY = 'devx'
+# time the kernel gets to shut down after a notebook timed out, before it is killed
+KILL_GRACE = 60
+RESULT_MARKER = '__devx_result__'
+# tracebacks are colored by the kernel
+ANSI_ESCAPE = re.compile(r'\x1b\[[0-9;]*m')
+# runs in the container, so it only uses the Python and Jupyter packages of the workshop image
+RUNNER = r'''
+import datetime, json, signal, sys
+import nbformat
+from nbclient import NotebookClient
+
+path, timeout, MARKER = sys.argv[1], int(sys.argv[2]), sys.argv[3]
+notebook = nbformat.read(path, as_version=4)
+
+def expire(signum, frame):
+    raise TimeoutError(f"timed out after {timeout}s")
+
+signal.signal(signal.SIGALRM, expire)
+signal.alarm(timeout)
+error = None
+try:
+    NotebookClient(notebook, timeout=timeout, resources={"metadata": {"path": "."}}).execute()
+except BaseException as e:
+    error = f"{type(e).__name__}: {e}"
+signal.alarm(0)
+
+def parse(stamp):
+    return datetime.datetime.fromisoformat(stamp.replace("Z", "+00:00"))
+
+cells, failed_cell = [], None
+for index, cell in enumerate(notebook.cells, start=1):
+    if cell.cell_type != "code":
+        continue
+    timing = cell.get("metadata", {}).get("execution", {})
+    start, end = timing.get("iopub.execute_input"), timing.get("shell.execute_reply")
+    if start and end:
+        cells.append([index, (parse(end) - parse(start)).total_seconds()])
+    if failed_cell is None and any(output.get("output_type") == "error" for output in cell.get("outputs", [])):
+        failed_cell = index
+print(MARKER + json.dumps({"cells": cells, "error": error, "failed_cell": failed_cell}))
+'''
+
+
+class NotebookPlan(NamedTuple):
+    """How a notebook is executed.
+
+    Attributes:
+        path: The notebook, relative to the project root.
+        depends_on: The notebooks that must pass before it, relative to the project root.
+        timeout: Seconds the notebook may run.
+        profiles: The compose profiles whose services the notebook needs. Empty if it
+            only needs the services that always run.
+        gpu: Whether the notebook needs a GPU.
+    """
+    path: str
+    depends_on: list[str]
+    timeout: int
+    profiles: list[str]
+    gpu: bool
+
+
+class NotebookRun(NamedTuple):
+    """The outcome of executing a notebook.
+
+    Attributes:
+        path: The notebook, relative to the project root.
+        status: `passed`, `failed`, `skipped` or `cached`.
+        time: Seconds the notebook ran.
+        cells: (cell number, seconds) of every executed code cell.
+        message: Why the notebook failed or was skipped.
+        details: The full error of a failed notebook.
+    """
+    path: str
+    status: str
+    time: float
+    cells: list[tuple[int, float]]
+    message: str = ''
+    details: str = ''
+
+    def test_case(self) -> TestCase:
+        """Convert the outcome to a JUnit test result."""
+        output = "\n".join(f"cell {index}: {seconds:.2f}s" for index, seconds in self.cells)
+        failures = [self.message, self.details] if self.status == 'failed' else []
+        skipped = self.message if self.status == 'skipped' else None
+        return TestCase(self.path, self.time, [failure for failure in failures if failure], skipped, output)
+
+
+def read_plan(path: Path, default_timeout: int) -> NotebookPlan:
+    """Read how a notebook is executed from its `devx` metadata.
+
+    Args:
+        path: The notebook, relative to the project root.
+        default_timeout: Seconds a notebook may run when it does not declare a timeout.
+
+    Raises:
+        ValueError: If the notebook cannot be read.
+    """
+    try:
+        notebook = json.loads(path.read_text(encoding='utf-8'))
+        metadata = (notebook.get('metadata') or {}).get(METADATA_KEY) or {}
+    except (OSError, ValueError, AttributeError) as e:
+        raise ValueError(f"{path} cannot be read: {e}") from e
+
+    directory = posixpath.dirname(path.as_posix())
+    return NotebookPlan(
+        path.as_posix(),
+        [posixpath.normpath(posixpath.join(directory, dependency)) for dependency in metadata.get('depends_on') or []],
+        int(metadata.get('timeout') or default_timeout),
+        list(metadata.get('profiles') or []),
+        bool(metadata.get('gpu')),
+    )
+
+
+def _dependency_groups(plans: dict[str, NotebookPlan]) -> list[list[str]]:
+    """Group notebooks that depend on each other, directly or not, so they run in the same shard."""
+    parents = {path: path for path in plans}
+
+    def find(path: str) -> str:
+        while parents[path] != path:
+            parents[path] = parents[parents[path]]
+            path = parents[path]
+        return path
+
+    for plan in plans.values():
+        for dependency in plan.depends_on:
+            if dependency in plans:
+                parents[find(plan.path)] = find(dependency)
+    groups: dict[str, list[str]] = {}
+    for path in plans:
+        groups.setdefault(find(path), []).append(path)
+    return list(groups.values())
+
+
+def shard(plans: dict[str, NotebookPlan], index: int, count: int) -> set[str]:
+    """Select the notebooks of one shard, for splitting the execution across CI jobs.
+
+    Notebooks that depend on each other stay in the same shard. The largest groups are
+    assigned first, each to the shard with the fewest notebooks so far. The assignment
+    only depends on the notebooks, so every CI job computes the same shards.
+
+    Args:
+        plans: Every notebook.
+        index: The shard to select, from 1 to count.
+        count: The number of shards.
+
+    Returns:
+        The notebooks of the shard.
+    """
+    loads = [0] * count
+    selected = set()
+    for group in sorted(_dependency_groups(plans), key=lambda group: (-len(group), sorted(group))):
+        target = loads.index(min(loads))
+        loads[target] += len(group)
+        if target == index - 1:
+            selected.update(group)
+    return selected
+
+
+def _load_cache() -> dict:
+    """Load the cached passing runs."""
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f).get('results', {})
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_cache(results: dict) -> None:
+    """Cache the passing runs."""
+    if not DEVX_DIR.is_dir():
+        return
+    with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump({"results": results}, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def cache_keys(plans: dict[str, NotebookPlan], image: str, cpu_only: bool) -> dict[str, str]:
+    """Key every notebook by its content, the keys of its dependencies and the workshop image.
+
+    Notebooks in a dependency cycle, or that depend on missing notebooks, get no key.
+    """
+    keys: dict[str, str] = {}
+    visiting = set()
+
+    def key(path: str) -> Optional[str]:
+        if path in keys:
+            return keys[path]
+        if path in visiting or path not in plans:
+            return None
+        visiting.add(path)
+        dependencies = [key(dependency) for dependency in plans[path].depends_on]
+        visiting.discard(path)
+        if any(dependency is None for dependency in dependencies):
+            return None
+        digest = hashlib.sha256(Path(path).read_bytes())
+        for part in (image, str(cpu_only), *dependencies):
+            digest.update(part.encode())
+        keys[path] = digest.hexdigest()
+        return keys[path]
+
+    for path in plans:
+        key(path)
+    return keys
+
+
+def running_container() -> tuple[str, str]:
+    """Find the running `devx` container of the workshop.
+
+    Returns:
+        Tuple of (container ID, image ID).
+
+    Raises:
+        DockerError: If the workshop is not running.
+    """
+    # imported here so that planning the execution does not depend on the compose machinery
+    from devx.run import containers  # pylint: disable=import-outside-toplevel
+
+    for container in containers():
+        if container['service'] == DEVX_SERVICE and container['state'] == 'running':
+            return container['id'], image_id(container['image']) or container['image']
+    raise DockerError("The workshop is not running, start it with `devx workshop start`")
+
+
+def execute_notebook(container: str, plan: NotebookPlan, cpu_only: bool = False) -> NotebookRun:
+    """Execute one notebook in the workshop container.
+
+    The notebook runs in its own directory and is not modified.
+
+    Args:
+        container: The ID of the `devx` container.
+        plan: How the notebook is executed.
+        cpu_only: Whether to hide the GPUs from the notebook.
+
+    Returns:
+        The outcome, with the duration of every executed cell.
+    """
+    directory, name = posixpath.split(plan.path)
+    cmd = ['docker', 'exec', '-w', posixpath.join(CONTAINER_PROJECT_DIR, directory)]
+    if cpu_only:
+        cmd.extend(['-e', 'CUDA_VISIBLE_DEVICES='])
+    cmd += [
+        container, 'timeout', '-s', 'KILL', str(plan.timeout + KILL_GRACE),
+        'python', '-c', RUNNER, name, str(plan.timeout), RESULT_MARKER,
+    ]
+
+    started = time.monotonic()
+    try:
+        process = subprocess.run(cmd, capture_output=True, text=True, timeout=plan.timeout + 2 * KILL_GRACE)
+    except subprocess.TimeoutExpired:
+        return NotebookRun(plan.path, 'failed', time.monotonic() - started, [], f"timed out after {plan.timeout}s")
+    except FileNotFoundError:
+        return NotebookRun(plan.path, 'failed', 0.0, [], "The docker CLI is not installed")
+    elapsed = time.monotonic() - started
+
+    lines = [line for line in process.stdout.splitlines() if line.startswith(RESULT_MARKER)]
+    if not lines:
+        stderr = process.stderr.strip()
+        message = f"timed out after {plan.timeout}s" if process.returncode in (124, 137) else "the runner failed"
+        return NotebookRun(plan.path, 'failed', elapsed, [], message, stderr)
+
+    result = json.loads(lines[-1][len(RESULT_MARKER):])
+    cells = [(index, seconds) for index, seconds in result['cells']]
+    if not result['error']:
+        return NotebookRun(plan.path, 'passed', elapsed, cells)
+    error = ANSI_ESCAPE.sub('', result['error'])
+    error_lines = [line for line in error.splitlines() if line.strip()]
+    message = error_lines[-1] if error_lines else error
+    if result['failed_cell']:
+        message = f"cell {result['failed_cell']}: {message}"
+    return NotebookRun(plan.path, 'failed', elapsed, cells, message, error)
+
+
+def _skip_reason(plan: NotebookPlan, profiles: list[str], cpu_only: bool) -> Optional[str]:
+    """Explain why a notebook cannot run with the given profiles, or None if it can."""
+    if cpu_only and plan.gpu:
+        return "needs a GPU"
+    if plan.profiles and not set(plan.profiles) & set(profiles):
+        return f"needs the {' or '.join(plan.profiles)} profile"
+    return None
+
+
+def _cached_notebooks(
+    plans: dict[str, NotebookPlan], cache: dict, keys: dict[str, str], profiles: list[str], cpu_only: bool
+) -> list[str]:
+    """Find the notebooks whose passing run can be reused.
+
+    A notebook that executes needs the side effects of the notebooks it depends on, such
+    as downloaded data or installed packages, in the container. So the dependencies of a
+    notebook that executes are executed too, even when their runs are cached.
+
+    Returns:
+        The notebooks to take from the cache.
+    """
+    cached = {
+        path for path in plans
+        if path in keys and (cache.get(path) or {}).get('key') == keys[path]
+    }
+    executing = [
+        path for path in plans if path not in cached and not _skip_reason(plans[path], profiles, cpu_only)
+    ]
+    while executing:
+        for dependency in plans[executing.pop()].depends_on:
+            if dependency in cached:
+                cached.discard(dependency)
+                executing.append(dependency)
+    return [path for path in plans if path in cached]
+
+
+# pylint: disable-next=too-many-locals
+def execute_notebooks(
+    container: str,
+    plans: dict[str, NotebookPlan],
+    profiles: Optional[list[str]] = None,
+    cpu_only: bool = False,
+    keys: Optional[dict[str, str]] = None,
+    jobs: int = 2,
+    on_result=None,
+) -> dict[str, NotebookRun]:
+    """Execute notebooks in parallel, each one after the notebooks it depends on.
+
+    Notebooks whose cache key matches a passing run are not executed again, unless a
+    notebook that depends on them executes. Notebooks that depend on a notebook that
+    failed or was skipped are skipped.
+
+    Args:
+        container: The ID of the `devx` container.
+        plans: The notebooks to execute.
+        profiles: The compose profiles that are running.
+        cpu_only: Whether to hide the GPUs and skip the notebooks that need one.
+        keys: The cache key of every notebook, or None to execute every notebook.
+        jobs: The maximum number of notebooks to execute at once.
+        on_result: Called with every outcome as soon as it is known.
+
+    Returns:
+        Mapping of notebook to its outcome, for every planned notebook.
+    """
+    cache = _load_cache() if keys is not None else {}
+    done: dict[str, NotebookRun] = {}
+
+    def finish(outcome: NotebookRun) -> None:
+        done[outcome.path] = outcome
+        if on_result:
+            on_result(outcome)
+
+    pending = list(plans)
+    for path in _cached_notebooks(plans, cache, keys or {}, profiles or [], cpu_only):
+        pending.remove(path)
+        cached = cache[path]
+        finish(NotebookRun(path, 'cached', cached['time'], [tuple(cell) for cell in cached['cells']]))
+
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        running = {}
+        while pending or running:
+            for path in list(pending):
+                plan = plans[path]
+                missing = [dependency for dependency in plan.depends_on if dependency not in plans]
+                if missing:
+                    pending.remove(path)
+                    finish(NotebookRun(path, 'failed', 0.0, [], f"depends on missing {', '.join(missing)}"))
+                    continue
+                if not all(dependency in done for dependency in plan.depends_on):
+                    continue
+                pending.remove(path)
+                blocked = [
+                    dependency for dependency in plan.depends_on if done[dependency].status not in ('passed', 'cached')
+                ]
+                if blocked:
+                    reason = f"{', '.join(blocked)} did not pass"
+                else:
+                    reason = _skip_reason(plan, profiles or [], cpu_only)
+                if reason:
+                    finish(NotebookRun(path, 'skipped', 0.0, [], reason))
+                    continue
+                running[executor.submit(execute_notebook, container, plan, cpu_only)] = path
+
+            if not running:
+                # whatever is left waits on itself
+                for path in pending:
+                    finish(NotebookRun(path, 'failed', 0.0, [], "is part of a dependency cycle"))
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                running.pop(future)
+                finish(future.result())
+
+    if keys is not None:
+        cache = {path: entry for path, entry in cache.items() if Path(path).exists()}
+        cache.update({
+            path: {"key": keys[path], "time": outcome.time, "cells": outcome.cells}
+            for path, outcome in done.items() if outcome.status == 'passed' and path in keys
+        })
+        _save_cache(cache)
+    return {path: done[path] for path in plans}
+
+
+def _report(outcome: NotebookRun, show_cells: bool) -> None:
+    """Print the outcome of a notebook."""
+    if outcome.status == 'failed':
+        print(f"❌ {outcome.path}: {outcome.message} ({outcome.time:.1f}s)")
+    elif outcome.status == 'skipped':
+        print(f"➖ {outcome.path} skipped, {outcome.message}")
+    else:
+        slowest = max(outcome.cells, key=lambda cell: cell[1], default=None)
+        note = f", slowest cell {slowest[0]} took {slowest[1]:.1f}s" if slowest else ""
+        cached = " (cached)" if outcome.status == 'cached' else ""
+        print(f"✅ {outcome.path} {outcome.time:.1f}s{note}{cached}")
+    if show_cells:
+        for index, seconds in outcome.cells:
+            print(f"    cell {index}: {seconds:.2f}s")
+
+
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments,too-many-locals
+def test_execute(
+    paths: Optional[list[Path]] = None,
+    profiles: Optional[list[str]] = None,
+    cpu_only: bool = False,
+    jobs: int = 2,
+    shard_spec: Optional[tuple[int, int]] = None,
+    junit: Optional[Path] = None,
+    use_cache: bool = True,
+    show_cells: bool = False,
+) -> int:
+    """Execute the workshop notebooks in the running workshop and report the outcome.
+
+    Args:
+        paths: The notebooks to execute. Defaults to every notebook of the project.
+        profiles: The compose profiles that are running.
+        cpu_only: Whether to hide the GPUs and skip the notebooks that need one.
+        jobs: The maximum number of notebooks to execute at once.
+        shard_spec: (index, count) to only execute one shard of the notebooks.
+        junit: Path of a JUnit XML report to write.
+        use_cache: Whether to skip the notebooks that passed and did not change since.
+        show_cells: Whether to print the duration of every cell.
+
+    Returns:
+        The number of notebooks that failed.
+
+    Raises:
+        DockerError: If the workshop is not running.
+        ValueError: If a notebook cannot be read.
+    """
+    # imported here to keep pydantic out of the execution path
+    from devx.junit import write_junit  # pylint: disable=import-outside-toplevel
+    from devx.models import TestSettings  # pylint: disable=import-outside-toplevel
+    from devx.notebooks import find_notebooks  # pylint: disable=import-outside-toplevel
+
+    settings = TestSettings()
+    notebooks = find_notebooks(settings.exclude)
+    plans = {plan.path: plan for plan in (read_plan(path, settings.timeout) for path in notebooks)}
+    if paths:
+        # the notebooks given are executed along with everything they depend on
+        selected = {path.as_posix() for path in paths}
+        for path in paths:
+            if path.as_posix() not in plans:
+                plans[path.as_posix()] = read_plan(path, settings.timeout)
+        stack = list(selected)
+        while stack:
+            for dependency in plans[stack.pop()].depends_on:
+                if dependency in plans and dependency not in selected:
+                    selected.add(dependency)
+                    stack.append(dependency)
+        plans = {path: plan for path, plan in plans.items() if path in selected}
+    if shard_spec:
+        selected = shard(plans, shard_spec[0], shard_spec[1])
+        plans = {path: plan for path, plan in plans.items() if path in selected}
+    if not plans:
+        print("No notebooks to execute.")
+        return 0
+
+    container, image = running_container()
+    keys = cache_keys(plans, image, cpu_only) if use_cache else None
+    shard_note = f" (shard {shard_spec[0]}/{shard_spec[1]})" if shard_spec else ""
+    print(f"▶️  Executing {len(plans)} notebook(s), {jobs} at a time{shard_note}...")
+    started = time.monotonic()
+    outcomes = execute_notebooks(
+        container, plans, profiles, cpu_only, keys, jobs, lambda outcome: _report(outcome, show_cells)
+    )
+
+    counts = {status: 0 for status in ('passed', 'cached', 'skipped', 'failed')}
+    for outcome in outcomes.values():
+        counts[outcome.status] += 1
+    print(
+        f"📋 {counts['passed']} passed, {counts['cached']} unchanged, {counts['skipped']} skipped, "
+        f"{counts['failed']} failed in {time.monotonic() - started:.1f}s"
+    )
+    if junit:
+        write_junit(junit, 'notebook-execution', [outcome.test_case() for outcome in outcomes.values()])
+        print(f"📝 JUnit report written to {junit}")
+    return counts['failed']
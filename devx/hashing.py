@@ -0,0 +1,25 @@
+"""Content hashes of the files devx caches its work by."""
+
+import hashlib
+from pathlib import Path
+from typing import Optional
+
+
+def hash_bytes(data: bytes) -> str:
+    """Return the hex sha256 digest of some bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path: Path) -> Optional[str]:
+    """Hash the contents of a file.
+
+    Args:
+        path: Path to the file.
+
+    Returns:
+        The hex sha256 digest of the file, or None if the file does not exist.
+    """
+    try:
+        return hash_bytes(path.read_bytes())
+    except FileNotFoundError:
+        return None
@@ -1,11 +1,18 @@
 """Workshop repository initialization functionality."""
 
+import hashlib
+import json
 import shutil
 import sys
 import tempfile
+import time
+import urllib.error
 import urllib.request
 import zipfile
-from pathlib import Path
+from pathlib import Path, PurePosixPath
+from typing import Optional
+
+from devx.constants import USER_CACHE_DIR
 
 # Directories to copy from template
 TEMPLATE_DIRS = [
@@ -25,36 +32,189 @@ TEMPLATE_FILES = [
 
 TEMPLATE_REPO = ("https://github.com/rmkraus/workshop-framework/archive/refs/heads/main.zip", "templates")
 
+# Content addressed template cache
+TEMPLATE_CACHE_DIR = USER_CACHE_DIR / "templates"
+TEMPLATE_CACHE_INDEX = TEMPLATE_CACHE_DIR / "index.json"
+DOWNLOAD_TIMEOUT = 30
+CHUNK_SIZE = 1024 * 1024
+
+
+def _load_cache_index() -> dict:
+    """Load the template cache index.
+
+    Returns:
+        Mapping of source URL to its cache entry.
+    """
+    try:
+        with open(TEMPLATE_CACHE_INDEX, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _write_cache_index(index: dict) -> None:
+    """Write the template cache index.
+
+    Args:
+        index: Mapping of source URL to its cache entry.
+    """
+    TEMPLATE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = TEMPLATE_CACHE_INDEX.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+    tmp_path.replace(TEMPLATE_CACHE_INDEX)
+
+
+def _archive_path(digest: str) -> Path:
+    """Get the cache path of an archive by content digest."""
+    return TEMPLATE_CACHE_DIR / "archives" / f"{digest}.zip"
+
 
-def download_template(url: str, dest: Path) -> None:
-    """Download the template zip file.
+def _template_path(digest: str) -> Path:
+    """Get the cache path of an extracted template by content digest."""
+    return TEMPLATE_CACHE_DIR / "objects" / digest
+
+
+def download_template(url: str, entry: dict) -> dict:
+    """Download the template archive unless the cached copy is still current.
+
+    The request is revalidated with the ETag and Last-Modified values of the cached
+    archive, and the archive is streamed into the cache under its sha256 digest.
 
     Args:
         url: URL of the template zip file.
-        dest: Path to save the zip file to.
+        entry: The cache entry for the URL. Empty if it has never been downloaded.
+
+    Returns:
+        The updated cache entry.
     """
+    headers = {"User-Agent": "devx-cli"}
+    if entry.get("archive") and _archive_path(entry["archive"]).exists():
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
     print(f"📥 Downloading template from {url}...")
-    urllib.request.urlretrieve(url, dest)
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        response = urllib.request.urlopen(request, timeout=DOWNLOAD_TIMEOUT)  # pylint: disable=consider-using-with
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            print("✅ Cached template is up to date")
+            return entry
+        raise
+
+    archive_dir = TEMPLATE_CACHE_DIR / "archives"
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    with response, tempfile.NamedTemporaryFile(dir=archive_dir, suffix=".part", delete=False) as f:
+        tmp_path = Path(f.name)
+        try:
+            while chunk := response.read(CHUNK_SIZE):
+                digest.update(chunk)
+                f.write(chunk)
+        except BaseException:
+            tmp_path.unlink()
+            raise
+    tmp_path.replace(_archive_path(digest.hexdigest()))
+
+    templates = entry.get("templates", {}) if entry.get("archive") == digest.hexdigest() else {}
+    return {
+        "archive": digest.hexdigest(),
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "fetched": int(time.time()),
+        "templates": templates,
+    }
+
+
+def _archive_prefix(zip_ref: zipfile.ZipFile) -> str:
+    """Get the path of the templates directory inside the archive."""
+    root = zip_ref.namelist()[0].split("/")[0]
+    return f"{root}/{TEMPLATE_REPO[1]}/"
+
+
+def list_archive_templates(archive: Path) -> list[str]:
+    """List the templates contained in a cached archive.
 
+    Args:
+        archive: Path to the zip file.
 
-def extract_template(zip_path: Path, dest: Path) -> None:
-    """Extract the template zip file.
+    Returns:
+        The sorted template names.
+    """
+    with zipfile.ZipFile(archive, "r") as zip_ref:
+        prefix = _archive_prefix(zip_ref)
+        return sorted({
+            name[len(prefix):].split("/")[0]
+            for name in zip_ref.namelist()
+            if name.startswith(prefix) and "/" in name[len(prefix):]
+        })
+
+
+def extract_template(zip_path: Path, template_name: str) -> str:
+    """Extract a single template from the archive into the cache.
+
+    Only the members of the selected template are read, each one is streamed to disk.
+    The extracted tree is stored under the digest of its contents.
 
     Args:
         zip_path: Path to the zip file.
-        dest: Path to extract to.
-    """
-    print("📦 Extracting template...")
-    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-        zip_ref.extractall(dest)
+        template_name: Name of the template to extract.
 
+    Returns:
+        The content digest of the extracted template.
 
-def find_template_dir(extracted_dir: Path, template_name: str) -> Path:
-    """Find the template directory in the extracted files.
+    Raises:
+        SystemExit: If the template is not in the archive.
+    """
+    print("📦 Extracting template...")
+    objects_dir = TEMPLATE_CACHE_DIR / "objects"
+    objects_dir.mkdir(parents=True, exist_ok=True)
+    tree_digest = hashlib.sha256()
+
+    with (
+        zipfile.ZipFile(zip_path, "r") as zip_ref,
+        tempfile.TemporaryDirectory(dir=objects_dir, ignore_cleanup_errors=True) as temp_dir,
+    ):
+        prefix = f"{_archive_prefix(zip_ref)}{template_name}/"
+        members = sorted(
+            (info for info in zip_ref.infolist() if info.filename.startswith(prefix) and not info.is_dir()),
+            key=lambda info: info.filename,
+        )
+        if not members:
+            print(f"❌ Template not found: {template_name}")
+            sys.exit(1)
+
+        for info in members:
+            relative = PurePosixPath(info.filename[len(prefix):])
+            if relative.is_absolute() or ".." in relative.parts:
+                continue
+            target = Path(temp_dir, *relative.parts)
+            target.parent.mkdir(parents=True, exist_ok=True)
+
+            file_digest = hashlib.sha256()
+            with zip_ref.open(info) as src, open(target, "wb") as dst:
+                while chunk := src.read(CHUNK_SIZE):
+                    file_digest.update(chunk)
+                    dst.write(chunk)
+            tree_digest.update(f"{relative}\0{file_digest.hexdigest()}\n".encode("utf-8"))
+
+        digest = tree_digest.hexdigest()
+        if not _template_path(digest).exists():
+            Path(temp_dir).rename(_template_path(digest))
+
+    return digest
+
+
+def find_template_dir(template_name: str, offline: bool, template_dir: Optional[Path] = None) -> Path:
+    """Find the template directory, downloading it into the cache when needed.
 
     Args:
-        extracted_dir: Path to the extracted directory.
         template_name: Name of the template to find.
+        offline: Whether to only use the cache.
+        template_dir: Local directory containing templates to use instead of the cache.
 
     Returns:
         Path to the template directory.
@@ -62,11 +222,57 @@ def find_template_dir(extracted_dir: Path, template_name: str) -> Path:
     Raises:
         SystemExit: If template directory is not found.
     """
-    template_dir = next(extracted_dir.glob("*/")) / TEMPLATE_REPO[1] / template_name
-    if not template_dir.exists():
-        print(f"❌ Template not found: {template_name}")
-        sys.exit(1)
-    return template_dir
+    if template_dir is not None:
+        local_dir = template_dir / template_name
+        if not local_dir.is_dir():
+            print(f"❌ Template not found: {local_dir}")
+            sys.exit(1)
+        return local_dir
+
+    url = TEMPLATE_REPO[0]
+    index = _load_cache_index()
+    entry = index.get(url, {})
+
+    if not offline:
+        try:
+            entry = download_template(url, entry)
+        except (urllib.error.URLError, OSError) as e:
+            if not entry.get("archive"):
+                print(f"❌ Failed to download template: {e}")
+                sys.exit(1)
+            print(f"⚠️  Failed to download template ({e}), using the cached copy")
+
+    archive = _archive_path(entry["archive"]) if entry.get("archive") else None
+    digest = entry.get("templates", {}).get(template_name)
+    if digest is None or not _template_path(digest).is_dir():
+        if archive is None or not archive.exists():
+            print(f"❌ Template not cached: {template_name}. Run without --offline or use --template-dir.")
+            sys.exit(1)
+        digest = extract_template(archive, template_name)
+        entry.setdefault("templates", {})[template_name] = digest
+
+    index[url] = entry
+    _write_cache_index(index)
+    return _template_path(digest)
+
+
+def list_templates() -> None:
+    """List the templates in the local cache."""
+    index = _load_cache_index()
+    if not index:
+        print("No cached templates. Run `devx devel init` to populate the cache.")
+        return
+
+    for url, entry in index.items():
+        fetched = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry.get("fetched", 0)))
+        print(f"📦 {url} (fetched {fetched})")
+        extracted = entry.get("templates", {})
+        archive = _archive_path(entry["archive"]) if entry.get("archive") else None
+        names = list_archive_templates(archive) if archive and archive.exists() else sorted(extracted)
+        for name in names:
+            digest = extracted.get(name)
+            status = f"extracted {digest[:12]}" if digest and _template_path(digest).is_dir() else "in archive"
+            print(f"  - {name} ({status})")
 
 
 def copy_directory(src: Path, dest: Path, force: bool) -> None:
@@ -116,24 +322,15 @@ def init(args) -> None:
     """
     print("🚀 Initializing workshop repository...")
 
-    # Create temporary directory for downloading and extracting
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_path = Path(temp_dir)
-        zip_path = temp_path / "template.zip"
-
-        # Download and extract template
-        download_template(TEMPLATE_REPO[0], zip_path)
-        extract_template(zip_path, temp_path)
-
-        # Find and validate template directory
-        template_dir = find_template_dir(temp_path, args.template)
+    # Find and validate template directory
+    template_dir = find_template_dir(args.template, args.offline, args.template_dir)
 
-        # Copy directories from template
-        for dir_name in TEMPLATE_DIRS:
-            copy_directory(template_dir / dir_name, Path(dir_name), args.force)
+    # Copy directories from template
+    for dir_name in TEMPLATE_DIRS:
+        copy_directory(template_dir / dir_name, Path(dir_name), args.force)
 
-        # Copy additional files from template
-        for file_name in TEMPLATE_FILES:
-            copy_file(template_dir / file_name, Path(file_name), args.force)
+    # Copy additional files from template
+    for file_name in TEMPLATE_FILES:
+        copy_file(template_dir / file_name, Path(file_name), args.force)
 
     print("\n✅ Workshop repository initialized!")
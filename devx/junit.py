@@ -0,0 +1,55 @@
+"""Write workshop test results as JUnit XML, the report format CI systems display."""
+
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+
+class TestCase(NamedTuple):
+    """The result of one workshop test.
+
+    Attributes:
+        name: The name of the test, usually the tested file.
+        time: Seconds the test took.
+        failures: The problems found. Empty if the test passed.
+        skipped: Why the test was skipped, or None if it ran.
+        output: Additional output to attach to the test.
+    """
+    name: str
+    time: float
+    failures: list[str]
+    skipped: Optional[str] = None
+    output: str = ''
+
+
+def write_junit(path: Path, suite: str, cases: list[TestCase]) -> None:
+    """Write test results to a JUnit XML file.
+
+    Args:
+        path: The report file.
+        suite: The name of the test suite, also used as the class name of every test.
+        cases: The test results.
+    """
+    element = ET.Element(
+        'testsuite',
+        name=suite,
+        tests=str(len(cases)),
+        failures=str(sum(1 for case in cases if case.failures)),
+        skipped=str(sum(1 for case in cases if case.skipped)),
+        time=f"{sum(case.time for case in cases):.3f}",
+    )
+    for case in cases:
+        testcase = ET.SubElement(element, 'testcase', classname=suite, name=case.name, time=f"{case.time:.3f}")
+        if case.failures:
+            failure = ET.SubElement(testcase, 'failure', message=case.failures[0])
+            failure.text = "\n".join(case.failures)
+        elif case.skipped:
+            ET.SubElement(testcase, 'skipped', message=case.skipped)
+        if case.output:
+            ET.SubElement(testcase, 'system-out').text = case.output
+
+    root = ET.Element('testsuites')
+    root.append(element)
+    ET.indent(root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    ET.ElementTree(root).write(path, encoding='utf-8', xml_declaration=True)
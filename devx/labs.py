@@ -0,0 +1,296 @@
+"""Fleet operations for Brev workspaces deployed from the workshop's launchables.
+
+Workspace listings are cached per organization in the user cache directory, so that
+repeated commands do not page through every workspace in the org. Actions run
+concurrently on a bounded thread pool and stream each workspace's state changes as
+they are observed.
+
+These commands are experimental. The Brev workspace endpoints and response fields
+they rely on follow the Brev CLI and are not part of a documented API, so a failure
+on one workspace is recorded as that workspace's error instead of aborting the run.
+"""
+
+import json
+import queue
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+
+from devx.brev import BrevAPIError, BrevClient
+from devx.constants import USER_CACHE_DIR
+from devx.publish import load_publish_state
+
+LABS_CACHE_DIR = USER_CACHE_DIR / "labs"
+INVENTORY_TTL = 300
+POLL_INTERVAL = 10
+DELETED = "DELETED"
+
+# Brev client call and the states that complete each action
+ACTIONS: dict[str, tuple[Callable[[BrevClient, str], dict], set[str]]] = {
+    "start": (BrevClient.start_workspace, {"RUNNING"}),
+    "stop": (BrevClient.stop_workspace, {"STOPPED"}),
+    "delete": (BrevClient.delete_workspace, {DELETED}),
+}
+FAILED_STATES = {"FAILURE", "FAILED", "ERROR"}
+
+
+def _log(message: str, as_json: bool) -> None:
+    """Print progress, on stderr when stdout is reserved for JSON output."""
+    print(message, file=sys.stderr if as_json else sys.stdout, flush=True)
+
+
+def _launchable_id(workspace: dict) -> Optional[str]:
+    """Get the ID of the launchable a workspace was deployed from."""
+    for key in ("launchableId", "launchableID", "launchable_id"):
+        if workspace.get(key):
+            return workspace[key]
+    return (workspace.get("launchable") or {}).get("id")
+
+
+def summarize(workspace: dict) -> dict:
+    """Reduce a Brev workspace to the fields devx reports.
+
+    Args:
+        workspace: The workspace returned by the Brev API.
+
+    Returns:
+        The workspace summary.
+    """
+    return {
+        "id": workspace.get("id"),
+        "name": workspace.get("name"),
+        "status": workspace.get("status"),
+        "health": workspace.get("healthStatus"),
+        "instance_type": workspace.get("instanceType"),
+        "launchable": _launchable_id(workspace),
+        "url": workspace.get("dns"),
+    }
+
+
+def recorded_launchables(org_id: str) -> list[str]:
+    """Get the IDs of the launchables this workshop published to an organization.
+
+    Args:
+        org_id: The organization ID.
+
+    Returns:
+        The launchable IDs recorded in `.devx/launchables.json`.
+    """
+    return [entry["id"] for entry in load_publish_state().get(org_id, {}).values() if entry.get("id")]
+
+
+def _inventory_path(org_id: str) -> Path:
+    """Get the inventory cache file of an organization."""
+    return LABS_CACHE_DIR / f"{org_id}.json"
+
+
+def load_inventory(client: BrevClient, launchables: list[str], refresh: bool = False) -> list[dict]:
+    """Get the workspaces deployed from the given launchables.
+
+    Args:
+        client: The Brev API client.
+        launchables: The launchable IDs to select workspaces for.
+        refresh: Whether to ignore the cached inventory.
+
+    Returns:
+        The workspace summaries.
+    """
+    path = _inventory_path(client.org_id)
+    inventory = None
+    if not refresh:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+            if time.time() - cache.get("fetched", 0) < INVENTORY_TTL:
+                inventory = cache["workspaces"]
+        except (OSError, json.JSONDecodeError, KeyError):
+            inventory = None
+
+    if inventory is None:
+        inventory = [summarize(workspace) for workspace in client.list_workspaces()]
+        save_inventory(client.org_id, inventory)
+
+    return [workspace for workspace in inventory if workspace["launchable"] in launchables]
+
+
+def save_inventory(org_id: str, inventory: list[dict], updates: Optional[dict[str, dict]] = None) -> None:
+    """Write the inventory cache of an organization.
+
+    Args:
+        org_id: The organization ID.
+        inventory: The workspace summaries.
+        updates: Workspace summaries by ID to merge into the cached inventory instead
+            of replacing it.
+    """
+    path = _inventory_path(org_id)
+    fetched = time.time()
+    if updates is not None:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        fetched = cache.get("fetched", 0)
+        inventory = [
+            updates.get(workspace["id"], workspace) for workspace in cache.get("workspaces", [])
+        ]
+        inventory = [workspace for workspace in inventory if workspace.get("status") != DELETED]
+
+    try:
+        LABS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"fetched": fetched, "workspaces": inventory}, f)
+    except OSError:
+        pass
+
+
+def _watch(
+    client: BrevClient,
+    workspace: dict,
+    action: Optional[str],
+    wait: bool,
+    timeout: float,
+    events: "queue.Queue[tuple[str, str]]",
+) -> dict:
+    """Run an action on one workspace and report its state changes.
+
+    Args:
+        client: The Brev API client.
+        workspace: The workspace summary.
+        action: The action to run, or None to only fetch the current state.
+        wait: Whether to wait until the action completes.
+        timeout: Seconds to wait for the action to complete.
+        events: Queue receiving (workspace ID, status) on every observed change.
+
+    Returns:
+        The final workspace summary.
+
+    Raises:
+        BrevAPIError: If an API call fails or the workspace does not reach the target state.
+    """
+    workspace_id = workspace["id"]
+    status = workspace.get("status")
+    done = set()
+
+    if action:
+        call, done = ACTIONS[action]
+        call(client, workspace_id)
+    if not action or wait:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                workspace = summarize(client.get_workspace(workspace_id))
+            except BrevAPIError as e:
+                if e.status != 404:
+                    raise
+                workspace = {**workspace, "status": DELETED}
+            if workspace["status"] != status:
+                status = workspace["status"]
+                events.put((workspace_id, status))
+            if not action or status in done:
+                return workspace
+            if status in FAILED_STATES:
+                raise BrevAPIError(f"workspace entered state {status}", method=action, path=workspace_id)
+            if time.monotonic() > deadline:
+                raise BrevAPIError(f"timed out in state {status}", method=action, path=workspace_id)
+            time.sleep(POLL_INTERVAL)
+
+    return workspace
+
+
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments,too-many-locals
+def run(
+    client: BrevClient,
+    workspaces: list[dict],
+    action: Optional[str],
+    jobs: int = 8,
+    wait: bool = True,
+    timeout: float = 1800,
+    as_json: bool = False,
+) -> list[dict]:
+    """Run an action on many workspaces concurrently, streaming state changes.
+
+    Args:
+        client: The Brev API client.
+        workspaces: The workspace summaries to act on.
+        action: One of `start`, `stop` or `delete`, or None to refresh the state only.
+        jobs: The maximum number of workspaces to act on at once.
+        wait: Whether to wait until every action completes.
+        timeout: Seconds to wait for each action to complete.
+        as_json: Whether stdout is reserved for JSON output.
+
+    Returns:
+        One result per workspace with its final summary and any error.
+    """
+    names = {workspace["id"]: workspace["name"] or workspace["id"] for workspace in workspaces}
+    events: "queue.Queue[tuple[str, str]]" = queue.Queue()
+    results = []
+
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        futures = {
+            executor.submit(_watch, client, workspace, action, wait, timeout, events): workspace
+            for workspace in workspaces
+        }
+        pending = set(futures)
+        while pending or not events.empty():
+            try:
+                workspace_id, status = events.get(timeout=0.2)
+                if action:
+                    _log(f"🔄 {names[workspace_id]}: {status}", as_json)
+            except queue.Empty:
+                pass
+
+            for future in [future for future in pending if future.done()]:
+                pending.remove(future)
+                workspace = futures[future]
+                try:
+                    results.append({**future.result(), "error": None})
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    _log(f"❌ {names[workspace['id']]}: {e}", as_json)
+                    results.append({**workspace, "error": str(e)})
+
+    save_inventory(client.org_id, [], updates={result["id"]: _without_error(result) for result in results})
+    return sorted(results, key=lambda result: result["name"] or "")
+
+
+def _without_error(result: dict) -> dict:
+    """Strip the error field from an action result."""
+    return {key: value for key, value in result.items() if key != "error"}
+
+
+def print_table(results: list[dict], as_json: bool) -> None:
+    """Print workspace summaries as a table or JSON.
+
+    Args:
+        results: The workspace summaries or action results.
+        as_json: Whether to print JSON.
+    """
+    if as_json:
+        print(json.dumps(results, indent=2))
+        return
+
+    if not results:
+        print("No lab instances found.")
+        return
+
+    columns = ["name", "id", "status", "health", "instance_type", "url"]
+    rows = [[column.upper().replace("_", " ") for column in columns]]
+    rows += [[str(result.get(column) or "-") for column in columns] for result in results]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns))]
+    for row in rows:
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip())
+
+    errors = [result for result in results if result.get("error")]
+    if errors:
+        print(f"\n❌ {len(errors)} of {len(results)} lab instance(s) failed")
+
+
+def is_healthy(workspace: dict) -> bool:
+    """Check whether a workspace is running and reports no health problems."""
+    return (
+        not workspace.get("error")
+        and workspace.get("status") == "RUNNING"
+        and workspace.get("health") in (None, "HEALTHY")
+    )
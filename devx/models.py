@@ -1,13 +1,11 @@
 """Data models for the workshop configuration."""
 
-import json
-import re
-import subprocess
 from enum import Enum
+from functools import cached_property
 from pathlib import Path
-from typing import Optional
+from typing import Literal, Optional
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 from pydantic_settings import (
     BaseSettings,
     PydanticBaseSettingsSource,
@@ -15,6 +13,8 @@ from pydantic_settings import (
     SettingsConfigDict,
 )
 
+from devx.repository import repository_metadata
+
 
 class Provider(str, Enum):
     """Enum for supported cloud providers."""
@@ -35,30 +35,7 @@ def _relative_to_root() -> str:
         RuntimeError: If either .git or pyproject.toml cannot be found.
         ValueError: If pyproject.toml is not under .git directory.
     """
-    current = Path.cwd()
-    git_dir = None
-    pyproject_dir = None
-
-    # Search up the directory tree
-    while current.parent != current:
-        if (current / '.git').is_dir() and not git_dir:
-            git_dir = current
-        if (current / 'pyproject.toml').is_file() and not pyproject_dir:
-            pyproject_dir = current
-        if git_dir and pyproject_dir:
-            break
-        current = current.parent
-
-    if not git_dir:
-        raise RuntimeError("Could not find .git directory")
-    if not pyproject_dir:
-        raise RuntimeError("Could not find pyproject.toml")
-
-    # Get relative path between the two
-    try:
-        return str(pyproject_dir.relative_to(git_dir))
-    except ValueError as exc:
-        raise ValueError("pyproject is not under git dir") from exc
+    return repository_metadata().relative_to_root
 
 
 def _infer_repo_url() -> str:
@@ -70,19 +47,7 @@ def _infer_repo_url() -> str:
     Raises:
         ValueError: If the remote URL format is not supported.
     """
-    remote_url = subprocess.check_output(
-        ["git", "remote", "get-url", "origin"], text=True
-    ).strip()
-
-    if remote_url.startswith("git@"):
-        match = re.match(r"git@([^:]+):(.+)\.git", remote_url)
-        if match:
-            domain, path = match.groups()
-            return f"https://{domain}/{path}"
-    elif remote_url.startswith("https://"):
-        return remote_url.removesuffix(".git")
-
-    raise ValueError(f"Unsupported remote URL format: {remote_url}")
+    return repository_metadata().remote.https_url
 
 
 def _infer_image_url() -> str:
@@ -94,22 +59,7 @@ def _infer_image_url() -> str:
     Raises:
         ValueError: If the remote URL format is not supported.
     """
-    remote_url = subprocess.check_output(
-        ["git", "remote", "get-url", "origin"], text=True
-    ).strip()
-
-    if remote_url.startswith("git@"):
-        match = re.match(r"git@([^:]+):(.+)\.git", remote_url)
-        if match:
-            _, path = match.groups()
-            return f"ghcr.io/{path}"
-    elif remote_url.startswith("https://"):
-        url = remote_url.removesuffix(".git")
-        if "github.com" in url:
-            path = url.split("github.com/")[1]
-            return f"ghcr.io/{path}"
-
-    raise ValueError(f"Unsupported remote URL format: {remote_url}")
+    return repository_metadata().remote.image_url
 
 
 class Port(BaseModel):
@@ -182,6 +132,116 @@ class Project(BaseSettings):
         return (PyprojectTomlConfigSettingsSource(settings_cls),)
 
 
+class BuildSettings(BaseSettings):
+    """Represents the local image build configuration from `[tool.devx.build]`.
+
+    Attributes:
+        cache_from: BuildKit cache sources, e.g. `type=registry,ref=ghcr.io/org/repo:cache`
+            or `type=local,src=.devx/cache`.
+        cache_to: BuildKit cache destinations, e.g. `type=local,dest=.devx/cache,mode=max`.
+        wheelhouse: Whether to collect the image's Python dependencies into `.devx/wheelhouse`
+            after every build, so later builds install them without downloading.
+    """
+    model_config = SettingsConfigDict(pyproject_toml_table_header=('tool', 'devx', 'build'))
+
+    cache_from: list[str] = []
+    cache_to: list[str] = []
+    wheelhouse: bool = False
+
+    @classmethod
+    # pylint: disable-next=arguments-differ,too-many-arguments,too-many-positional-arguments
+    def settings_customise_sources(
+        cls,
+        settings_cls: type[BaseSettings],
+        init_settings: PydanticBaseSettingsSource,
+        env_settings: PydanticBaseSettingsSource,
+        dotenv_settings: PydanticBaseSettingsSource,
+        file_secret_settings: PydanticBaseSettingsSource,
+    ) -> tuple[PydanticBaseSettingsSource, ...]:
+        return (init_settings, PyprojectTomlConfigSettingsSource(settings_cls))
+
+
+class TestSettings(BaseSettings):
+    """Represents the workshop test configuration from `[tool.devx.test]`.
+
+    Attributes:
+        kernels: The kernel names notebooks may use.
+        max_notebook_size: The largest notebook file allowed, e.g. `2m`.
+        exclude: Glob patterns of notebooks to skip, relative to the project root.
+        timeout: Seconds a notebook may run when it is executed, unless it declares its own.
+        max_image_size: The largest image the lab manual may reference without a warning, e.g. `500k`.
+    """
+    model_config = SettingsConfigDict(pyproject_toml_table_header=('tool', 'devx', 'test'))
+
+    kernels: list[str] = ['python3']
+    max_notebook_size: str = '2m'
+    exclude: list[str] = []
+    timeout: int = 1800
+    max_image_size: str = '500k'
+
+    @classmethod
+    # pylint: disable-next=arguments-differ,too-many-arguments,too-many-positional-arguments
+    def settings_customise_sources(
+        cls,
+        settings_cls: type[BaseSettings],
+        init_settings: PydanticBaseSettingsSource,
+        env_settings: PydanticBaseSettingsSource,
+        dotenv_settings: PydanticBaseSettingsSource,
+        file_secret_settings: PydanticBaseSettingsSource,
+    ) -> tuple[PydanticBaseSettingsSource, ...]:
+        return (init_settings, PyprojectTomlConfigSettingsSource(settings_cls))
+
+
+def _validate_cloud(cloud: str, valid_driver_versions: Optional[list[int]] = None) -> None:
+    """Validate that a cloud provider has a workspace group with a compatible driver.
+
+    Args:
+        cloud: The lower cased cloud provider.
+        valid_driver_versions: Acceptable NVIDIA driver versions, or None for any.
+
+    Raises:
+        ValueError: If no compatible workspace group exists.
+    """
+    # Import here to avoid circular imports
+    from devx.workspaces import WORKSPACES
+
+    if WORKSPACES.query_provider(cloud) is None:
+        raise ValueError(
+            f"No workspace found for cloud provider '{cloud}'. Available providers: {WORKSPACES.providers()}"
+        )
+
+    if WORKSPACES.select(cloud, valid_driver_versions) is None:
+        raise ValueError(
+            f"Cloud provider '{cloud}' has NVIDIA driver versions {WORKSPACES.driver_versions(cloud)}, "
+            f"but valid versions are: {valid_driver_versions}"
+        )
+
+
+class BrevTarget(BaseModel):
+    """Represents one entry of the `[[tool.brev.targets]]` publish matrix.
+
+    Unset fields fall back to the top level `[tool.brev]` settings.
+
+    Attributes:
+        name: The name of the target. Defaults to `<cloud>-<instance_type>`.
+        instance_type: The type of instance to use for the workspace.
+        cloud: The cloud provider for this workspace.
+        storage: The storage configuration for the workspace.
+        valid_driver_versions: List of valid NVIDIA driver versions for this workspace.
+        gpus: The number of GPUs of the instance type.
+        memory: The memory of the instance type, e.g. `64g`.
+        cpus: The number of CPUs of the instance type.
+    """
+    name: Optional[str] = None
+    instance_type: Optional[str] = None
+    cloud: Optional[str] = None
+    storage: Optional[int] = None
+    valid_driver_versions: Optional[list[int]] = None
+    gpus: Optional[int] = None
+    memory: Optional[str] = None
+    cpus: Optional[float] = None
+
+
 class BrevWorkspace(BaseSettings):
     """Represents a brev workspace configuration.
 
@@ -193,6 +253,18 @@ class BrevWorkspace(BaseSettings):
         relative_to_root: Whether the workspace is relative to the root.
         valid_driver_versions: List of valid NVIDIA driver versions for this workspace.
         cloud: The cloud provider for this workspace.
+        targets: Additional instance types and clouds to publish the workshop to.
+        gpus: The number of GPUs of the instance type, when its name does not tell.
+        memory: The memory of the instance type, e.g. `64g`, to plan service resources.
+        cpus: The number of CPUs of the instance type, to plan service resources.
+        prefetch: Whether the launchable downloads the images and model caches of
+            profile-gated services in the background while the `devx` service starts.
+        data_volumes: Which declared volumes the launchable keeps under the data directory
+            of the workspace group: `all`, the ones `labeled` `devx.storage` `cache` or
+            `data`, or `none`. Defaults to `all` on workspace groups without flexible
+            storage, and `labeled` elsewhere.
+        unfitting_profiles: Whether compiling the launchable fails (`error`) or leaves out
+            the services (`drop`) of profiles that need more GPUs than the target has.
     """
     model_config = SettingsConfigDict(pyproject_toml_table_header=('tool', 'brev'))
 
@@ -202,61 +274,98 @@ class BrevWorkspace(BaseSettings):
     ports: list[Port]
     relative_to_root: str = Field(default_factory=_relative_to_root)
     valid_driver_versions: Optional[list[int]] = None
+    gpus: Optional[int] = None
+    memory: Optional[str] = None
+    cpus: Optional[float] = None
+    prefetch: bool = False
+    data_volumes: Optional[Literal['all', 'labeled', 'none']] = None
+    unfitting_profiles: Literal['error', 'drop'] = 'error'
+
+    targets: list[BrevTarget] = []
 
     @field_validator('cloud')
     @classmethod
-    def validate_cloud_provider(cls, v: str, info) -> str:
-        """Validate that a workspace exists for the specified cloud provider and driver compatibility."""
+    def validate_cloud_provider(cls, v: str) -> str:
+        """Validate that a workspace exists for the specified cloud provider."""
         # Convert to lowercase for consistency
         v = v.lower()
+        _validate_cloud(v)
+        return v
 
-        # Import here to avoid circular imports
-        from devx.workspaces import WORKSPACES
+    @model_validator(mode='after')
+    def validate_driver_versions(self) -> 'BrevWorkspace':
+        """Validate that the cloud provider has a workspace group with a compatible driver."""
+        _validate_cloud(self.cloud, self.valid_driver_versions)
+        return self
 
-        workspace = WORKSPACES.query_provider(v)
-        if workspace is None:
-            available_providers = [ws.provider for ws in WORKSPACES._KNOWN_WORKSPACES if ws.provider]
-            raise ValueError(f"No workspace found for cloud provider '{v}'. Available providers: {available_providers}")
-
-        # Check driver version compatibility if valid_driver_versions is also specified
-        if hasattr(info, 'data') and 'valid_driver_versions' in info.data:
-            valid_driver_versions = info.data['valid_driver_versions']
-            if valid_driver_versions is not None and workspace.nvidia_driver_version is not None:
-                if workspace.nvidia_driver_version not in valid_driver_versions:
-                    raise ValueError(
-                        f"Cloud provider '{v}' has NVIDIA driver version {workspace.nvidia_driver_version}, "
-                        f"but valid versions are: {valid_driver_versions}"
-                    )
+    @model_validator(mode='after')
+    def validate_targets(self) -> 'BrevWorkspace':
+        """Validate every publish target against the workspace registry."""
+        self.target_workspaces()
+        return self
 
-        return v
+    def target_workspaces(self) -> dict[str, 'BrevWorkspace']:
+        """Get the workspace configuration of every publish target.
 
-    @property
+        Target fields override the top level settings. Without targets, the top level
+        settings are the only target, named `default`.
+
+        Returns:
+            Mapping of target name to its workspace configuration.
+
+        Raises:
+            ValueError: If a target is not valid or target names are not unique.
+        """
+        if not self.targets:
+            return {"default": self}
+
+        workspaces = {}
+        base = {name: getattr(self, name) for name in type(self).model_fields if name != 'targets'}
+        for target in self.targets:
+            values = {**base, **target.model_dump(exclude={'name'}, exclude_none=True), 'targets': []}
+            values['cloud'] = values['cloud'].lower()
+            if target.instance_type:
+                # the top level hardware settings belong to the top level instance type
+                for name in ('gpus', 'memory', 'cpus'):
+                    values[name] = getattr(target, name)
+            _validate_cloud(values['cloud'], values['valid_driver_versions'])
+
+            name = target.name or f"{values['cloud']}-{values['instance_type']}"
+            if name in workspaces:
+                raise ValueError(f"Duplicate Brev target name '{name}'")
+            workspaces[name] = BrevWorkspace.model_construct(**values)
+        return workspaces
+
+    @cached_property
     def workspace_group_id(self) -> str:
-        """Get the workspace group ID by looking up the cloud provider."""
+        """Get the workspace group ID of the best workspace group for the cloud provider."""
         # Import here to avoid circular imports
         from devx.workspaces import WORKSPACES
 
-        workspace = WORKSPACES.query_provider(self.cloud)
+        workspace = WORKSPACES.select(self.cloud, self.valid_driver_versions)
         if workspace:
             return workspace.name
 
         # Raise error if no matching workspace found
-        available_providers = [ws.provider for ws in WORKSPACES._KNOWN_WORKSPACES if ws.provider]
-        raise ValueError(f"No workspace found for cloud provider '{self.cloud}'. Available providers: {available_providers}")
+        raise ValueError(
+            f"No workspace found for cloud provider '{self.cloud}'. Available providers: {WORKSPACES.providers()}"
+        )
 
     @property
     def access_token(self) -> str:
         """Get the Brev access token from credentials file."""
-        cred_path = Path.home() / ".brev" / "credentials.json"
-        with open(cred_path, encoding='utf-8') as f:
-            return json.load(f)["access_token"]
+        # Import here to keep requests out of config loading
+        from devx.brev import load_credentials
+
+        return load_credentials().access_token
 
     @property
     def org_id(self) -> str:
         """Get the Brev organization ID from active org file."""
-        org_path = Path.home() / ".brev" / "active_org.json"
-        with open(org_path, encoding='utf-8') as f:
-            return json.load(f)["id"]
+        # Import here to keep requests out of config loading
+        from devx.brev import load_credentials
+
+        return load_credentials().org_id
 
     @classmethod
     # pylint: disable-next=arguments-differ,too-many-arguments,too-many-positional-arguments
@@ -0,0 +1,304 @@
+"""Check that the workshop notebooks are fit to publish.
+
+Every notebook is checked for a valid nbformat 4 structure, stripped outputs, an
+allowed kernel, leaked secrets and its file size. Notebooks are checked in a process
+pool, and the results are cached in `.devx/notebooks.json` by content hash, so only
+changed notebooks are checked again. A notebook that failed still fails when it is
+skipped.
+"""
+
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from devx.constants import DEVX_DIR
+from devx.junit import TestCase
+
+CACHE_FILE = DEVX_DIR / 'notebooks.json'
+# bump when the checks change, so cached results are not reused
+CHECKS_VERSION = 1
+CELL_TYPES = ('code', 'markdown', 'raw')
+# credentials that should never be committed, whatever variable holds them
+SECRET_PATTERNS = {
+    "an NGC API key": r'nvapi-[A-Za-z0-9_-]{20,}',
+    "a Hugging Face token": r'hf_[A-Za-z0-9]{30,}',
+    "a GitHub token": r'gh[pousr]_[A-Za-z0-9]{36,}',
+    "an AWS access key": r'AKIA[0-9A-Z]{16}',
+    "a private key": r'-----BEGIN [A-Z ]*PRIVATE KEY-----',
+}
+# environment variables whose values are secrets, when they are set where the checks run
+SECRET_VARIABLE_PATTERN = re.compile(r'(KEY|TOKEN|SECRET|PASSWORD)', re.IGNORECASE)
+MIN_SECRET_LENGTH = 8
+SECRET_ENV_FILES = [Path('workshop.env')]
+
+
+class CheckOptions(NamedTuple):
+    """What the notebooks are checked against.
+
+    Attributes:
+        kernels: The kernel names notebooks may use.
+        max_size: The largest notebook file allowed, in bytes.
+        secrets: Mapping of secret values known on this machine to the variable that holds them.
+    """
+    kernels: list[str]
+    max_size: int
+    secrets: dict[str, str]
+
+    def fingerprint(self) -> str:
+        """Identify the options in the result cache without storing the secrets."""
+        options = {
+            "version": CHECKS_VERSION,
+            "kernels": sorted(self.kernels),
+            "max_size": self.max_size,
+            "secrets": sorted(hashlib.sha256(value.encode()).hexdigest() for value in self.secrets),
+        }
+        return hashlib.sha256(json.dumps(options, sort_keys=True).encode()).hexdigest()
+
+
+def known_secrets() -> dict[str, str]:
+    """Collect the secret values set in the environment and in `workshop.env`.
+
+    Returns:
+        Mapping of each secret value to the variable that holds it.
+    """
+    # imported here to keep dotenv out of the commands that do not need it
+    from dotenv import dotenv_values  # pylint: disable=import-outside-toplevel
+
+    variables = dict(os.environ)
+    for path in SECRET_ENV_FILES:
+        if path.exists():
+            variables.update({name: value for name, value in dotenv_values(path).items() if value})
+    return {
+        value: name for name, value in variables.items()
+        if SECRET_VARIABLE_PATTERN.search(name) and len(value) >= MIN_SECRET_LENGTH and '$' not in value
+    }
+
+
+def find_notebooks(exclude: Optional[list[str]] = None) -> list[Path]:
+    """Find the notebooks of the project.
+
+    Hidden directories, such as `.git`, `.devx` and `.ipynb_checkpoints`, are skipped.
+
+    Args:
+        exclude: Glob patterns of notebooks to skip, relative to the project root.
+
+    Returns:
+        The notebook paths, sorted.
+    """
+    notebooks = []
+    for root, dirs, names in os.walk('.'):
+        dirs[:] = [name for name in dirs if not name.startswith('.')]
+        for name in names:
+            path = Path(root, name)
+            if not name.endswith('.ipynb'):
+                continue
+            if not any(fnmatch.fnmatch(path.as_posix(), pattern) for pattern in exclude or []):
+                notebooks.append(path)
+    return sorted(notebooks)
+
+
+def _schema_problems(notebook) -> list[str]:
+    """Validate the nbformat 4 structure of a notebook."""
+    if not isinstance(notebook, dict):
+        return ["not a notebook: the top level is not a JSON object"]
+    problems = []
+    if notebook.get('nbformat') != 4:
+        problems.append(f"nbformat is {notebook.get('nbformat')}, expected 4")
+    if not isinstance(notebook.get('nbformat_minor'), int):
+        problems.append("nbformat_minor is missing")
+    if not isinstance(notebook.get('metadata'), dict):
+        problems.append("metadata is missing")
+    if not isinstance(notebook.get('cells'), list):
+        return problems + ["cells are missing"]
+
+    for index, cell in enumerate(notebook['cells'], start=1):
+        if not isinstance(cell, dict) or cell.get('cell_type') not in CELL_TYPES:
+            problems.append(f"cell {index} has no valid cell_type")
+            continue
+        source = cell.get('source')
+        lines = isinstance(source, list) and all(isinstance(line, str) for line in source)
+        if not isinstance(source, str) and not lines:
+            problems.append(f"cell {index} has no valid source")
+        if not isinstance(cell.get('metadata'), dict):
+            problems.append(f"cell {index} has no metadata")
+        if cell['cell_type'] == 'code' and not isinstance(cell.get('outputs'), list):
+            problems.append(f"cell {index} is a code cell without outputs")
+        if cell['cell_type'] != 'code' and 'outputs' in cell:
+            problems.append(f"cell {index} is a {cell['cell_type']} cell with outputs")
+    return problems
+
+
+def _output_problems(notebook: dict) -> list[str]:
+    """Check that the outputs and execution counts of every code cell were cleared."""
+    problems = []
+    for index, cell in enumerate(notebook['cells'], start=1):
+        if not isinstance(cell, dict) or cell.get('cell_type') != 'code':
+            continue
+        if cell.get('outputs'):
+            problems.append(f"cell {index} has outputs, clear them before committing")
+        elif cell.get('execution_count') is not None:
+            problems.append(f"cell {index} has an execution count, clear it before committing")
+    return problems
+
+
+def _kernel_problems(notebook: dict, kernels: list[str]) -> list[str]:
+    """Check that a notebook uses one of the allowed kernels."""
+    kernelspec = (notebook.get('metadata') or {}).get('kernelspec')
+    if not isinstance(kernelspec, dict) or not kernelspec.get('name'):
+        return ["kernelspec is missing from the notebook metadata"]
+    if kernels and kernelspec['name'] not in kernels:
+        return [f"kernel {kernelspec['name']} is not one of {', '.join(kernels)}"]
+    return []
+
+
+def _secret_problems(text: str, secrets: dict[str, str]) -> list[str]:
+    """Look for credentials in the notebook text."""
+    problems = [f"contains the value of {name}" for value, name in secrets.items() if value in text]
+    problems += [
+        f"contains what looks like {kind}" for kind, pattern in SECRET_PATTERNS.items() if re.search(pattern, text)
+    ]
+    return sorted(problems)
+
+
+def check_notebook(path: Path, options: CheckOptions) -> TestCase:
+    """Run every check on one notebook.
+
+    Args:
+        path: The notebook.
+        options: What the notebook is checked against.
+
+    Returns:
+        The result, with one failure per problem found.
+    """
+    started = time.monotonic()
+    data = path.read_bytes()
+    problems = []
+    if len(data) > options.max_size:
+        problems.append(f"is {len(data) / 1000:.0f} KB, larger than the {options.max_size / 1000:.0f} KB limit")
+
+    text = data.decode('utf-8', errors='replace')
+    try:
+        notebook = json.loads(text)
+    except json.JSONDecodeError as e:
+        problems.append(f"is not valid JSON: {e}")
+    else:
+        problems += _schema_problems(notebook)
+        if isinstance(notebook, dict) and isinstance(notebook.get('cells'), list):
+            problems += _output_problems(notebook)
+            problems += _kernel_problems(notebook, options.kernels)
+    problems += _secret_problems(text, options.secrets)
+    return TestCase(path.as_posix(), time.monotonic() - started, problems)
+
+
+def _load_cache(fingerprint: str) -> dict:
+    """Load the cached results checked with the same options, or nothing."""
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return cache.get('results', {}) if cache.get('options') == fingerprint else {}
+
+
+def _save_cache(fingerprint: str, results: dict) -> None:
+    """Cache the results of the checks."""
+    if not DEVX_DIR.is_dir():
+        return
+    with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump({"options": fingerprint, "results": results}, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def check_notebooks(
+    notebooks: list[Path], options: CheckOptions, jobs: Optional[int] = None, use_cache: bool = True
+) -> tuple[list[TestCase], int]:
+    """Check notebooks in a process pool, skipping the ones whose content did not change.
+
+    Args:
+        notebooks: The notebooks to check.
+        options: What the notebooks are checked against.
+        jobs: The number of worker processes. Defaults to the number of CPUs.
+        use_cache: Whether to reuse the results of unchanged notebooks.
+
+    Returns:
+        Tuple of (results in the order of the notebooks, number of notebooks checked).
+    """
+    fingerprint = options.fingerprint()
+    cache = _load_cache(fingerprint) if use_cache else {}
+    digests = {path: hashlib.sha256(path.read_bytes()).hexdigest() for path in notebooks}
+
+    results: dict[Path, TestCase] = {}
+    for path, digest in digests.items():
+        cached = cache.get(path.as_posix())
+        if cached and cached.get('sha256') == digest:
+            results[path] = TestCase(path.as_posix(), 0.0, cached['failures'])
+    changed = [path for path in notebooks if path not in results]
+
+    if len(changed) > 1 and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            # batches amortize the cost of sending work to the worker processes
+            chunksize = max(len(changed) // ((jobs or os.cpu_count() or 1) * 4), 1)
+            checked = executor.map(check_notebook, changed, [options] * len(changed), chunksize=chunksize)
+            results.update(zip(changed, checked))
+    else:
+        results.update((path, check_notebook(path, options)) for path in changed)
+
+    cache = {name: result for name, result in cache.items() if Path(name).exists()}
+    cache.update({
+        path.as_posix(): {"sha256": digests[path], "failures": results[path].failures} for path in notebooks
+    })
+    _save_cache(fingerprint, cache)
+    return [results[path] for path in notebooks], len(changed)
+
+
+def test_notebooks(
+    paths: Optional[list[Path]] = None,
+    junit: Optional[Path] = None,
+    jobs: Optional[int] = None,
+    use_cache: bool = True,
+) -> int:
+    """Check the workshop notebooks and report the problems found.
+
+    Args:
+        paths: The notebooks to check. Defaults to every notebook of the project.
+        junit: Path of a JUnit XML report to write.
+        jobs: The number of worker processes. Defaults to the number of CPUs.
+        use_cache: Whether to skip the notebooks that did not change since they were checked.
+
+    Returns:
+        The number of notebooks with problems.
+    """
+    # imported here to keep pydantic out of the worker processes
+    from devx.junit import write_junit  # pylint: disable=import-outside-toplevel
+    from devx.models import TestSettings  # pylint: disable=import-outside-toplevel
+    from devx.resources import parse_size  # pylint: disable=import-outside-toplevel
+
+    settings = TestSettings()
+    notebooks = paths or find_notebooks(settings.exclude)
+    if not notebooks:
+        print("No notebooks found.")
+        return 0
+
+    options = CheckOptions(settings.kernels, parse_size(settings.max_notebook_size), known_secrets())
+    print(f"📓 Checking {len(notebooks)} notebook(s)...")
+    started = time.monotonic()
+    results, checked = check_notebooks(notebooks, options, jobs, use_cache)
+    for result in results:
+        for failure in result.failures:
+            print(f"❌ {result.name}: {failure}")
+
+    failed = sum(1 for result in results if result.failures)
+    print(
+        f"📋 {len(results) - failed} passed, {failed} failed, {len(results) - checked} unchanged "
+        f"in {time.monotonic() - started:.1f}s"
+    )
+    if junit:
+        write_junit(junit, 'notebooks', results)
+        print(f"📝 JUnit report written to {junit}")
+    return failed
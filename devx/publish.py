@@ -1,15 +1,23 @@
 """Brev workspace publish functionality."""
 
+import hashlib
 import json
 import subprocess
 import sys
-from typing import Optional
-
-import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from typing import Any, NamedTuple, Optional
 
+from devx.brev import BrevAPIError, BrevClient, load_credentials
+from devx.constants import DEVX_DIR
 from devx.models import BrevWorkspace, Project
 
 TARGET_BRANCH = "main"
+PUBLISH_STATE_FILE = DEVX_DIR / "launchables.json"
+PUBLISH_STATE_VERSION = 2
+DEFAULT_TARGET = "default"
+# statuses of a launchable update that mean the launchable cannot be updated in place
+UPDATE_FALLBACK_STATUSES = {400, 404, 405, 501}
 
 
 def run_brev_org():
@@ -23,30 +31,19 @@ def run_brev_org():
         raise RuntimeError(f"❌ `brev org` failed with exit code {e.returncode}") from e
 
 
-def publish_launchable(workspace: BrevWorkspace, project: Project, dry_run: bool = False) -> Optional[str]:
-    """Publish a Brev launchable workspace.
+def launchable_payload(workspace: BrevWorkspace, project: Project, target: str = DEFAULT_TARGET) -> dict:
+    """Build the launchable definition for the workshop.
 
     Args:
         workspace: The workspace configuration.
         project: The project configuration.
-        dry_run: If True, only show the API request payload without making the request.
+        target: The name of the publish target.
 
     Returns:
-        The launchable ID if successful, None otherwise.
+        The launchable API request payload.
     """
-    url = (
-        "https://brevapi2.us-west-2-prod.control-plane.brev.dev/api/"
-        f"organizations/{workspace.org_id}/v2/launchables?utm_source=devx-cli"
-    )
-
-    headers = {
-        "Authorization": f"Bearer {workspace.access_token}",
-        "Content-Type": "application/json",
-        "User-Agent": "devx-cli"
-    }
-
-    payload = {
-        "name": project.description,
+    return {
+        "name": project.description if target == DEFAULT_TARGET else f"{project.description} ({target})",
         "createWorkspaceRequest": {
             "instanceType": workspace.instance_type,
             "workspaceGroupId": workspace.workspace_group_id,
@@ -70,49 +67,371 @@ def publish_launchable(workspace: BrevWorkspace, project: Project, dry_run: bool
         }
     }
 
+
+def payload_hash(payload: dict) -> str:
+    """Hash a launchable payload.
+
+    Args:
+        payload: The launchable API request payload.
+
+    Returns:
+        The hex sha256 digest of the canonical JSON payload.
+    """
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def load_publish_state() -> dict:
+    """Load the record of published launchables.
+
+    Returns:
+        Mapping of organization ID to target name to the launchable published for it.
+    """
+    try:
+        with open(PUBLISH_STATE_FILE, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+    if state.get('version') == 1:
+        return {org_id: {DEFAULT_TARGET: entry} for org_id, entry in state.get('launchables', {}).items()}
+    return state.get('launchables', {}) if state.get('version') == PUBLISH_STATE_VERSION else {}
+
+
+def _write_publish_state(launchables: dict) -> None:
+    """Write the record of published launchables.
+
+    Args:
+        launchables: Mapping of organization ID to target name to the launchable published for it.
+    """
+    with open(PUBLISH_STATE_FILE, 'w', encoding='utf-8') as f:
+        json.dump({"version": PUBLISH_STATE_VERSION, "launchables": launchables}, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def _flatten(value: Any, prefix: str = "") -> dict:
+    """Flatten nested dictionaries into dotted field paths."""
+    if isinstance(value, dict) and value:
+        flat = {}
+        for key, item in value.items():
+            flat.update(_flatten(item, f"{prefix}.{key}" if prefix else str(key)))
+        return flat
+    return {prefix: value}
+
+
+def diff_payloads(old: dict, new: dict) -> list[str]:
+    """Compare two launchable payloads field by field.
+
+    Args:
+        old: The previously published payload.
+        new: The payload about to be published.
+
+    Returns:
+        One line per added, removed or changed field.
+    """
+    old_fields, new_fields = _flatten(old), _flatten(new)
+    lines = []
+    for field in sorted(old_fields.keys() | new_fields.keys()):
+        if field not in old_fields:
+            lines.append(f"+ {field}: {json.dumps(new_fields[field])}")
+        elif field not in new_fields:
+            lines.append(f"- {field}: {json.dumps(old_fields[field])}")
+        elif old_fields[field] != new_fields[field]:
+            lines.append(f"~ {field}: {json.dumps(old_fields[field])} -> {json.dumps(new_fields[field])}")
+    return lines
+
+
+def find_launchable(launchables: list[dict], payload: dict) -> Optional[dict]:
+    """Find the launchable previously published for a target of this workshop.
+
+    Launchables are matched on the compose file URL and the launchable name.
+
+    Args:
+        launchables: The launchables of the organization.
+        payload: The launchable payload about to be published.
+
+    Returns:
+        The existing launchable, or None if there is none.
+    """
+    compose_url = payload["buildRequest"]["dockerCompose"]["fileUrl"]
+    for launchable in launchables:
+        build = launchable.get("buildRequest") or {}
+        same_compose = (build.get("dockerCompose") or {}).get("fileUrl") == compose_url
+        if same_compose and launchable.get("name") == payload["name"]:
+            return launchable
+    return None
+
+
+class PublishResult(NamedTuple):
+    """The outcome of publishing a launchable.
+
+    Attributes:
+        action: Whether the launchable was `updated` in place or `created`.
+        launchable: The API response, with the launchable's ID.
+    """
+    action: str
+    launchable: dict
+
+
+def publish_launchable(
+    workspace: BrevWorkspace,
+    project: Project,
+    dry_run: bool = False,
+    client: Optional[BrevClient] = None,
+    launchable_id: Optional[str] = None,
+    target: str = DEFAULT_TARGET,
+) -> Optional[PublishResult]:
+    """Publish a Brev launchable workspace.
+
+    Args:
+        workspace: The workspace configuration.
+        project: The project configuration.
+        dry_run: If True, only show the API request payload without making the request.
+        client: The Brev API client to use. Defaults to a client for the Brev CLI login.
+        launchable_id: The ID of an existing launchable to update instead of creating a new one.
+            A new one is created when Brev rejects the update.
+        target: The name of the publish target.
+
+    Returns:
+        Whether the launchable was updated or created, with the API response. None for dry runs.
+
+    Raises:
+        BrevAPIError: If the API request fails.
+    """
+    payload = launchable_payload(workspace, project, target)
+
     if dry_run:
-        print("\n📦 API Request Details:")
-        print(f"URL: {url}")
+        print(f"\n📦 API Request Details ({target}):")
+        url = (client or BrevClient.from_credentials()).launchables_url()
+        if launchable_id:
+            print(f"URL: PATCH {url.replace('?', f'/{launchable_id}?')}")
+        else:
+            print(f"URL: POST {url}")
         print("\nPayload:")
         print(json.dumps(payload, indent=2))
         return None
 
-    response = requests.post(url, headers=headers, json=payload, timeout=10)
-    return response.json()
+    with (nullcontext(client) if client else BrevClient.from_credentials()) as api:
+        if launchable_id:
+            try:
+                response = api.update_launchable(launchable_id, payload) or {}
+                return PublishResult("updated", {"id": launchable_id, **response})
+            except BrevAPIError as e:
+                if e.status not in UPDATE_FALLBACK_STATUSES:
+                    raise
+                # the new launchable's ID replaces the old one in the publish record
+                print(f"⚠️  Launchable {launchable_id} could not be updated ({e}), creating a new one")
+        return PublishResult("created", api.create_launchable(payload))
+
+
+def show_org() -> None:
+    """Display the active Brev organization from the cached Brev CLI login."""
+    credentials = load_credentials()
+    print(f"🔍 Active Brev organization: {credentials.org_name or 'unknown'} ({credentials.org_id})")
+
+
+class PublishPlan(NamedTuple):
+    """What publishing a single target will do.
+
+    Attributes:
+        target: The name of the publish target.
+        workspace: The workspace configuration of the target.
+        payload: The launchable payload.
+        previous: The launchable previously published for the target, if any.
+        skip: Whether the launchable is already up to date.
+    """
+    target: str
+    workspace: BrevWorkspace
+    payload: dict
+    previous: Optional[dict]
+    skip: bool
+
+
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
+def _plan(
+    workspaces: dict[str, BrevWorkspace],
+    project: Project,
+    published: dict,
+    client: BrevClient,
+    force: bool,
+    dry_run: bool = False,
+) -> list[PublishPlan]:
+    """Decide what to publish for every target.
+
+    Args:
+        workspaces: Mapping of target name to workspace configuration.
+        project: Project configuration.
+        published: Mapping of target name to the launchable recorded for it.
+        client: The Brev API client.
+        force: Whether to publish even if the payload did not change.
+        dry_run: Whether to only use the local publish record, without looking up the organization's launchables.
+
+    Returns:
+        The publish plan of every target.
+    """
+    plans = []
+    remote = None
+    for target, workspace in workspaces.items():
+        payload = launchable_payload(workspace, project, target)
+        previous = published.get(target)
+        skip = bool(previous and previous.get("hash") == payload_hash(payload) and not force)
 
+        if previous is None and not dry_run:
+            if remote is None:
+                try:
+                    remote = client.list_launchables()
+                except BrevAPIError as e:
+                    print(f"⚠️  Could not look up existing launchables: {e}")
+                    remote = []
+            existing = find_launchable(remote, payload)
+            if existing and existing.get("id"):
+                previous = {"id": existing["id"], "payload": {k: existing.get(k) for k in payload}}
 
-def publish(workspace: BrevWorkspace, project: Project, yes: bool, dry_run: bool) -> None:
+        plans.append(PublishPlan(target, workspace, payload, previous, skip))
+    return plans
+
+
+def _print_summary(results: list[tuple[PublishPlan, str, str]]) -> None:
+    """Print one table with the outcome of every target.
+
+    Args:
+        results: Tuples of (plan, action, launchable ID or error).
+    """
+    rows = [("TARGET", "INSTANCE", "WORKSPACE GROUP", "RESULT", "LAUNCHABLE")]
+    rows += [
+        (plan.target, plan.workspace.instance_type, plan.workspace.workspace_group_id, action, detail)
+        for plan, action, detail in results
+    ]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]) - 1)]
+
+    print("\n📋 Publish summary:")
+    for row in rows:
+        print("  " + "  ".join(cell.ljust(width) for cell, width in zip(row, widths)) + "  " + row[-1])
+
+
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments,too-many-locals,too-many-branches
+def publish(
+    workspace: BrevWorkspace,
+    project: Project,
+    yes: bool,
+    dry_run: bool,
+    brev_org: bool = False,
+    force: bool = False,
+    targets: Optional[list[str]] = None,
+    jobs: int = 4,
+    rate_limit: Optional[float] = 5.0,
+) -> None:
     """Publish a launchable workshop on Brev.
 
+    Every `[[tool.brev.targets]]` entry is published as its own launchable, concurrently.
+    A target is only published when its payload changed since the last publish to the
+    active organization, and an existing launchable for the target is updated rather
+    than duplicated.
+
     Args:
-        args: Command line arguments.
         workspace: Brev workspace configuration.
         project: Project configuration.
+        yes: Whether to skip the confirmation prompt.
+        dry_run: Whether to only show the API request.
+        brev_org: Whether to run `brev org` instead of reading the organization from disk.
+        force: Whether to publish even if the payload did not change.
+        targets: Names of the targets to publish. Defaults to all targets.
+        jobs: The maximum number of targets to publish at once.
+        rate_limit: The maximum number of Brev API requests per second.
     """
-    run_brev_org()
-
-    print("\n⚠️  About to publish launchable with the following configuration:")
-    print(f"  - Name: {project.description}")
-    print(f"  - Instance Type: {workspace.instance_type}")
-    print(f"  - Workspace Group: {workspace.workspace_group_id}")
-    print(f"  - Storage: {workspace.storage or 'None'}")
-    print(f"  - Ports: {[port.model_dump() for port in workspace.ports]}")
-    print(f"  - Repository: {project.repo_url}")
-    print(f"  - Image: {project.image_url}/devx:{TARGET_BRANCH}")
-
-    if not yes and input("\nContinue? [y/N] ").lower() != 'y':
-        print("❌ Aborted.")
+    try:
+        if brev_org:
+            run_brev_org()
+        else:
+            show_org()
+        org_id = load_credentials().org_id
+    except BrevAPIError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    workspaces = workspace.target_workspaces()
+    unknown = set(targets or []) - workspaces.keys()
+    if unknown:
+        print(f"❌ Unknown targets: {sorted(unknown)}. Available targets: {list(workspaces)}")
         sys.exit(1)
+    if targets:
+        workspaces = {name: ws for name, ws in workspaces.items() if name in targets}
 
-    print("\n📦 Publishing launchable...")
-    api_response = publish_launchable(workspace, project, dry_run=dry_run)
-    if not api_response or not api_response.get("id"):
-        if not dry_run:
-            print("❌ Failed to publish launchable.")
-            print(f"Server response: {api_response}")
+    launchables = load_publish_state()
+    published = launchables.setdefault(org_id, {})
+    client = BrevClient.from_credentials(rate_limit=rate_limit, pool_size=max(jobs, 1))
+
+    try:
+        plans = _plan(workspaces, project, published, client, force, dry_run)
+        pending = [plan for plan in plans if not plan.skip]
+
+        print("\n⚠️  About to publish launchable with the following configuration:")
+        print(f"  - Name: {project.description}")
+        print(f"  - Storage: {workspace.storage or 'None'}")
+        print(f"  - Ports: {[port.model_dump() for port in workspace.ports]}")
+        print(f"  - Repository: {project.repo_url}")
+        print(f"  - Image: {project.image_url}/devx:{TARGET_BRANCH}")
+        for plan in plans:
+            print(f"\n🎯 Target {plan.target}: {plan.workspace.instance_type} on {plan.workspace.workspace_group_id}")
+            if plan.skip:
+                print(f"  ✅ Launchable {plan.previous['id']} is up to date, nothing to publish.")
+            elif plan.previous:
+                print(f"  📝 Updating launchable {plan.previous['id']}:")
+                for line in diff_payloads(plan.previous.get("payload") or {}, plan.payload) or ["(no changes)"]:
+                    print(f"    {line}")
+            else:
+                print("  ✨ Creating a new launchable")
+
+        if not pending:
+            print("\n✅ All launchables are up to date. Use --force to publish anyway.")
+            return
+
+        if not yes and input("\nContinue? [y/N] ").lower() != 'y':
+            print("❌ Aborted.")
             sys.exit(1)
-        return
 
-    if not dry_run:
-        print(f"\n✅ Launchable published with ID: {api_response.get('id')}")
-        print(f"  ✨ https://brev.nvidia.com/launchable/deploy/now?launchableID={api_response.get('id')}")
+        if dry_run:
+            for plan in pending:
+                publish_launchable(
+                    plan.workspace, project, dry_run=True, client=client,
+                    launchable_id=plan.previous["id"] if plan.previous else None, target=plan.target,
+                )
+            return
+
+        print(f"\n📦 Publishing {len(pending)} launchable(s)...")
+        results = [(plan, "up to date", plan.previous["id"]) for plan in plans if plan.skip]
+        with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+            futures = {
+                executor.submit(
+                    publish_launchable, plan.workspace, project, client=client,
+                    launchable_id=plan.previous["id"] if plan.previous else None, target=plan.target,
+                ): plan
+                for plan in pending
+            }
+            for future in as_completed(futures):
+                plan = futures[future]
+                try:
+                    action, api_response = future.result()
+                    if not api_response or not api_response.get("id"):
+                        raise BrevAPIError(f"Unexpected server response: {api_response}")
+                except BrevAPIError as e:
+                    print(f"❌ {plan.target}: {e}")
+                    results.append((plan, "failed", str(e)))
+                    continue
+
+                published[plan.target] = {
+                    "id": api_response["id"], "hash": payload_hash(plan.payload), "payload": plan.payload
+                }
+                _write_publish_state(launchables)
+                print(f"✅ {plan.target}: launchable {action} with ID {api_response['id']}")
+                results.append((plan, action, api_response["id"]))
+    finally:
+        client.close()
+
+    results.sort(key=lambda result: list(workspaces).index(result[0].target))
+    _print_summary(results)
+    for plan, action, detail in results:
+        if action in ("created", "updated"):
+            print(f"  ✨ {plan.target}: https://brev.nvidia.com/launchable/deploy/now?launchableID={detail}")
+
+    if any(action == "failed" for _, action, _ in results):
+        sys.exit(1)
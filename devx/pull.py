@@ -0,0 +1,198 @@
+"""Pre-pull the images a workshop uses.
+
+Images are pulled concurrently through the Docker Engine API. Progress is tracked per
+layer, so layers shared between images are only counted once, and images whose local
+digest matches the registry are skipped. Without the Engine API, `docker pull` is run
+for every image instead.
+"""
+
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from devx.build import BUILD_SERVICE, base_images
+from devx.constants import TARGET_LOCAL_FILE
+from devx.docker import DockerEngine, DockerError, engine, load_compose_file
+
+RENDER_INTERVAL = 0.5
+
+
+def compose_images(profiles: Optional[list[str]] = None) -> list[str]:
+    """Get every image the workshop uses with the given compose profiles.
+
+    Args:
+        profiles: The compose profiles to enable.
+
+    Returns:
+        The images of the enabled services that are not built locally, followed by the
+        base images of the workshop Dockerfile.
+    """
+    services = load_compose_file(TARGET_LOCAL_FILE).get('services') or {}
+    images = []
+    for name, service in services.items():
+        service = service or {}
+        service_profiles = service.get('profiles') or []
+        if service_profiles and not set(service_profiles) & set(profiles or []):
+            continue
+        if name == BUILD_SERVICE or 'build' in service or not service.get('image'):
+            continue
+        images.append(service['image'])
+    images += base_images()
+    return list(dict.fromkeys(images))
+
+
+def _format_bytes(size: float) -> str:
+    """Format a byte count for humans."""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1000:
+            return f"{size:.1f} {unit}"
+        size /= 1000
+    return f"{size:.1f} TB"
+
+
+class _PullProgress:
+    """Aggregates the progress of concurrent pulls, counting shared layers once."""
+
+    def __init__(self, total_images: int, out=sys.stdout):
+        self._lock = threading.Lock()
+        self._layers: dict[str, tuple[int, int]] = {}
+        self._total_images = total_images
+        self._finished = 0
+        self._started = time.monotonic()
+        self._rendered = 0.0
+        self._out = out
+        self._live = out.isatty()
+
+    @property
+    def downloaded(self) -> int:
+        """Bytes downloaded so far."""
+        return sum(current for current, _ in self._layers.values())
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the first pull started."""
+        return time.monotonic() - self._started
+
+    def update(self, message: dict) -> None:
+        """Record a progress message of the Docker Engine API."""
+        layer = message.get('id')
+        status = message.get('status', '')
+        detail = message.get('progressDetail') or {}
+        with self._lock:
+            if layer and status == 'Downloading' and detail.get('total'):
+                self._layers[layer] = (detail.get('current', 0), detail['total'])
+            elif layer and status in ('Download complete', 'Pull complete') and layer in self._layers:
+                total = self._layers[layer][1]
+                self._layers[layer] = (total, total)
+            self._render()
+
+    def finish(self, line: str) -> None:
+        """Report a finished image."""
+        with self._lock:
+            self._finished += 1
+            if self._live:
+                self._out.write('\r\x1b[2K')
+            self._out.write(line + '\n')
+            self._render(force=True)
+
+    def _render(self, force: bool = False) -> None:
+        """Redraw the aggregate progress line on a terminal, at most every RENDER_INTERVAL."""
+        now = time.monotonic()
+        if not self._live or (not force and now - self._rendered < RENDER_INTERVAL):
+            return
+        self._rendered = now
+        total = sum(total for _, total in self._layers.values())
+        rate = self.downloaded / max(self.elapsed, 1e-3)
+        self._out.write(
+            f"\r\x1b[2K⬇️  {self._finished}/{self._total_images} images  "
+            f"{_format_bytes(self.downloaded)} / {_format_bytes(total)}  {_format_bytes(rate)}/s"
+        )
+        self._out.flush()
+
+
+def _is_current(client: DockerEngine, image: str) -> bool:
+    """Check whether the local copy of an image matches its registry digest."""
+    info = client.inspect_image(image)
+    if info is None:
+        return False
+    if '@sha256:' in image:
+        return True
+    remote = client.distribution_digest(image)
+    return bool(remote) and any(digest.endswith(f"@{remote}") for digest in info.get('RepoDigests') or [])
+
+
+def _pull_one(client: Optional[DockerEngine], image: str, progress: _PullProgress) -> str:
+    """Pull one image unless it is current.
+
+    Returns:
+        `pulled` or `current`.
+
+    Raises:
+        DockerError: If the pull fails.
+    """
+    if client is None:
+        try:
+            subprocess.run(['docker', 'pull', '-q', image], check=True, capture_output=True, text=True)
+        except FileNotFoundError as e:
+            raise DockerError("The docker CLI is not installed") from e
+        except subprocess.CalledProcessError as e:
+            raise DockerError(f"Pulling {image} failed: {e.stderr.strip() or e.returncode}") from e
+        return 'pulled'
+
+    if _is_current(client, image):
+        return 'current'
+    try:
+        client.pull(image, progress.update)
+    except DockerError as e:
+        if e.status not in (401, 403, 404):
+            raise
+        # the registry may need credentials from a docker credential helper, which only the CLI can use
+        return _pull_one(None, image, progress)
+    return 'pulled'
+
+
+def pull(profiles: Optional[list[str]] = None, jobs: int = 3) -> None:
+    """Pull every image the workshop uses.
+
+    Args:
+        profiles: The compose profiles to enable.
+        jobs: The maximum number of images to pull at once.
+
+    Raises:
+        DockerError: If any image fails to pull.
+    """
+    images = compose_images(profiles)
+    if not images:
+        print("No images to pull.")
+        return
+
+    client = engine()
+    print(f"⬇️  Pulling {len(images)} image(s), {jobs} at a time...")
+    progress = _PullProgress(len(images))
+    results = {}
+
+    def run(image: str) -> None:
+        try:
+            results[image] = _pull_one(client, image, progress)
+            icon, note = ('✅', 'pulled') if results[image] == 'pulled' else ('➖', 'up to date')
+            progress.finish(f"{icon} {image} {note}")
+        except DockerError as e:
+            results[image] = 'failed'
+            progress.finish(f"❌ {e}")
+
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        list(executor.map(run, images))
+
+    counts = {status: list(results.values()).count(status) for status in ('pulled', 'current', 'failed')}
+    summary = f"📦 {counts['pulled']} pulled, {counts['current']} up to date, {counts['failed']} failed"
+    if client:
+        rate = progress.downloaded / max(progress.elapsed, 1e-3)
+        summary += (
+            f" - {_format_bytes(progress.downloaded)} in {progress.elapsed:.0f}s ({_format_bytes(rate)}/s)"
+        )
+    print(summary)
+    if counts['failed']:
+        raise DockerError(f"{counts['failed']} image(s) failed to pull")
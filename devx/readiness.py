@@ -0,0 +1,286 @@
+"""Wait for the workshop services to become ready.
+
+With the Docker Engine API, container state changes arrive as engine events, and
+every service is watched at once from a single stream. Without it, the docker CLI is
+polled instead. The `devx` service is only ready once Jupyter answers HTTP, which can
+be long before services such as NIMs are, so callers are told as soon as it is.
+"""
+
+import queue
+import re
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional
+
+from devx.docker import (
+    DockerEngine,
+    DockerError,
+    compose_containers,
+    compose_containers_cli,
+    engine,
+    load_compose_file,
+)
+
+POLL_INTERVAL = 2
+DEVX_SERVICE = "devx"
+WATCHED_EVENTS = ["create", "start", "restart", "die", "health_status", "destroy"]
+EXIT_CODE_PATTERN = re.compile(r"Exited \((\d+)\)")
+
+
+class ServiceState(NamedTuple):
+    """The readiness of one workshop service.
+
+    Attributes:
+        service: The compose service name.
+        container: The container name.
+        state: A short description of the current state.
+        ready: Whether the service is ready.
+        failed: Whether the service stopped and will not recover on its own.
+        ready_after: Seconds from the start of the wait until the service was ready.
+    """
+    service: str
+    container: str
+    state: str
+    ready: bool = False
+    failed: bool = False
+    ready_after: Optional[float] = None
+
+
+def _inspect_state(info: dict) -> tuple[str, bool, bool]:
+    """Get (state, ready, failed) from a Docker Engine container inspection."""
+    state = info.get("State") or {}
+    status = state.get("Status", "unknown")
+    health = (state.get("Health") or {}).get("Status")
+
+    if status == "running":
+        if health in (None, "healthy"):
+            return health or "running", True, False
+        return health, False, False
+    if status == "exited":
+        code = state.get("ExitCode", 0)
+        if code == 0:
+            return "completed", True, False
+        restart_policy = ((info.get("HostConfig") or {}).get("RestartPolicy") or {}).get("Name")
+        return f"exited ({code})", False, restart_policy in (None, "", "no")
+    return status, False, False
+
+
+def _restart_policies(compose_file: Path) -> dict[str, Optional[str]]:
+    """Get the restart policy of every service of a compose file.
+
+    The docker CLI does not list the restart policy of a container, so it is read from
+    the compose file the containers were created from.
+    """
+    policies = {}
+    for name, service in (load_compose_file(compose_file).get("services") or {}).items():
+        service = service or {}
+        condition = ((service.get("deploy") or {}).get("restart_policy") or {}).get("condition")
+        policies[name] = service.get("restart") or {"any": "always", "none": "no"}.get(condition, condition)
+    return policies
+
+
+def _summary_state(container: dict, restart_policy: Optional[str] = None) -> tuple[str, bool, bool]:
+    """Get (state, ready, failed) from a docker CLI container summary and its restart policy."""
+    status = container.get("state") or "unknown"
+    health = container.get("health")
+
+    if status == "running":
+        if health in (None, "healthy"):
+            return health or "running", True, False
+        return health, False, False
+    if status == "exited":
+        code = EXIT_CODE_PATTERN.search(container.get("status") or "")
+        if code and code.group(1) == "0":
+            return "completed", True, False
+        failed = restart_policy in (None, "", "no")
+        return f"exited ({code.group(1)})" if code else "exited", False, failed
+    return status, False, False
+
+
+def _answers_http(url: str) -> bool:
+    """Check whether a URL answers HTTP without a server error."""
+    try:
+        with urllib.request.urlopen(url, timeout=POLL_INTERVAL):
+            return True
+    except urllib.error.HTTPError as e:
+        return e.code < 500
+    except (urllib.error.URLError, OSError):
+        return False
+
+
+class _ReadinessView:
+    """Renders the readiness of every service, redrawn in place on a terminal."""
+
+    def __init__(self, started: float, out=sys.stdout):
+        self._started = started
+        self._out = out
+        self._live = out.isatty()
+        self._drawn = 0
+        self._last: dict[str, ServiceState] = {}
+
+    def _line(self, state: ServiceState, width: int) -> str:
+        icon = "✅" if state.ready else "❌" if state.failed else "⏳"
+        seconds = state.ready_after if state.ready else time.monotonic() - self._started
+        return f"  {icon} {state.service.ljust(width)}  {state.state.ljust(18)} {seconds:6.0f}s"
+
+    def detach(self) -> None:
+        """Draw the services below whatever was printed since they were last drawn."""
+        self._drawn = 0
+
+    def render(self, states: dict[str, ServiceState]) -> None:
+        """Draw the services, or on a non-terminal print the ones that changed."""
+        width = max(len(service) for service in states)
+        if self._live:
+            if self._drawn:
+                self._out.write(f"\x1b[{self._drawn}F")
+            for state in states.values():
+                self._out.write(f"\x1b[2K{self._line(state, width)}\n")
+            self._drawn = len(states)
+        else:
+            for service, state in states.items():
+                previous = self._last.get(service)
+                if previous is None or previous[:5] != state[:5]:
+                    self._out.write(self._line(state, width) + "\n")
+            self._last = dict(states)
+        self._out.flush()
+
+
+def _report(states: dict[str, ServiceState]) -> str:
+    """Format the per-service timing report."""
+    width = max(len(service) for service in [*states, "SERVICE"])
+    lines = [f"{'SERVICE'.ljust(width)}  {'STATE'.ljust(18)} READY AFTER"]
+    for state in states.values():
+        ready_after = f"{state.ready_after:.0f}s" if state.ready else "not ready"
+        lines.append(f"{state.service.ljust(width)}  {state.state.ljust(18)} {ready_after}")
+    return "\n".join(lines)
+
+
+def _watch_events(client: DockerEngine, containers: list[str], changes: "queue.Queue[Optional[str]]"):
+    """Open an event stream for the containers and forward their IDs as they change.
+
+    Returns:
+        The event stream, to be closed by the caller.
+    """
+    stream = client.events({"type": ["container"], "container": containers, "event": WATCHED_EVENTS})
+
+    def forward():
+        for event in stream:
+            changes.put((event.get("Actor") or {}).get("ID") or event.get("id"))
+        # the stream ended, fall back to polling
+        changes.put(None)
+
+    threading.Thread(target=forward, name="devx-docker-events", daemon=True).start()
+    return stream
+
+
+# pylint: disable-next=too-many-locals,too-many-branches,too-many-statements
+def wait_until_ready(
+    compose_file: Path,
+    url: str,
+    timeout: float,
+    out=sys.stdout,
+    on_devx_ready: Optional[Callable[[], None]] = None,
+) -> dict[str, ServiceState]:
+    """Wait until every service of a compose file is ready.
+
+    A service is ready when its container is running and healthy (or has no healthcheck),
+    or has exited successfully. The `devx` service must also answer HTTP at `url`.
+
+    Args:
+        compose_file: The compose file the containers were created from.
+        url: The URL the `devx` service serves Jupyter on.
+        timeout: Seconds to wait for every service.
+        out: The stream to render progress to.
+        on_devx_ready: Called once, as soon as the `devx` service is ready (or right away
+            without one), while the other services are still waited for. What it prints
+            goes above the progress.
+
+    Returns:
+        The final state of every service.
+
+    Raises:
+        DockerError: If a service fails or the deadline passes before every service is ready.
+    """
+    started = time.monotonic()
+    client = engine()
+    containers = compose_containers(client, compose_file) if client else compose_containers_cli(compose_file)
+    if not containers:
+        raise DockerError("No workshop containers found")
+    restart_policies = {} if client else _restart_policies(compose_file)
+
+    ids = {}
+    states: dict[str, ServiceState] = {}
+    for container in containers:
+        service = container["service"] or container["name"]
+        ids[container["id"]] = service
+        states[service] = ServiceState(service, container["name"], "created")
+
+    def update(service: str, state: str, ready: bool, failed: bool) -> None:
+        if service == DEVX_SERVICE and ready and not states[service].ready:
+            if not _answers_http(url):
+                state, ready = "waiting for HTTP", False
+        ready_after = states[service].ready_after if states[service].ready else time.monotonic() - started
+        states[service] = states[service]._replace(
+            state=state, ready=ready, failed=failed, ready_after=ready_after if ready else None
+        )
+
+    def refresh_all() -> None:
+        if client:
+            for container_id, service in ids.items():
+                update(service, *_inspect_state(client.inspect_container(container_id)))
+        else:
+            for container in compose_containers_cli(compose_file):
+                service = container["service"] or container["name"]
+                if service in states:
+                    update(service, *_summary_state(container, restart_policies.get(container["service"])))
+
+    changes: "queue.Queue[Optional[str]]" = queue.Queue()
+    stream = _watch_events(client, [state.container for state in states.values()], changes) if client else None
+    view = _ReadinessView(started, out)
+    try:
+        refresh_all()
+        while True:
+            view.render(states)
+            if on_devx_ready and (DEVX_SERVICE not in states or states[DEVX_SERVICE].ready):
+                on_devx_ready()
+                on_devx_ready = None
+                view.detach()
+            if all(state.ready for state in states.values()):
+                return states
+
+            failed = [state.service for state in states.values() if state.failed]
+            elapsed = time.monotonic() - started
+            if failed or elapsed > timeout:
+                out.write("\n" + _report(states) + "\n")
+                reason = f"{', '.join(failed)} failed" if failed else f"timed out after {timeout:.0f}s"
+                raise DockerError(f"Workshop did not become ready: {reason}")
+
+            if stream is None:
+                time.sleep(POLL_INTERVAL)
+                refresh_all()
+                continue
+
+            # wait for engine events; time out regularly to redraw and probe HTTP
+            try:
+                changed = {changes.get(timeout=POLL_INTERVAL)}
+                while not changes.empty():
+                    changed.add(changes.get_nowait())
+            except queue.Empty:
+                changed = set()
+            if None in changed:
+                stream.close()
+                stream = None
+            for container_id in changed - {None}:
+                service = next((ids[i] for i in ids if container_id.startswith(i)), None)
+                if service:
+                    update(service, *_inspect_state(client.inspect_container(container_id)))
+            if DEVX_SERVICE in states and not states[DEVX_SERVICE].ready:
+                if states[DEVX_SERVICE].state == "waiting for HTTP":
+                    update(DEVX_SERVICE, "running", True, False)
+    finally:
+        if stream is not None:
+            stream.close()
@@ -0,0 +1,243 @@
+"""Repository metadata resolution without calling out to git.
+
+The project root, the git checkout and the origin remote are all found in a single
+walk up the directory tree. The git configuration is read directly from disk, which
+covers regular checkouts, worktrees and submodules (where `.git` is a file pointing
+at the real git directory). Results are memoized for the life of the process.
+
+This module must stay free of third party imports, it is used by the cli before any
+configuration is loaded.
+"""
+
+import re
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+# Container registries for known git hosts
+IMAGE_REGISTRIES = {
+    "github.com": "ghcr.io",
+    "gitlab.com": "registry.gitlab.com",
+}
+
+_SCP_URL = re.compile(r"^(?:[^@/]+@)?(?P<host>[^:/]+):(?P<path>[^/].*)$")
+_STANDARD_URL = re.compile(r"^(?P<scheme>[a-z+]+)://(?:[^@/]+@)?(?P<host>[^:/]+)(?::\d*)?/(?P<path>.+)$")
+
+_CACHE: dict[Path, "RepositoryMetadata"] = {}
+
+
+class RemoteUrl(NamedTuple):
+    """A parsed git remote URL.
+
+    Attributes:
+        host: The git server host name.
+        path: The repository path on the host, without a `.git` suffix.
+    """
+    host: str
+    path: str
+
+    @property
+    def https_url(self) -> str:
+        """The HTTPS URL of the repository."""
+        return f"https://{self.host}/{self.path}"
+
+    @property
+    def image_url(self) -> str:
+        """The container image URL in the host's registry.
+
+        Raises:
+            ValueError: If the host has no known container registry.
+        """
+        registry = IMAGE_REGISTRIES.get(self.host)
+        if registry is None:
+            raise ValueError(f"No known container registry for git host: {self.host}")
+        return f"{registry}/{self.path}"
+
+
+class RepositoryMetadata(NamedTuple):
+    """Metadata about the workshop project and the git checkout containing it.
+
+    Attributes:
+        project_root: Nearest directory with both a pyproject.toml and a .devx directory.
+        pyproject_dir: Nearest directory with a pyproject.toml.
+        git_root: Nearest directory with a .git directory or file.
+        remote_url: The URL of the origin remote.
+    """
+    project_root: Optional[Path]
+    pyproject_dir: Optional[Path]
+    git_root: Optional[Path]
+    remote_url: Optional[str]
+
+    @property
+    def relative_to_root(self) -> str:
+        """Relative path between the git root and pyproject.toml.
+
+        Raises:
+            RuntimeError: If either .git or pyproject.toml cannot be found.
+            ValueError: If pyproject.toml is not under the git root.
+        """
+        if not self.git_root:
+            raise RuntimeError("Could not find .git directory")
+        if not self.pyproject_dir:
+            raise RuntimeError("Could not find pyproject.toml")
+
+        try:
+            return str(self.pyproject_dir.relative_to(self.git_root))
+        except ValueError as exc:
+            raise ValueError("pyproject is not under git dir") from exc
+
+    @property
+    def remote(self) -> RemoteUrl:
+        """The parsed origin remote.
+
+        Raises:
+            ValueError: If there is no origin remote or its format is not supported.
+        """
+        if self.remote_url is None:
+            raise ValueError("Could not find the origin remote in the git configuration")
+        return parse_remote_url(self.remote_url)
+
+
+def parse_remote_url(remote_url: str) -> RemoteUrl:
+    """Parse a git remote URL.
+
+    Supports scp-like (`git@host:path`), `ssh://`, `git://`, `http://` and `https://`
+    remotes on any host.
+
+    Args:
+        remote_url: The remote URL.
+
+    Returns:
+        The parsed remote.
+
+    Raises:
+        ValueError: If the remote URL format is not supported.
+    """
+    match = _STANDARD_URL.match(remote_url)
+    if match and match.group('scheme') not in ('ssh', 'git', 'git+ssh', 'ssh+git', 'http', 'https'):
+        match = None
+    if not match and "://" not in remote_url:
+        match = _SCP_URL.match(remote_url)
+    if not match:
+        raise ValueError(f"Unsupported remote URL format: {remote_url}")
+
+    path = match.group('path').strip('/').removesuffix('.git')
+    if not path:
+        raise ValueError(f"Unsupported remote URL format: {remote_url}")
+    return RemoteUrl(match.group('host').lower(), path)
+
+
+def _git_dir(dot_git: Path) -> Path:
+    """Resolve the git directory for a `.git` entry.
+
+    Args:
+        dot_git: Path to a `.git` directory or file.
+
+    Returns:
+        The git directory.
+    """
+    if dot_git.is_dir():
+        return dot_git
+
+    content = dot_git.read_text(encoding='utf-8').strip()
+    if not content.startswith('gitdir:'):
+        raise ValueError(f"Invalid .git file: {dot_git}")
+    return (dot_git.parent / content.removeprefix('gitdir:').strip()).resolve()
+
+
+def _read_git_config(path: Path) -> dict[str, dict[str, str]]:
+    """Read a git config file.
+
+    Args:
+        path: Path to the config file.
+
+    Returns:
+        Mapping of section name (e.g. `remote "origin"`) to lower cased keys and values.
+    """
+    config: dict[str, dict[str, str]] = {}
+    section = None
+
+    try:
+        lines = path.read_text(encoding='utf-8').splitlines()
+    except FileNotFoundError:
+        return config
+
+    for line in lines:
+        line = line.strip()
+        if not line or line[0] in '#;':
+            continue
+        if line.startswith('['):
+            section = line[1:line.index(']')].strip()
+            name, _, subsection = section.partition(' ')
+            section = f'{name.lower()} {subsection}' if subsection else name.lower()
+            config.setdefault(section, {})
+            continue
+        if section is None or '=' not in line:
+            continue
+        key, value = (part.strip() for part in line.split('=', 1))
+        if len(value) > 1 and value[0] == value[-1] == '"':
+            value = value[1:-1]
+        config[section][key.lower()] = value
+
+    return config
+
+
+def _origin_url(dot_git: Path) -> Optional[str]:
+    """Read the origin remote URL from a checkout's git configuration.
+
+    Args:
+        dot_git: Path to the `.git` directory or file of the checkout.
+
+    Returns:
+        The origin URL, or None if it is not configured.
+    """
+    git_dir = _git_dir(dot_git)
+
+    # worktrees keep their shared configuration in the common git directory
+    common_dir = git_dir
+    commondir_file = git_dir / 'commondir'
+    if commondir_file.is_file():
+        common_dir = (git_dir / commondir_file.read_text(encoding='utf-8').strip()).resolve()
+
+    config = _read_git_config(common_dir / 'config')
+    for section, values in _read_git_config(git_dir / 'config.worktree').items():
+        config.setdefault(section, {}).update(values)
+
+    return config.get('remote "origin"', {}).get('url')
+
+
+def repository_metadata(start: Optional[Path] = None) -> RepositoryMetadata:
+    """Resolve the project and git metadata for a directory.
+
+    Args:
+        start: Directory to start searching from. Defaults to the current directory.
+
+    Returns:
+        The repository metadata.
+    """
+    start = (start or Path.cwd()).resolve()
+    if start in _CACHE:
+        return _CACHE[start]
+
+    project_root = pyproject_dir = git_root = None
+    current = start
+    while current.parent != current:
+        has_pyproject = (current / 'pyproject.toml').is_file()
+        if has_pyproject and not pyproject_dir:
+            pyproject_dir = current
+        if has_pyproject and not project_root and (current / '.devx').is_dir():
+            project_root = current
+        if not git_root and (current / '.git').exists():
+            git_root = current
+        if project_root and git_root:
+            break
+        current = current.parent
+
+    remote_url = _origin_url(git_root / '.git') if git_root else None
+    metadata = RepositoryMetadata(project_root, pyproject_dir, git_root, remote_url)
+    _CACHE[start] = metadata
+
+    # the cli changes into the project root before loading the configuration
+    if project_root and project_root != start and (not git_root or project_root.is_relative_to(git_root)):
+        _CACHE.setdefault(project_root, metadata._replace(pyproject_dir=project_root))
+
+    return metadata
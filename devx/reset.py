@@ -0,0 +1,231 @@
+"""Snapshot the workshop volumes and reset them to the snapshot.
+
+A snapshot archives each volume to `.devx/snapshots/<volume>.tar.gz`, and also copies
+it into a pristine volume on the Docker host. Resetting a volume replaces its content
+with a copy of the pristine volume, which `cp --reflink=auto` makes a copy-on-write
+clone on filesystems that support it, such as btrfs and XFS. Elsewhere the files are
+copied locally, which is still faster than decompressing the archive for every seat.
+The pristine volume is extracted from the archive again when the archive changed, so
+an archive copied from another host can be used to reset this one.
+
+The helper containers run the workshop image, so no other image has to be pulled.
+"""
+
+import os
+import subprocess
+import time
+from pathlib import Path
+from typing import Optional
+
+from devx.build import built_image
+from devx.constants import DEVX_DIR, TARGET_LOCAL_FILE
+from devx.docker import DockerError, compose_cli, compose_project_name, load_compose_file
+from devx.tenants import Tenant, for_each_tenant, run_compose, seed_workspace
+
+SNAPSHOTS_DIR = DEVX_DIR / 'snapshots'
+DEFAULT_VOLUMES = ['devx_home']
+SNAPSHOT_LABEL = 'devx.snapshot'
+
+
+def _docker(*args: str) -> str:
+    """Run a docker command and return its output.
+
+    Raises:
+        DockerError: If the docker CLI fails.
+    """
+    cmd = ['docker', *args]
+    try:
+        return subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+    except FileNotFoundError as e:
+        raise DockerError("The docker CLI is not installed") from e
+    except subprocess.CalledProcessError as e:
+        raise DockerError(f"`{' '.join(cmd[:3])}` failed: {e.stderr.strip() or e.returncode}") from e
+
+
+def _helper(script: str, *mounts: str) -> None:
+    """Run a shell script as root in a throwaway workshop container with the given volume mounts."""
+    args = ['run', '--rm', '--user', '0', '--entrypoint', 'sh']
+    for mount in mounts:
+        args.extend(['-v', mount])
+    _docker(*args, built_image(), '-c', script)
+
+
+def volume_name(volume: str, project: str, compose_file: Path = TARGET_LOCAL_FILE) -> str:
+    """Get the Docker name of a compose volume of the workshop.
+
+    Args:
+        volume: The volume as named in the compose file.
+        project: The compose project the volume belongs to.
+        compose_file: The compose file of the project.
+
+    Raises:
+        DockerError: If the compose file does not define the volume.
+    """
+    volumes = load_compose_file(compose_file).get('volumes') or {}
+    if volume not in volumes:
+        raise DockerError(f"Unknown volume '{volume}'. Defined volumes: {', '.join(volumes)}")
+    return (volumes[volume] or {}).get('name') or f"{project}_{volume}"
+
+
+def _volume_exists(name: str) -> bool:
+    """Check whether a Docker volume exists."""
+    try:
+        _docker('volume', 'inspect', name)
+    except DockerError:
+        return False
+    return True
+
+
+def _archive(volume: str) -> Path:
+    """Get the snapshot archive of a volume."""
+    return SNAPSHOTS_DIR / f"{volume}.tar.gz"
+
+
+def _archive_signature(archive: Path) -> str:
+    """Identify a version of a snapshot archive by its size and modification time."""
+    stat = archive.stat()
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def _pristine_volume(volume: str, base_project: str) -> str:
+    """Get the name of the volume that holds the pristine copy of a volume."""
+    return f"{base_project}-snapshot_{volume}"
+
+
+def _create_pristine_volume(name: str, archive: Path) -> None:
+    """Create an empty pristine volume, labeled with the archive version it holds."""
+    if _volume_exists(name):
+        _docker('volume', 'rm', name)
+    _docker('volume', 'create', '--label', f"{SNAPSHOT_LABEL}={_archive_signature(archive)}", name)
+
+
+def snapshot(volumes: Optional[list[str]] = None, tenant: Optional[Tenant] = None) -> None:
+    """Snapshot workshop volumes.
+
+    The workshop should be stopped, or at least idle, so the snapshot is consistent.
+
+    Args:
+        volumes: The compose volumes to snapshot. Defaults to `devx_home`.
+        tenant: The tenant to snapshot the volumes of, or None for the main workshop.
+
+    Raises:
+        DockerError: If a volume does not exist or cannot be archived.
+    """
+    base_project = compose_project_name(TARGET_LOCAL_FILE)
+    SNAPSHOTS_DIR.mkdir(parents=True, exist_ok=True)
+    for volume in volumes or DEFAULT_VOLUMES:
+        if tenant:
+            source = volume_name(volume, tenant.project, tenant.compose_file)
+        else:
+            source = volume_name(volume, base_project)
+        if not _volume_exists(source):
+            raise DockerError(f"Volume {source} does not exist, start the workshop first")
+
+        started = time.monotonic()
+        archive = _archive(volume)
+        pristine = _pristine_volume(volume, base_project)
+        print(f"📸 Snapshotting {source} to {archive}...")
+        _helper(
+            f"set -e; tar -czf /snapshots/.{archive.name} -C /volume . "
+            f"&& mv /snapshots/.{archive.name} /snapshots/{archive.name} "
+            f"&& chown {os.getuid()}:{os.getgid()} /snapshots/{archive.name}",
+            f"{source}:/volume:ro", f"{SNAPSHOTS_DIR.resolve()}:/snapshots",
+        )
+        _create_pristine_volume(pristine, archive)
+        _helper("cp -a /volume/. /pristine/", f"{source}:/volume:ro", f"{pristine}:/pristine")
+        size = archive.stat().st_size / 1000 ** 2
+        print(f"✅ {volume} snapshot taken in {time.monotonic() - started:.1f}s ({size:.1f} MB)")
+
+
+def _prepare_pristine_volume(volume: str, base_project: str) -> str:
+    """Make sure the pristine volume holds the current snapshot archive, extracting it if not.
+
+    Returns:
+        The name of the pristine volume.
+
+    Raises:
+        DockerError: If there is no snapshot of the volume.
+    """
+    archive = _archive(volume)
+    if not archive.exists():
+        raise DockerError(f"No snapshot of {volume} found, take one with `devx workshop snapshot`")
+
+    pristine = _pristine_volume(volume, base_project)
+    signature = _archive_signature(archive)
+    if _volume_exists(pristine):
+        label = _docker('volume', 'inspect', '--format', f'{{{{index .Labels "{SNAPSHOT_LABEL}"}}}}', pristine)
+        if label.strip() == signature:
+            return pristine
+
+    print(f"📦 Extracting {archive}...")
+    _create_pristine_volume(pristine, archive)
+    _helper(
+        f"tar -xzf /snapshots/{archive.name} -C /pristine",
+        f"{pristine}:/pristine", f"{SNAPSHOTS_DIR.resolve()}:/snapshots:ro",
+    )
+    return pristine
+
+
+def _restore(source: str, target: str) -> None:
+    """Replace the content of a volume with a copy-on-write clone of another, where supported."""
+    _helper(
+        "set -e; find /volume -mindepth 1 -delete; cp -a --reflink=auto /pristine/. /volume/",
+        f"{source}:/pristine:ro", f"{target}:/volume",
+    )
+
+
+def reset(
+    volumes: Optional[list[str]] = None, tenants: Optional[list[Tenant]] = None, jobs: int = 4
+) -> None:
+    """Reset workshop volumes to their snapshot.
+
+    The services are stopped while their volumes are restored, and started again
+    afterwards. Tenants also get a fresh copy of the project directory.
+
+    Args:
+        volumes: The compose volumes to reset. Defaults to `devx_home`.
+        tenants: The tenants to reset, or None for the main workshop.
+        jobs: The maximum number of tenants to reset at once.
+
+    Raises:
+        DockerError: If there is no snapshot or a reset fails.
+    """
+    volumes = volumes or DEFAULT_VOLUMES
+    base_project = compose_project_name(TARGET_LOCAL_FILE)
+    pristine = {volume: _prepare_pristine_volume(volume, base_project) for volume in volumes}
+
+    if tenants is None:
+        started = time.monotonic()
+        print("♻️  Resetting workshop...")
+        compose_cli(TARGET_LOCAL_FILE, None, 'stop')
+        for volume in volumes:
+            target = volume_name(volume, base_project)
+            if _volume_exists(target):
+                _restore(pristine[volume], target)
+        compose_cli(TARGET_LOCAL_FILE, None, 'start')
+        print(f"✅ Workshop reset in {time.monotonic() - started:.1f}s")
+        return
+
+    def reset_tenant(tenant: Tenant) -> str:
+        started = time.monotonic()
+        targets = [volume_name(volume, tenant.project, tenant.compose_file) for volume in volumes]
+        # shared volumes, such as model caches, are not reset per tenant
+        shared = [volume for volume, target in zip(volumes, targets) if not target.startswith(f"{tenant.project}_")]
+        if shared:
+            raise DockerError(f"{', '.join(shared)} is shared by every tenant")
+        if tenant.compose_file.exists():
+            run_compose(tenant, 'stop')
+        for volume, target in zip(volumes, targets):
+            if _volume_exists(target):
+                _restore(pristine[volume], target)
+        seed_workspace(tenant)
+        if tenant.compose_file.exists():
+            run_compose(tenant, 'start')
+        return f"reset in {time.monotonic() - started:.1f}s"
+
+    print(f"♻️  Resetting {len(tenants)} tenant(s), {jobs} at a time...")
+    started = time.monotonic()
+    failed = for_each_tenant(tenants, reset_tenant, jobs)
+    print(f"⏱️  {len(tenants) - failed} tenant(s) reset in {time.monotonic() - started:.1f}s")
+    if failed:
+        raise DockerError(f"{failed} tenant(s) failed to reset")
@@ -0,0 +1,278 @@
+"""Plan the memory, CPU and shared memory of the workshop services.
+
+Services declare what they need in an `x-devx-resources` extension of their compose
+definition:
+
+    x-devx-resources:
+      memory: 24g
+      cpus: 4
+      shm_size: 8g
+
+The reservations of every compose profile, plus the `devx` service's, are fitted into
+the budget of the host or instance. The memory and CPUs left over are shared equally
+between the services that declared needs, which become their limits, so no service
+can starve Jupyter of the resources it reserves. Profiles that do not fit are left
+unplanned, as they are usually meant for larger instance types.
+"""
+
+import os
+import re
+from typing import NamedTuple, Optional
+
+RESOURCES_KEY = 'x-devx-resources'
+DEVX_SERVICE = 'devx'
+GIB = 1024 ** 3
+MIB = 1024 ** 2
+# memory kept for the operating system and Docker
+HOST_MEMORY_SHARE = 0.1
+MIN_HOST_MEMORY = GIB
+MIN_CPUS = 0.5
+SIZE_PATTERN = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([kmgt]?)b?\s*$', re.IGNORECASE)
+SIZE_UNITS = {'': 1, 'k': 1024, 'm': MIB, 'g': GIB, 't': 1024 ** 4}
+
+
+class ResourceBudget(NamedTuple):
+    """The resources of a host or instance.
+
+    Attributes:
+        memory: Memory in bytes.
+        cpus: Number of CPUs.
+    """
+    memory: int
+    cpus: float
+
+    @property
+    def available_memory(self) -> int:
+        """Memory left for the services after the share kept for the host."""
+        return self.memory - max(int(self.memory * HOST_MEMORY_SHARE), MIN_HOST_MEMORY)
+
+
+class ServicePlan(NamedTuple):
+    """The resources planned for one service.
+
+    Attributes:
+        service: The compose service name.
+        profiles: The profiles the service runs with, empty if it always runs.
+        memory_reservation: Memory reserved for the service, in bytes.
+        memory_limit: Memory limit in bytes, or None for no limit.
+        cpus: CPU limit, or None for no limit.
+        shm_size: Shared memory size in bytes, or None to leave it unchanged.
+    """
+    service: str
+    profiles: list[str]
+    memory_reservation: int
+    memory_limit: Optional[int]
+    cpus: Optional[float]
+    shm_size: Optional[int]
+
+
+# the devx service runs Jupyter, and needs some room even when no resources are declared for it
+DEVX_DEFAULTS = {"memory": 2 * GIB, "cpus": 1.0}
+
+
+def parse_size(value: str | int | float) -> int:
+    """Parse a compose byte size such as `16gb`, `512m` or `1073741824`.
+
+    Raises:
+        ValueError: If the size cannot be parsed.
+    """
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = SIZE_PATTERN.match(str(value))
+    if not match:
+        raise ValueError(f"Invalid size '{value}'")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).lower()])
+
+
+def format_size(size: int) -> str:
+    """Format a byte size for compose, in whole MiB."""
+    return f"{size // MIB}m"
+
+
+def _format_gb(size: Optional[int]) -> str:
+    """Format a byte size for humans."""
+    return "-" if size is None else f"{size / GIB:.1f} GB"
+
+
+def host_budget() -> ResourceBudget:
+    """Get the memory and CPUs of this machine."""
+    return ResourceBudget(os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES'), float(os.cpu_count() or 1))
+
+
+def _hints(name: str, service: dict) -> Optional[dict]:
+    """Get the declared resource needs of a service, or None if it declares none."""
+    hints = service.get(RESOURCES_KEY)
+    if hints is None and name != DEVX_SERVICE:
+        return None
+    hints = {**(DEVX_DEFAULTS if name == DEVX_SERVICE else {}), **(hints or {})}
+    return {
+        "memory": parse_size(hints.get('memory', 0)),
+        "cpus": float(hints.get('cpus', 0)),
+        "shm_size": parse_size(hints['shm_size']) if 'shm_size' in hints else None,
+    }
+
+
+def declares_resources(services: dict) -> bool:
+    """Check whether any compose service declares its resource needs."""
+    return any(RESOURCES_KEY in (service or {}) for service in services.values())
+
+
+def _service_hints(services: dict) -> tuple[dict[str, dict], dict[str, list[str]], list[str]]:
+    """Collect the resource needs of the `devx` service and every service that declares them.
+
+    Returns:
+        Tuple of (needs by service, profiles by service, every profile).
+    """
+    hints = {name: _hints(name, service or {}) for name, service in {DEVX_SERVICE: {}, **services}.items()}
+    hints = {name: hint for name, hint in hints.items() if hint is not None}
+    service_profiles = {name: list((services.get(name) or {}).get('profiles') or []) for name in hints}
+    profiles = sorted({profile for names in service_profiles.values() for profile in names}) or ['default']
+    return hints, service_profiles, profiles
+
+
+def profile_reservations(services: dict) -> dict[str, tuple[int, float]]:
+    """Sum the memory and CPUs the services of each compose profile reserve together.
+
+    Args:
+        services: The compose services.
+
+    Returns:
+        Mapping of profile to its (memory, cpus) reservation, including the `devx`
+        service and the services without profiles.
+    """
+    hints, service_profiles, profiles = _service_hints(services)
+    reservations = {}
+    for profile in profiles:
+        active = [name for name in hints if not service_profiles[name] or profile in service_profiles[name]]
+        reservations[profile] = (
+            sum(hints[name]['memory'] for name in active), sum(hints[name]['cpus'] for name in active)
+        )
+    return reservations
+
+
+def affordable_profiles(services: dict, budget: ResourceBudget) -> list[str]:
+    """List the compose profiles whose reservations fit into a budget.
+
+    Profiles are often alternatives for instance types of different sizes, so the
+    profiles that do not fit are not planned, and should not be started.
+    """
+    return [
+        profile for profile, (memory, cpus) in profile_reservations(services).items()
+        if memory <= budget.available_memory and cpus <= budget.cpus
+    ]
+
+
+def plan_resources(
+    services: dict, budget: ResourceBudget, profiles: Optional[list[str]] = None
+) -> dict[str, ServicePlan]:
+    """Fit the declared needs of the services of every compose profile into a budget.
+
+    Services without profiles run with every profile, and the `devx` service always
+    runs. A service that runs with several profiles gets the smallest limits any of
+    them allows.
+
+    Args:
+        services: The compose services.
+        budget: The resources of the host or instance.
+        profiles: The profiles to plan. Defaults to every profile. Services that only
+            run with other profiles are left out, while services without profiles are
+            always planned.
+
+    Returns:
+        Mapping of service name to its plan, for the `devx` service and every planned
+        service that declares resource needs. Empty if no service declares resource needs.
+
+    Raises:
+        ValueError: If the reservations of a profile do not fit into the budget.
+    """
+    if not declares_resources(services):
+        return {}
+
+    hints, service_profiles, all_profiles = _service_hints(services)
+    profiles = all_profiles if profiles is None else profiles or ['default']
+    memory_limits: dict[str, float] = {}
+    cpu_limits: dict[str, float] = {}
+    planned = set()
+    for profile in profiles:
+        active = [name for name in hints if not service_profiles[name] or profile in service_profiles[name]]
+        planned.update(active)
+        reserved_memory = sum(hints[name]['memory'] for name in active)
+        reserved_cpus = sum(hints[name]['cpus'] for name in active)
+        profiled = profile in all_profiles and any(service_profiles.values())
+        scope = f"Profile {profile} reserves" if profiled else "The services that always run reserve"
+        if reserved_memory > budget.available_memory:
+            raise ValueError(
+                f"{scope} {_format_gb(reserved_memory)} of memory, but only "
+                f"{_format_gb(budget.available_memory)} of {_format_gb(budget.memory)} is available"
+            )
+        if reserved_cpus > budget.cpus:
+            raise ValueError(f"{scope} {reserved_cpus:g} CPUs, but only {budget.cpus:g} are available")
+
+        limited = [name for name in active if name != DEVX_SERVICE]
+        if not limited:
+            continue
+        memory_share = (budget.available_memory - reserved_memory) / len(limited)
+        cpu_share = (budget.cpus - reserved_cpus) / len(limited)
+        for name in limited:
+            memory_limits[name] = min(memory_limits.get(name, float('inf')), hints[name]['memory'] + memory_share)
+            cpu_limits[name] = min(cpu_limits.get(name, float('inf')), hints[name]['cpus'] + cpu_share)
+
+    plans = {}
+    for name, hint in hints.items():
+        if name not in planned:
+            continue
+        memory_limit = int(memory_limits[name]) if name in memory_limits else None
+        shm_size = hint['shm_size']
+        if shm_size is None and (services.get(name) or {}).get('shm_size') is not None:
+            shm_size = parse_size(services[name]['shm_size'])
+        # shared memory counts towards the memory limit of the container
+        if shm_size is not None and memory_limit is not None:
+            shm_size = min(shm_size, memory_limit // 2)
+        # CPU time is shared rather than exhausted, so every service keeps a little
+        cpus = round(min(max(cpu_limits[name], MIN_CPUS), budget.cpus), 2) if name in cpu_limits else None
+        plans[name] = ServicePlan(name, service_profiles[name], hint['memory'], memory_limit, cpus, shm_size)
+    return plans
+
+
+def apply_resource_plan(compose: dict, plans: dict[str, ServicePlan]) -> None:
+    """Write planned resources into the compose services and drop the resource hints."""
+    for name, service in compose['services'].items():
+        if not service:
+            continue
+        service = {key: value for key, value in service.items() if key != RESOURCES_KEY}
+        plan = plans.get(name)
+        if plan:
+            if plan.memory_reservation:
+                service['mem_reservation'] = format_size(plan.memory_reservation)
+            if plan.memory_limit is not None:
+                service['mem_limit'] = format_size(plan.memory_limit)
+            if plan.cpus is not None:
+                service['cpus'] = plan.cpus
+            if plan.shm_size is not None and service.get('ipc') != 'host':
+                service['shm_size'] = format_size(plan.shm_size)
+        compose['services'][name] = service
+
+
+def format_plan(plans: dict[str, ServicePlan], budget: ResourceBudget, services: dict) -> str:
+    """Format a resource plan as a budget table, followed by the reservations of every profile."""
+    width = max(len(name) for name in [*plans, "SERVICE"])
+    profiles_width = max([len(', '.join(plan.profiles) or 'all') for plan in plans.values()] + [len("PROFILES")])
+    lines = [
+        f"Budget: {_format_gb(budget.memory)} memory ({_format_gb(budget.memory - budget.available_memory)} "
+        f"kept for the host), {budget.cpus:g} CPUs",
+        f"{'SERVICE'.ljust(width)}  {'PROFILES'.ljust(profiles_width)}  {'RESERVED':>9}  {'LIMIT':>9}  "
+        f"{'CPUS':>5}  {'SHM':>9}",
+    ]
+    for plan in plans.values():
+        cpus = "-" if plan.cpus is None else f"{plan.cpus:g}"
+        lines.append(
+            f"{plan.service.ljust(width)}  {(', '.join(plan.profiles) or 'all').ljust(profiles_width)}  "
+            f"{_format_gb(plan.memory_reservation):>9}  {_format_gb(plan.memory_limit):>9}  {cpus:>5}  "
+            f"{_format_gb(plan.shm_size):>9}"
+        )
+
+    affordable = affordable_profiles(services, budget)
+    for profile, (memory, cpus) in profile_reservations(services).items():
+        icon, note = ("✅", "") if profile in affordable else ("❌", ", does not fit and is not planned")
+        lines.append(f"{icon} Profile {profile} reserves {_format_gb(memory)} and {cpus:g} CPUs{note}")
+    return "\n".join(lines)
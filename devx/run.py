@@ -1,46 +1,156 @@
 """Workshop running functionality."""
 
+import json
 import os
 import subprocess
-import webbrowser
+import tempfile
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
-from devx.sync import LOCAL_JUPYTER_PORT, TARGET_LOCAL_FILE
+from devx.constants import LOCAL_JUPYTER_PORT, TARGET_LOCAL_FILE, WHEELHOUSE_DIR
+from devx.docker import (
+    DockerError,
+    compose_config_hashes,
+    compose_containers,
+    compose_containers_cli,
+    engine,
+    load_compose_file,
+    profile_services,
+)
 
 
 def _run(cmd: List[str]) -> None:
-    """Run a command and handle errors."""
+    """Run a command and handle errors.
+
+    Raises:
+        DockerError: If the command is missing or exits with an error.
+    """
     if not TARGET_LOCAL_FILE.exists():
         print("⚠️  No workshop configuration found")
         return
 
     try:
         subprocess.run(cmd, check=True)
-    except subprocess.CalledProcessError:
-        pass
+    except FileNotFoundError as e:
+        raise DockerError(f"{cmd[0]} is not installed") from e
+    except subprocess.CalledProcessError as e:
+        raise DockerError(f"`{' '.join(map(str, cmd))}` exited with status {e.returncode}") from e
+
+
+def _compose_cmd(profiles: Optional[list[str]] = None) -> list:
+    """Get the docker compose command for the workshop with the given profiles enabled."""
+    cmd = ['docker', 'compose', '-f', TARGET_LOCAL_FILE]
+    for profile in profiles or []:
+        cmd.extend(['--profile', profile])
+    return cmd
+
+
+def containers() -> list[dict]:
+    """Get the state of the workshop's Docker containers.
+
+    Uses the Docker Engine API when its socket is reachable, and the docker CLI otherwise.
+
+    Returns:
+        The container summaries.
+
+    Raises:
+        DockerError: If the container state cannot be read.
+    """
+    client = engine()
+    if client:
+        return compose_containers(client, TARGET_LOCAL_FILE)
+    return compose_containers_cli(TARGET_LOCAL_FILE)
+
+
+def browser_host() -> str:
+    """Get the host name to open the workshop at, which is this host's address when connected over SSH."""
+    ssh_connection = os.environ.get('SSH_CONNECTION', '')
+    return ssh_connection.split()[2] if ssh_connection and len(ssh_connection.split()) > 2 else 'localhost'
+
+
+def _rebuild_reasons(rebuild: bool) -> list[str]:
+    """Get the reasons to rebuild the workshop image, or an empty list to reuse it."""
+    if not TARGET_LOCAL_FILE.exists():
+        return []
+    from devx.build import rebuild_reasons  # pylint: disable=import-outside-toplevel
+
+    return rebuild_reasons(force=rebuild)
+
+
+def _prepare_build() -> None:
+    """Create what the image build needs before docker compose builds it."""
+    # the template Dockerfile bind mounts the wheelhouse, which must exist even when it is empty
+    WHEELHOUSE_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def _record_build() -> None:
+    """Record the fingerprint of the image that was just built."""
+    from devx.build import record_build  # pylint: disable=import-outside-toplevel
+
+    record_build()
 
-def start(no_browser: bool = False) -> None:
+
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
+def start(
+    no_browser: bool = False,
+    wait: bool = False,
+    timeout: float = 1800,
+    rebuild: bool = False,
+    services: Optional[list[str]] = None,
+    profiles: Optional[list[str]] = None,
+) -> None:
     """Start the workshop locally.
 
     Args:
-        args: Command line arguments.
+        no_browser: Whether to skip opening the browser.
+        wait: Whether to wait until every service is ready. The browser opens as soon as
+            Jupyter answers, while the other services are still waited for.
+        timeout: Seconds to wait for every service to be ready.
+        rebuild: Whether to rebuild the workshop image even if its inputs are unchanged.
+        services: The services to start. Defaults to every service.
+        profiles: The compose profiles to enable.
+
+    Raises:
+        DockerError: If the workshop fails to start or does not become ready in time.
     """
     print("🚀 Starting workshop...")
 
+    # only send the build context to docker when the image inputs changed
+    reasons = _rebuild_reasons(rebuild)
+    if reasons:
+        print(f"🔨 Rebuilding workshop image: {'; '.join(reasons)}")
+
     # run docker compose
-    cmd = ['docker', 'compose', '-f', TARGET_LOCAL_FILE, 'up', '--build', '-d']
+    cmd = [*_compose_cmd(profiles), 'up', '-d']
+    if reasons:
+        _prepare_build()
+        cmd.append('--build')
     if Path('workshop.env').exists():
         cmd.extend(['--env-file', 'workshop.env'])
-    _run(cmd)
+    _run([*cmd, *(services or [])])
+    if reasons:
+        _record_build()
 
-    # open browser
-    if not no_browser:
-        ssh_connection = os.environ.get('SSH_CONNECTION', '')
-        host = ssh_connection.split()[2] if ssh_connection and len(ssh_connection.split()) > 2 else 'localhost'
+    def open_browser() -> None:
+        import webbrowser  # pylint: disable=import-outside-toplevel
+
+        host = browser_host()
         print(f"Opening browser to http://{host}:{LOCAL_JUPYTER_PORT}")
         webbrowser.open(f"http://{host}:{LOCAL_JUPYTER_PORT}")
 
+    if wait and TARGET_LOCAL_FILE.exists():
+        from devx.readiness import wait_until_ready  # pylint: disable=import-outside-toplevel
+
+        print("⏳ Waiting for services...")
+        # services such as NIMs can take much longer than Jupyter, which is usable before they are ready
+        wait_until_ready(
+            TARGET_LOCAL_FILE, f"http://localhost:{LOCAL_JUPYTER_PORT}", timeout,
+            on_devx_ready=None if no_browser else open_browser,
+        )
+        print("✅ Workshop is ready")
+    elif not no_browser:
+        open_browser()
+
 
 def stop() -> None:
     """Stop the workshop's Docker containers."""
@@ -48,19 +158,197 @@ def stop() -> None:
     _run(['docker', 'compose', '-f', TARGET_LOCAL_FILE, 'down', '--remove-orphans'])
 
 
-def build() -> None:
-    """Build the workshop's Docker container."""
-    print("🔨 Building workshop container...")
-    _run(['docker', 'compose', '-f', TARGET_LOCAL_FILE, 'build'])
+def build(
+    rebuild: bool = False,
+    cache_from: Optional[list[str]] = None,
+    cache_to: Optional[list[str]] = None,
+    wheelhouse: bool = False,
+) -> None:
+    """Build the workshop's Docker container if its inputs changed since the last build.
+
+    Args:
+        rebuild: Whether to build even if the inputs are unchanged.
+        cache_from: Additional BuildKit cache sources for this build. Builds even if
+            the inputs are unchanged.
+        cache_to: Additional BuildKit cache destinations for this build. Builds even if
+            the inputs are unchanged, so the cache is exported.
+        wheelhouse: Whether to collect the Python dependencies into `.devx/wheelhouse`,
+            in addition to the `[tool.devx.build]` setting. They are collected whether
+            or not the image was rebuilt.
+    """
+    from devx.build import write_cache_override  # pylint: disable=import-outside-toplevel
+
+    reasons = _rebuild_reasons(rebuild)
+    if not reasons and (cache_from or cache_to):
+        reasons = ["BuildKit cache settings given"]
+
+    if TARGET_LOCAL_FILE.exists() and not reasons:
+        print("✅ Workshop container is up to date, no build inputs changed (use --rebuild to build anyway)")
+    else:
+        print("🔨 Building workshop container...")
+        for reason in reasons:
+            print(f"  - {reason}")
+
+        _prepare_build()
+        cmd = ['docker', 'compose', '-f', TARGET_LOCAL_FILE]
+        with tempfile.TemporaryDirectory() as override_dir:
+            if cache_from or cache_to:
+                override = Path(override_dir) / 'compose.cache.yaml'
+                write_cache_override(override, cache_from or [], cache_to or [])
+                cmd.extend(['-f', override])
+            _run([*cmd, 'build'])
+        if reasons:
+            _record_build()
+
+    _collect_wheelhouse(wheelhouse)
+
+
+def _collect_wheelhouse(requested: bool) -> None:
+    """Collect the Python dependencies into the wheelhouse, if requested or configured."""
+    from devx.build import project_dependencies, wheelhouse_command  # pylint: disable=import-outside-toplevel
+    from devx.models import BuildSettings  # pylint: disable=import-outside-toplevel
+
+    if not TARGET_LOCAL_FILE.exists() or not (requested or BuildSettings().wheelhouse):
+        return
+    dependencies = project_dependencies()
+    if not dependencies:
+        print("➖ pyproject.toml declares no dependencies, the wheelhouse is left empty")
+        return
+    print(f"📦 Collecting Python wheels into {WHEELHOUSE_DIR}...")
+    WHEELHOUSE_DIR.mkdir(exist_ok=True)
+    _run(wheelhouse_command(dependencies))
+
+
+def recreate(services: list[str], removed: Optional[list[str]] = None) -> None:
+    """Recreate some of the workshop's services, leaving the others untouched.
 
+    Naming a service enables its compose profile, so callers should only pass services
+    that are meant to run.
 
-def restart() -> None:
-    """Restart the workshop's Docker containers."""
+    Args:
+        services: The services to recreate.
+        removed: Services that are no longer defined, whose containers are removed.
+    """
+    if services:
+        _run(['docker', 'compose', '-f', TARGET_LOCAL_FILE, 'up', '-d', '--no-deps', *services])
+    stale = [container['name'] for container in containers() if container['service'] in (removed or [])]
+    if stale:
+        _run(['docker', 'rm', '-f', *stale])
+
+
+def _select_services(services: Optional[list[str]], profiles: Optional[list[str]]) -> list[str]:
+    """Combine the named services with the services of the given profiles.
+
+    Returns:
+        The selected services, or an empty list for every service.
+
+    Raises:
+        DockerError: If a service is not defined or a profile has no services.
+    """
+    defined = load_compose_file(TARGET_LOCAL_FILE).get('services') or {}
+    unknown = [service for service in services or [] if service not in defined]
+    if unknown:
+        raise DockerError(f"Unknown service(s): {', '.join(unknown)}. Defined services: {', '.join(defined)}")
+
+    selected = list(services or [])
+    for profile in profiles or []:
+        in_profile = profile_services(TARGET_LOCAL_FILE, [profile])
+        if not in_profile:
+            raise DockerError(f"No services use the compose profile '{profile}'")
+        selected += [service for service in in_profile if service not in selected]
+    return selected
+
+
+def drifted_services(profiles: Optional[list[str]] = None) -> list[str]:
+    """Find the services whose containers were created from an older compose definition.
+
+    The configuration hash docker compose labels each container with is compared to
+    the hash of the service in the compiled `.devx/compose.local.yaml`.
+
+    Args:
+        profiles: The compose profiles to enable.
+
+    Returns:
+        The drifted services.
+
+    Raises:
+        DockerError: If the containers or the compose configuration cannot be read.
+    """
+    expected = compose_config_hashes(TARGET_LOCAL_FILE, profiles)
+    return sorted({
+        container['service'] for container in containers()
+        if container['service'] in expected and container['config_hash'] != expected[container['service']]
+    })
+
+
+def restart(
+    services: Optional[list[str]] = None, profiles: Optional[list[str]] = None, changed: bool = False
+) -> None:
+    """Restart the workshop's Docker containers.
+
+    Args:
+        services: The services to restart. Defaults to every service.
+        profiles: Also restart the services of these compose profiles.
+        changed: Whether to recreate only the services whose definition changed instead.
+    """
+    if not TARGET_LOCAL_FILE.exists():
+        print("⚠️  No workshop configuration found")
+        return
+
+    if changed:
+        print("🔍 Checking for changed services...")
+        drifted = drifted_services(profiles)
+        if not drifted:
+            print("✅ Every running service matches the compose file")
+            return
+        for service in drifted:
+            print(f"♻️  Recreating {service}")
+        _run([*_compose_cmd(profiles), 'up', '-d', '--no-deps', *drifted])
+        return
+
+    selected = _select_services(services, profiles)
     print("🔄 Restarting workshop...")
-    _run(['docker', 'compose', '-f', TARGET_LOCAL_FILE, 'restart'])
+    client = engine()
+    if client is None:
+        _run([*_compose_cmd(profiles), 'restart', *selected])
+        return
+
+    for container in compose_containers(client, TARGET_LOCAL_FILE):
+        if selected and container['service'] not in selected:
+            continue
+        print(f"  {container['name']}")
+        client.restart_container(container['id'])
+
 
+def status(as_json: bool = False) -> None:
+    """Check the status of the workshop's Docker containers.
+
+    Args:
+        as_json: Whether to print the container state as JSON.
+    """
+    if not TARGET_LOCAL_FILE.exists():
+        if as_json:
+            raise DockerError("No workshop configuration found")
+        print("⚠️  No workshop configuration found")
+        return
+
+    if as_json:
+        print(json.dumps(containers(), indent=2))
+        return
 
-def status() -> None:
-    """Check the status of the workshop's Docker containers."""
     print("📊 Checking workshop status...")
-    _run(['docker', 'compose', '-f', TARGET_LOCAL_FILE, 'ps'])
+    summaries = containers()
+    if not summaries:
+        print("No workshop containers found.")
+        return
+
+    columns = ["service", "name", "state", "health", "ports"]
+    rows = [[column.upper() for column in columns]]
+    for container in summaries:
+        rows.append([
+            ", ".join(value) if isinstance(value, list) else str(value or "-")
+            for value in (container[column] for column in columns)
+        ])
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns))]
+    for row in rows:
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip())
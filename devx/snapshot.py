@@ -0,0 +1,123 @@
+"""Resolved configuration snapshot.
+
+Loading `Project` and `BrevWorkspace` parses pyproject.toml, runs the validators and
+queries the workspace registry. The validated values are cached in `.devx/` and reused
+until pyproject.toml, the registry, the git remote or the devx version change.
+"""
+
+import hashlib
+import json
+from importlib import metadata
+
+from devx.constants import DEVX_DIR, PYPROJECT_FILE
+from devx.models import BrevTarget, BrevWorkspace, Port, Project
+from devx.repository import repository_metadata
+from devx.workspaces import WORKSPACES
+
+SNAPSHOT_FILE = DEVX_DIR / 'resolved_config.json'
+SNAPSHOT_VERSION = 2
+
+
+def _snapshot_key() -> str:
+    """Hash everything the resolved configuration is derived from.
+
+    Returns:
+        The hex sha256 digest of the configuration inputs.
+    """
+    repo = repository_metadata()
+    try:
+        devx_version = metadata.version('workshop-framework')
+    except metadata.PackageNotFoundError:
+        devx_version = 'unknown'
+
+    digest = hashlib.sha256()
+    with open(PYPROJECT_FILE, 'rb') as f:
+        digest.update(f.read())
+    digest.update(json.dumps({
+        "registry": WORKSPACES.fingerprint(),
+        "remote_url": repo.remote_url,
+        "git_root": str(repo.git_root),
+        "pyproject_dir": str(repo.pyproject_dir),
+        "devx": devx_version,
+    }, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def resolved_config(project: Project, workspace: BrevWorkspace) -> dict:
+    """Get the resolved configuration values.
+
+    Args:
+        project: Project configuration.
+        workspace: Brev workspace configuration.
+
+    Returns:
+        A JSON serializable dictionary of the resolved configuration.
+    """
+    return {
+        "project": project.model_dump(mode='json'),
+        "workspace": {
+            **workspace.model_dump(mode='json'),
+            "workspace_group_id": workspace.workspace_group_id,
+        },
+    }
+
+
+def _load_snapshot(key: str) -> dict | None:
+    """Load the snapshot if it was written for the given inputs.
+
+    Args:
+        key: The current snapshot key.
+
+    Returns:
+        The resolved configuration, or None if the snapshot is missing or stale.
+    """
+    try:
+        with open(SNAPSHOT_FILE, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    if snapshot.get('version') != SNAPSHOT_VERSION or snapshot.get('key') != key:
+        return None
+    return snapshot.get('config')
+
+
+def _write_snapshot(key: str, config: dict) -> None:
+    """Write the snapshot.
+
+    Args:
+        key: The current snapshot key.
+        config: The resolved configuration.
+    """
+    if not DEVX_DIR.is_dir():
+        return
+    with open(SNAPSHOT_FILE, 'w', encoding='utf-8') as f:
+        json.dump({"version": SNAPSHOT_VERSION, "key": key, "config": config}, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def load_config() -> tuple[Project, BrevWorkspace, dict]:
+    """Load the project and workspace configuration, using the snapshot when it is current.
+
+    Returns:
+        Tuple of (project, workspace, resolved configuration).
+    """
+    key = _snapshot_key()
+    config = _load_snapshot(key)
+
+    if config is None:
+        project = Project()
+        workspace = BrevWorkspace()
+        config = resolved_config(project, workspace)
+        _write_snapshot(key, config)
+        return project, workspace, config
+
+    # the snapshot holds validated values, skip validation when rebuilding the models
+    workspace_values = {k: v for k, v in config['workspace'].items() if k != 'workspace_group_id'}
+    workspace_values['ports'] = [Port.model_construct(**port) for port in workspace_values['ports']]
+    workspace_values['targets'] = [
+        BrevTarget.model_construct(**target) for target in workspace_values.get('targets', [])
+    ]
+    project = Project.model_construct(**config['project'])
+    workspace = BrevWorkspace.model_construct(**workspace_values)
+    return project, workspace, config
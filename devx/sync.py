@@ -1,24 +1,64 @@
 """Workshop file synchronization functionality."""
 
+import copy
+import functools
 import grp
+import json
 import os
+import re
+import shlex
+import subprocess
+from importlib import metadata
 from pathlib import Path
+from typing import Callable, NamedTuple
 
 import yaml
 from dotenv import dotenv_values
 
-from devx.models import BrevWorkspace, Project
+from devx.constants import (
+    DEVX_DIR,
+    LOCAL_JUPYTER_PORT,
+    PYPROJECT_FILE,
+    TARGET_BRANCH,
+    TARGET_LAUNCHABLE_FILE,
+    TARGET_LOCAL_FILE,
+)
+from devx.hashing import hash_bytes, hash_file
+from devx.models import BrevWorkspace, BuildSettings, Project, WorkspaceGroupConfig
+from devx.resources import (
+    RESOURCES_KEY,
+    ResourceBudget,
+    ServicePlan,
+    affordable_profiles,
+    apply_resource_plan,
+    declares_resources,
+    format_plan,
+    host_budget,
+    parse_size,
+    plan_resources,
+)
+from devx.workspaces import WORKSPACES
 
-DEVX_DIR = Path('.devx')
-TARGET_BRANCH = 'main'
-TARGET_LAUNCHABLE_FILE = DEVX_DIR / 'compose.yaml'
-TARGET_LOCAL_FILE = DEVX_DIR / 'compose.local.yaml'
+MANIFEST_FILE = DEVX_DIR / 'manifest.json'
+MANIFEST_VERSION = 1
 USER_COMPOSE_PATHS = [Path('compose.yaml'), Path('compose.yml')]
 USER_COMPOSE_PATH = next((path for path in USER_COMPOSE_PATHS if path.exists()), USER_COMPOSE_PATHS[0])
-LOCAL_JUPYTER_PORT = 8888
 LOCAL_ENV_FILE = Path('variables.env')
-PYPROJECT_FILE = Path('pyproject.toml')
+# Prefer the libyaml bindings when PyYAML was built with them
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+YAML_DUMPER = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
 ENV_INJECTION_VARS = {"NGC_API_KEY": "${NGC_API_KEY}", "COMPOSE_PROJECT_NAME": "${COMPOSE_PROJECT_NAME:-devx}"}
+PREFETCH_SERVICE = 'devx-prefetch'
+PREFETCH_IMAGE = 'docker:cli'
+NIM_IMAGE_PREFIX = 'nvcr.io/nim/'
+NIM_CACHE_DIR = '/opt/nim/.cache'
+STORAGE_SERVICE = 'devx-storage'
+STORAGE_IMAGE = 'busybox:stable'
+DATA_VOLUME_LABEL = 'devx.storage'
+DATA_VOLUME_TAGS = ('cache', 'data')
+# Brev instance types end in the GPU count, e.g. `l40s-48gb.2x` or `n1-standard-8:nvidia-tesla-t4:1`
+INSTANCE_GPU_COUNT_PATTERN = re.compile(r'(?:\.(\d+)x|:(\d+))$')
+HOST_GPUS_DIR = Path('/proc/driver/nvidia/gpus')
 
 
 def _get_docker_gid() -> int:
@@ -56,6 +96,17 @@ def _parse_env_file(env_file_path: Path) -> dict:
     return env_vars
 
 
+class ComposeSource(NamedTuple):
+    """The parsed inputs to compose compilation.
+
+    Attributes:
+        compose: The user compose file contents.
+        environment: The environment variables for the devx service.
+    """
+    compose: dict
+    environment: dict
+
+
 def _read_compose_file(compose_path: Path) -> dict:
     """Read and parse a docker compose file.
 
@@ -67,29 +118,100 @@ def _read_compose_file(compose_path: Path) -> dict:
     """
     try:
         with open(compose_path, 'r', encoding='utf-8') as f:
-            compose = yaml.load(f.read(), Loader=yaml.SafeLoader) or {}
+            compose = yaml.load(f, Loader=YAML_LOADER) or {}
     except FileNotFoundError:
         compose = {}
 
-    compose['services'] = compose.get('services', {})
+    compose['services'] = compose.get('services') or {}
     compose['services']['devx'] = compose['services'].get('devx', {})
-    compose['volumes'] = compose.get('volumes', {})
-    compose['networks'] = compose.get('networks', {})
+    compose['volumes'] = compose.get('volumes') or {}
+    compose['networks'] = compose.get('networks') or {}
 
     return compose
 
 
-def compile_local_compose(compose_path: Path, jupyter_port: int) -> str:
-    """Get the docker compose file content.
+def read_compose_source(compose_path: Path, env_path: Path) -> ComposeSource:
+    """Parse the compose and environment files once for all compile targets.
 
     Args:
         compose_path: Path to the docker compose file.
+        env_path: Path to the .env file.
+
+    Returns:
+        The parsed compose source.
+    """
+    return ComposeSource(_read_compose_file(compose_path), _parse_env_file(env_path))
+
+
+def _target_compose(source: ComposeSource) -> dict:
+    """Copy the sections of the parsed compose file that the target transforms modify.
+
+    The transforms only replace top level entries of these sections, so a shallow copy
+    is enough to keep the parsed source reusable across targets.
+
+    Args:
+        source: The parsed compose source.
+
+    Returns:
+        A compose dictionary that can be modified without affecting the source.
+    """
+    compose = dict(source.compose)
+    for section in ('services', 'volumes', 'networks'):
+        compose[section] = dict(compose[section])
+    return compose
+
+
+def resolve_build_cache(entries: list[str]) -> list[str]:
+    """Make the paths of local BuildKit caches absolute.
+
+    Args:
+        entries: BuildKit cache settings, e.g. `type=local,src=.devx/cache`.
+
+    Returns:
+        The cache settings with `src` and `dest` of local caches resolved from the
+        project root, so they do not depend on where docker compose is run from.
+    """
+    resolved = []
+    for entry in entries:
+        fields = entry.split(',')
+        if 'type=local' in fields:
+            fields = [
+                f"{key}={Path(value).resolve()}" if key in ('src', 'dest') else f"{key}={value}"
+                for key, _, value in (field.partition('=') for field in fields)
+            ]
+        resolved.append(','.join(fields))
+    return resolved
+
+
+def transform_local_compose(
+    source: ComposeSource,
+    jupyter_port: int,
+    build: BuildSettings | None = None,
+    gpu_count: int | None = None,
+    budget: ResourceBudget | None = None,
+) -> dict:
+    """Apply the local development transforms to a parsed compose source.
+
+    Args:
+        source: The parsed compose source.
         jupyter_port: Port to use for Jupyter.
+        build: Local image build settings.
+        gpu_count: The number of GPUs to allocate to the services, or None to leave the
+            GPU reservations unchanged.
+        budget: The memory and CPUs to plan the service resources for, or None to
+            leave them unchanged. The resources are left unchanged too when the
+            services that always run do not fit into it.
 
     Returns:
-        The docker compose file content.
+        The local docker compose definition.
+
+    Raises:
+        ValueError: If the services that always run need more GPUs than are available.
     """
-    compose = _read_compose_file(compose_path)
+    compose = _target_compose(source)
+    if gpu_count is not None:
+        # the services of profiles that do not fit keep their GPU counts, docker refuses to start them here
+        _apply_gpu_allocation(compose, gpu_count, 'keep')
 
     # Add devx service
     compose['services']['devx'] = {
@@ -100,7 +222,7 @@ def compile_local_compose(compose_path: Path, jupyter_port: int) -> str:
             "/var/run/docker.sock:/var/run/docker.sock",
             "devx_home:/home/nvidia"
         ],
-        "environment": _parse_env_file(Path('variables.env')),
+        "environment": dict(source.environment),
         "networks": ["devx"],
         "restart": "always",
         "build": {
@@ -113,30 +235,475 @@ def compile_local_compose(compose_path: Path, jupyter_port: int) -> str:
         }
     }
 
+    if build and build.cache_from:
+        compose['services']['devx']['build']['cache_from'] = resolve_build_cache(build.cache_from)
+    if build and build.cache_to:
+        compose['services']['devx']['build']['cache_to'] = resolve_build_cache(build.cache_to)
+
     compose['volumes']['devx_home'] = None
     compose['networks']['devx'] = {"driver": "bridge"}
 
-    return yaml.dump(compose)
+    apply_resource_plan(compose, _plan_local_resources(source.compose['services'], budget)[0] if budget else {})
 
+    return compose
+
+
+def _named_volume_mounts(service: dict) -> dict[str, str]:
+    """Get the named volumes a service mounts, keyed by their path in the container."""
+    mounts = {}
+    for volume in service.get('volumes') or []:
+        if isinstance(volume, dict):
+            if volume.get('type', 'volume') == 'volume' and volume.get('source'):
+                mounts[volume['target']] = volume['source']
+            continue
+        source, _, rest = str(volume).partition(':')
+        if rest and not source.startswith(('.', '/', '~', '$')):
+            mounts[rest.split(':')[0]] = source
+    return mounts
+
+
+def _gpu_devices(service: dict) -> list[dict]:
+    """Get the GPU device reservations of a compose service."""
+    reservations = ((service.get('deploy') or {}).get('resources') or {}).get('reservations') or {}
+    return [device for device in reservations.get('devices') or [] if 'gpu' in (device.get('capabilities') or [])]
+
+
+def _gpu_request(service: dict) -> list[str]:
+    """Get the `docker run` arguments that reserve the same GPUs as a compose service."""
+    devices = _gpu_devices(service)
+    if not devices:
+        return []
+    device_ids = [str(device_id) for device in devices for device_id in device.get('device_ids') or []]
+    return ['--gpus', f"'\"device={','.join(device_ids)}\"'" if device_ids else 'all']
+
+
+def instance_gpu_count(instance_type: str) -> int | None:
+    """Get the GPU count of a Brev instance type, or None if the name does not tell."""
+    match = INSTANCE_GPU_COUNT_PATTERN.search(instance_type)
+    return int(match.group(1) or match.group(2)) if match else None
+
+
+def host_gpu_count() -> int | None:
+    """Count the NVIDIA GPUs of this machine.
+
+    The GPUs the driver exposes in `/proc` are counted, falling back to `nvidia-smi -L`.
+
+    Returns:
+        The GPU count, or None if this machine has no NVIDIA GPU.
+    """
+    try:
+        return len(os.listdir(HOST_GPUS_DIR)) or None
+    except OSError:
+        pass
+    try:
+        result = subprocess.run(['nvidia-smi', '-L'], capture_output=True, text=True, check=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return sum(1 for line in result.stdout.splitlines() if line.startswith('GPU ')) or None
+
+
+def target_gpu_count(workspace: BrevWorkspace) -> int | None:
+    """Get the GPU count every publish target of a workspace has.
+
+    The `gpus` setting overrides the count taken from the instance type. The launchable
+    compose file is shared by every target, so the smallest known count is used.
+
+    Returns:
+        The GPU count, or None if no target's GPU count is known.
+    """
+    counts = [
+        target.gpus or instance_gpu_count(target.instance_type) for target in workspace.target_workspaces().values()
+    ]
+    known = [count for count in counts if count]
+    return min(known) if known else None
+
+
+def _plan_resources(services: dict, budget: ResourceBudget) -> dict[str, ServicePlan]:
+    """Plan the resources of the services of the compose profiles that fit into a budget."""
+    return plan_resources(services, budget, affordable_profiles(services, budget))
+
+
+def _plan_local_resources(services: dict, budget: ResourceBudget) -> tuple[dict[str, ServicePlan], str | None]:
+    """Plan the resources of the local services, without limits when the services do not fit.
+
+    Small machines still run the workshop, only without the planned limits, so a
+    budget that is too small is a warning locally rather than an error.
+
+    Returns:
+        Tuple of (the plan, or an empty plan when the services do not fit, the warning).
+    """
+    try:
+        return _plan_resources(services, budget), None
+    except ValueError as e:
+        return {}, f"{e}, the local services run without resource limits"
+
+
+def target_budget(workspace: BrevWorkspace) -> ResourceBudget | None:
+    """Get the memory and CPUs every publish target of a workspace has.
+
+    Returns:
+        The smallest `memory` and `cpus` settings of the targets, or None unless every
+        target sets both.
+    """
+    targets = workspace.target_workspaces().values()
+    if any(target.memory is None or target.cpus is None for target in targets):
+        return None
+    return ResourceBudget(min(parse_size(target.memory) for target in targets), min(target.cpus for target in targets))
+
+
+def _gpu_reservations(services: dict) -> tuple[dict[str, list[str]], dict[str, int]]:
+    """Split the GPU reservations of compose services into fixed device IDs and GPU counts."""
+    fixed: dict[str, list[str]] = {}
+    requested: dict[str, int] = {}
+    for name, service in services.items():
+        for device in _gpu_devices(service or {}):
+            if device.get('device_ids'):
+                fixed[name] = fixed.get(name, []) + [str(device_id) for device_id in device['device_ids']]
+            elif isinstance(device.get('count'), int):
+                requested[name] = requested.get(name, 0) + device['count']
+    return fixed, {name: count for name, count in requested.items() if name not in fixed}
 
-def compile_launchable_compose(compose_path: Path, image_url: str, workspace_group_id: str) -> str:
-    """Get the docker compose file content.
+
+def _compose_profiles(services: dict) -> list[str]:
+    """List the profiles of compose services, or `default` if no service has a profile."""
+    profiles = {profile for service in services.values() for profile in (service or {}).get('profiles') or []}
+    return sorted(profiles) or ['default']
+
+
+def profile_gpu_demand(services: dict) -> dict[str, int]:
+    """Count the GPUs the services of each compose profile reserve together.
 
     Args:
-        compose_path: Path to the docker compose file.
-        image_url: URL of the docker image.
-        workspace_group_id: The workspace group ID to check for init services.
+        services: The compose services.
 
     Returns:
-        The docker compose file content.
+        Mapping of profile to its GPU count. Services without profiles count towards
+        every profile.
     """
-    compose = _read_compose_file(compose_path)
+    fixed, requested = _gpu_reservations(services)
+    gpus = {**{name: len(device_ids) for name, device_ids in fixed.items()}, **requested}
+    return {
+        profile: sum(
+            count for name, count in gpus.items()
+            if not (services[name] or {}).get('profiles') or profile in services[name]['profiles']
+        )
+        for profile in _compose_profiles(services)
+    }
 
-    # Get environment variables and add data directory if configured
-    environment = _parse_env_file(Path('variables.env'))
 
-    # Add devx service
+def allocate_gpus(services: dict, gpu_count: int, profiles: list[str] | None = None) -> dict[str, list[str]]:
+    """Assign GPUs to the compose services that reserve a number of GPUs.
+
+    Services declare `count` in their GPU device reservation instead of `device_ids`.
+    The services of each profile are packed onto the GPUs, so no two services that run
+    together share a GPU. Services without profiles run with every profile. Services
+    with fixed `device_ids` keep them, and are checked the same way.
+
+    Args:
+        services: The compose services.
+        gpu_count: The number of GPUs of the target.
+        profiles: The profiles to pack. Defaults to every profile. Services that only
+            run with other profiles are left out, while services without profiles are
+            always packed.
+
+    Returns:
+        Mapping of service name to its GPU device IDs, for every packed service that
+        reserves GPUs.
+
+    Raises:
+        ValueError: If the services of a profile need more GPUs than the target has, or
+            fixed device IDs overlap or do not exist.
+    """
+    profiles = _compose_profiles(services) if profiles is None else profiles or ['default']
+
+    def active_profiles(name: str) -> list[str]:
+        service_profiles = (services[name] or {}).get('profiles')
+        return [profile for profile in profiles if profile in service_profiles] if service_profiles else profiles
+
+    fixed, requested = _gpu_reservations(services)
+    fixed = {name: device_ids for name, device_ids in fixed.items() if active_profiles(name)}
+    requested = {name: count for name, count in requested.items() if active_profiles(name)}
+
+    owners: dict[str, dict[int, str]] = {profile: {} for profile in profiles}
+    for name, device_ids in fixed.items():
+        for device_id in device_ids:
+            if not device_id.isdigit() or int(device_id) >= gpu_count:
+                raise ValueError(f"Service {name} uses GPU {device_id}, but the target has {gpu_count} GPU(s)")
+            for profile in active_profiles(name):
+                other = owners[profile].setdefault(int(device_id), name)
+                if other != name:
+                    raise ValueError(f"Services {other} and {name} both use GPU {device_id} in profile {profile}")
+
+    allocation = dict(fixed)
+    # services that run with many profiles constrain the most, and large requests need the most room
+    for name in sorted(requested, key=lambda name: (-len(active_profiles(name)), -requested[name])):
+        service_profiles = active_profiles(name)
+        free = [gpu for gpu in range(gpu_count) if all(gpu not in owners[profile] for profile in service_profiles)]
+        if len(free) < requested[name]:
+            raise ValueError(
+                f"Service {name} needs {requested[name]} GPU(s), but only {len(free)} of the target's {gpu_count} "
+                f"are left in profile(s) {', '.join(service_profiles)}"
+            )
+        for gpu in free[:requested[name]]:
+            for profile in service_profiles:
+                owners[profile][gpu] = name
+        allocation[name] = [str(gpu) for gpu in free[:requested[name]]]
+    return allocation
+
+
+def fitting_profiles(services: dict, gpu_count: int) -> list[str]:
+    """List the compose profiles whose services fit on a number of GPUs together.
+
+    Profiles are often alternatives for instance types of different sizes, so the
+    profiles that need more GPUs than the target has are not packed, and cannot be
+    started on it.
+    """
+    return [profile for profile, demand in profile_gpu_demand(services).items() if demand <= gpu_count]
+
+
+def unfitting_services(services: dict, gpu_count: int) -> list[str]:
+    """List the services that only run with profiles that need more GPUs than the target has.
+
+    Args:
+        services: The compose services.
+        gpu_count: The number of GPUs of the target.
+
+    Returns:
+        The services that cannot be started on the target.
+    """
+    profiles = fitting_profiles(services, gpu_count)
+    return [
+        name for name, service in services.items()
+        if (service or {}).get('profiles') and not set(service['profiles']) & set(profiles)
+    ]
+
+
+def _apply_gpu_allocation(compose: dict, gpu_count: int, unfitting_profiles: str = 'error') -> None:
+    """Replace the GPU counts of the compose services with allocated device IDs.
+
+    Args:
+        compose: The compose definition to update.
+        gpu_count: The number of GPUs of the target.
+        unfitting_profiles: What to do with the services that only run with profiles that
+            need more GPUs than the target has: `error` refuses to compile, `drop` removes
+            them, so starting such a profile cannot oversubscribe the GPUs, and `keep`
+            leaves their GPU counts unchanged.
+
+    Raises:
+        ValueError: If a profile does not fit and `unfitting_profiles` is `error`, or the
+            services that always run need more GPUs than the target has.
+    """
+    services = compose['services']
+    profiles = fitting_profiles(services, gpu_count)
+    unfitting = {
+        profile: demand for profile, demand in profile_gpu_demand(services).items() if profile not in profiles
+    }
+    if unfitting and unfitting_profiles == 'error':
+        needs = ', '.join(f"profile {profile} needs {demand} GPUs" for profile, demand in unfitting.items())
+        raise ValueError(
+            f"The target has {gpu_count} GPU(s), but {needs}. "
+            "Set unfitting_profiles = \"drop\" in [tool.brev] to leave their services out"
+        )
+
+    dropped = unfitting_services(services, gpu_count) if unfitting_profiles == 'drop' else []
+    for name in dropped:
+        del services[name]
+    for name, service in services.items():
+        depends_on = (service or {}).get('depends_on')
+        if depends_on and set(depends_on) & set(dropped):
+            if isinstance(depends_on, list):
+                depends_on = [dependency for dependency in depends_on if dependency not in dropped]
+            else:
+                depends_on = {key: value for key, value in depends_on.items() if key not in dropped}
+            services[name] = {**service, 'depends_on': depends_on}
+
+    for name, device_ids in allocate_gpus(services, gpu_count, profiles).items():
+        service = copy.deepcopy(services[name])
+        for device in _gpu_devices(service):
+            if isinstance(device.get('count'), int) and not device.get('device_ids'):
+                del device['count']
+                device['device_ids'] = device_ids
+        services[name] = service
+
+
+def _prefetch_service(compose: dict) -> dict | None:
+    """Build a service that downloads what the profile-gated services need in the background.
+
+    The images are pulled in parallel. NIM services that keep their model cache in a
+    named volume then fill it with `download-to-cache`, one download per volume at a time.
+
+    Args:
+        compose: The launchable docker compose definition.
+
+    Returns:
+        The prefetch service definition, or None if no service is gated by a profile.
+    """
+    services = {
+        name: service for name, service in compose['services'].items()
+        if service and service.get('profiles') and service.get('image')
+    }
+    if not services:
+        return None
+
+    # `$$` escapes compose interpolation, the shell sees `$`
+    images = list(dict.fromkeys(service['image'] for service in services.values()))
+    script = [
+        'project=$$(docker inspect --format \'{{index .Config.Labels "com.docker.compose.project"}}\' "$$HOSTNAME")'
+    ]
+    if any(image.startswith('nvcr.io/') for image in images):
+        script.append(
+            '[ -z "$$NGC_API_KEY" ] || echo "$$NGC_API_KEY" | docker login nvcr.io -u \'$$oauthtoken\' --password-stdin'
+        )
+    script += [f"docker pull -q {shlex.quote(image)} &" for image in images]
+    script.append('wait')
+
+    downloads: dict[str, list[str]] = {}
+    for service in services.values():
+        volume = _named_volume_mounts(service).get(NIM_CACHE_DIR)
+        if volume is None or not service['image'].startswith(NIM_IMAGE_PREFIX):
+            continue
+        volume_name = (compose['volumes'].get(volume) or {}).get('name') or f"$${{project}}_{volume}"
+        downloads.setdefault(volume, []).append(' '.join([
+            'docker', 'run', '--rm', '-e', 'NGC_API_KEY', *_gpu_request(service),
+            '-v', f'"{volume_name}:{NIM_CACHE_DIR}"', shlex.quote(service['image']), 'download-to-cache',
+        ]))
+    if downloads:
+        script += [f"( {'; '.join(commands)} ) &" for commands in downloads.values()]
+        script.append('wait')
+
+    return {
+        "image": PREFETCH_IMAGE,
+        "command": ["sh", "-c", "\n".join(script)],
+        # mounting the caches makes compose create them, even while their services are not enabled
+        "volumes": [
+            "/var/run/docker.sock:/var/run/docker.sock", *(f"{volume}:/cache/{volume}" for volume in downloads)
+        ],
+        "environment": {"NGC_API_KEY": "${NGC_API_KEY}"},
+        "depends_on": {"devx": {"condition": "service_started"}},
+        "networks": ["devx"],
+        "restart": "no",
+    }
+
+
+def volume_labels(volume: dict) -> dict:
+    """Get the labels of a top level compose volume, given as a mapping or a list."""
+    labels = volume.get('labels') or {}
+    if isinstance(labels, list):
+        return dict(label.partition('=')[::2] for label in labels)
+    return labels
+
+
+def data_volume_placement(
+    volumes: dict, group: WorkspaceGroupConfig | None, repo_name: str, mode: str | None = None
+) -> dict[str, Path]:
+    """Choose the declared volumes to keep under the data directory of a workspace group.
+
+    Args:
+        volumes: The top level volumes of the compose file.
+        group: The workspace group the launchable runs on.
+        repo_name: Name of the repository, used to namespace the host directories.
+        mode: `all` to place every volume, `labeled` to place the volumes labeled
+            `devx.storage` `cache` or `data`, or `none`. Defaults to `all` on workspace
+            groups without flexible storage, and `labeled` elsewhere.
+
+    Returns:
+        Mapping of volume name to its host directory.
+    """
+    if group is None or group.data_dir is None:
+        return {}
+    mode = mode or ('labeled' if group.flexible_storage else 'all')
+
+    placement = {}
+    for name, volume in volumes.items():
+        volume = volume or {}
+        if mode == 'none' or volume.get('external') or volume.get('driver', 'local') != 'local':
+            continue
+        if volume.get('driver_opts'):
+            continue
+        if mode == 'labeled' and volume_labels(volume).get(DATA_VOLUME_LABEL) not in DATA_VOLUME_TAGS:
+            continue
+        placement[name] = group.data_dir / repo_name / name
+    return placement
+
+
+def _place_data_volumes(compose: dict, data_dir: Path, placement: dict[str, Path]) -> None:
+    """Bind the placed volumes to their host directories.
+
+    The directories are created by an init service, which every service that mounts a
+    placed volume waits for.
+    """
+    for name, path in placement.items():
+        compose['volumes'][name] = {
+            **(compose['volumes'][name] or {}),
+            "driver": "local",
+            "driver_opts": {"type": "none", "o": "bind", "device": path.as_posix()},
+        }
+
+    directories = ' '.join(shlex.quote(path.as_posix()) for path in placement.values())
+    compose['services'][STORAGE_SERVICE] = {
+        "image": STORAGE_IMAGE,
+        "command": ["sh", "-c", f"mkdir -p {directories} && chmod a+rwx {directories}"],
+        "volumes": [f"{data_dir.as_posix()}:{data_dir.as_posix()}"],
+        "network_mode": "none",
+        "restart": "no",
+    }
+
+    for name, service in compose['services'].items():
+        if not service or not set(_named_volume_mounts(service).values()) & placement.keys():
+            continue
+        depends_on = service.get('depends_on') or {}
+        if isinstance(depends_on, list):
+            depends_on = {dependency: {"condition": "service_started"} for dependency in depends_on}
+        compose['services'][name] = {
+            **service,
+            "depends_on": {**depends_on, STORAGE_SERVICE: {"condition": "service_completed_successfully"}},
+        }
+
+
+def transform_launchable_compose(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    source: ComposeSource,
+    image_url: str,
+    workspace_group_id: str,
+    prefetch: bool = False,
+    data_volumes: str | None = None,
+    gpu_count: int | None = None,
+    budget: ResourceBudget | None = None,
+    unfitting_profiles: str = 'error',
+) -> dict:
+    """Apply the launchable transforms to a parsed compose source.
+
+    Args:
+        source: The parsed compose source.
+        image_url: URL of the docker image.
+        workspace_group_id: The workspace group ID, whose data directory holds the
+            placed volumes.
+        prefetch: Whether to add a service that downloads the images and model caches of
+            the profile-gated services once the `devx` service has started.
+        data_volumes: Which declared volumes to place under the data directory of the
+            workspace group, see `data_volume_placement`.
+        gpu_count: The number of GPUs to allocate to the services, or None to leave the
+            GPU reservations unchanged.
+        budget: The memory and CPUs to plan the service resources for, or None to
+            leave them unchanged.
+        unfitting_profiles: Whether to refuse (`error`) or leave out (`drop`) the
+            services of profiles that need more GPUs than the target has.
+
+    Returns:
+        The launchable docker compose definition.
+
+    Raises:
+        ValueError: If the services of a profile need more GPUs or resources than the
+            target has, unless `unfitting_profiles` is `drop` and the profile is not
+            needed by the services that always run.
+    """
+    compose = _target_compose(source)
+    if gpu_count is not None:
+        _apply_gpu_allocation(compose, gpu_count, unfitting_profiles)
     repo_name = image_url.split('/')[-1]
+    group = WORKSPACES.query_name(workspace_group_id)
+    placement = data_volume_placement(source.compose['volumes'], group, repo_name, data_volumes)
+
+    # Add devx service
     compose['services']['devx'] = {
         "image": image_url + f"/devx:{TARGET_BRANCH}",
         "ports": ["8888:8888"],
@@ -146,7 +713,7 @@ def compile_launchable_compose(compose_path: Path, image_url: str, workspace_gro
             "/var/run/docker.sock:/var/run/docker.sock",
             "devx_home:/home/nvidia"
         ],
-        "environment": environment,
+        "environment": dict(source.environment),
         "networks": ["devx"],
         "restart": "always",
     }
@@ -154,62 +721,385 @@ def compile_launchable_compose(compose_path: Path, image_url: str, workspace_gro
     compose['volumes']['devx_home'] = None
     compose['networks']['devx'] = {"driver": "bridge"}
 
-    return yaml.dump(compose)
+    apply_resource_plan(compose, _plan_resources(source.compose['services'], budget) if budget else {})
+
+    prefetch_service = _prefetch_service(compose) if prefetch else None
+    if prefetch_service:
+        compose['services'][PREFETCH_SERVICE] = prefetch_service
+    if placement:
+        _place_data_volumes(compose, group.data_dir, placement)
+
+    return compose
+
+
+def dump_compose(compose: dict) -> str:
+    """Serialize a compose definition to YAML.
+
+    Args:
+        compose: The docker compose definition.
+
+    Returns:
+        The docker compose file content.
+    """
+    return yaml.dump(compose, Dumper=YAML_DUMPER)
+
+
+def compile_local_compose(
+    compose_path: Path,
+    jupyter_port: int,
+    build: BuildSettings | None = None,
+    gpu_count: int | None = None,
+    budget: ResourceBudget | None = None,
+) -> str:
+    """Get the docker compose file content.
+
+    Args:
+        compose_path: Path to the docker compose file.
+        jupyter_port: Port to use for Jupyter.
+        build: Local image build settings.
+        gpu_count: The number of GPUs to allocate to the services.
+        budget: The memory and CPUs to plan the service resources for.
+
+    Returns:
+        The docker compose file content.
+    """
+    source = read_compose_source(compose_path, LOCAL_ENV_FILE)
+    return dump_compose(transform_local_compose(source, jupyter_port, build, gpu_count, budget))
+
+
+def compile_launchable_compose(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    compose_path: Path,
+    image_url: str,
+    workspace_group_id: str,
+    prefetch: bool = False,
+    data_volumes: str | None = None,
+    gpu_count: int | None = None,
+    budget: ResourceBudget | None = None,
+    unfitting_profiles: str = 'error',
+) -> str:
+    """Get the docker compose file content.
+
+    Args:
+        compose_path: Path to the docker compose file.
+        image_url: URL of the docker image.
+        workspace_group_id: The workspace group ID, whose data directory holds the placed volumes.
+        prefetch: Whether to add the background prefetch service.
+        data_volumes: Which declared volumes to place under the data directory.
+        gpu_count: The number of GPUs to allocate to the services.
+        budget: The memory and CPUs to plan the service resources for.
+        unfitting_profiles: Whether to refuse or leave out the profiles that do not fit.
+
+    Returns:
+        The docker compose file content.
+    """
+    source = read_compose_source(compose_path, LOCAL_ENV_FILE)
+    return dump_compose(transform_launchable_compose(
+        source, image_url, workspace_group_id, prefetch, data_volumes, gpu_count, budget, unfitting_profiles
+    ))
+
+
+def _hash_values(values: dict) -> str:
+    """Hash a dictionary of resolved configuration values."""
+    return hash_bytes(json.dumps(values, sort_keys=True, default=str).encode('utf-8'))
+
+
+def _devx_version() -> str:
+    """Get the installed devx version."""
+    try:
+        return metadata.version('workshop-framework')
+    except metadata.PackageNotFoundError:
+        return 'unknown'
+
+
+def _load_manifest() -> dict:
+    """Load the sync manifest.
+
+    Returns:
+        The manifest contents, or an empty manifest if it is missing or unreadable.
+    """
+    try:
+        with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"outputs": {}}
+
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {"outputs": {}}
+    manifest['outputs'] = manifest.get('outputs', {})
+    return manifest
+
+
+def _write_manifest(manifest: dict) -> None:
+    """Write the sync manifest.
+
+    Args:
+        manifest: The manifest contents.
+    """
+    manifest['version'] = MANIFEST_VERSION
+    manifest['devx_version'] = _devx_version()
+    with open(MANIFEST_FILE, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def _gpu_override(manifest: dict, gpus: int | None) -> int | None:
+    """Resolve the GPU count to allocate the launchable for instead of the instance type's.
+
+    Args:
+        manifest: The sync manifest, which records the override of the last sync.
+        gpus: The requested override, None to keep the recorded one, or 0 to drop it.
+
+    Returns:
+        The GPU count, or None to use the instance type's.
+    """
+    if gpus is None:
+        return manifest.get('gpus')
+    return gpus or None
+
 
+def _gpu_report(services: dict, gpu_count: int, unfitting: str) -> list[str]:
+    """Describe the GPUs allocated to the services, and what happens to the profiles that do not fit."""
+    profiles = fitting_profiles(services, gpu_count)
+    notes = [
+        f"⚠️  Profile {profile} needs {demand} GPUs, the target has {gpu_count}, its services {unfitting}"
+        for profile, demand in profile_gpu_demand(services).items() if profile not in profiles
+    ]
+    allocation = allocate_gpus(services, gpu_count, profiles)
+    return notes + [f"🎮 {name} uses GPU {', '.join(device_ids)}" for name, device_ids in allocation.items()]
 
-def needs_update(source_file: Path, target_file: Path) -> bool:
-    """Check if the target file needs to be updated based on source file.
+
+class SyncTarget(NamedTuple):
+    """A generated file and the inputs it is compiled from.
+
+    Attributes:
+        path: Path of the generated file.
+        inputs: Mapping of input name to content hash.
+        compile: Callable that returns the generated file content.
+        tracked: Whether the generated file is committed to the repository.
+        report: Callable that returns notes to print when the file is written.
+    """
+    path: Path
+    inputs: dict
+    compile: Callable[[], str]
+    tracked: bool
+    report: Callable[[], list[str]] = list
+
+
+def _sync_targets(workspace: BrevWorkspace, project: Project, gpus: int | None = None) -> list[SyncTarget]:
+    """Build the list of generated files and their inputs.
 
     Args:
-        source_file: Path to the source file.
-        target_file: Path to the target file.
+        workspace: Brev workspace configuration.
+        project: Project configuration.
+        gpus: The number of GPUs to allocate the launchable for instead of the instance
+            type's, or None.
 
     Returns:
-        True if the target file needs to be updated, False otherwise.
+        The list of sync targets.
     """
-    if not target_file.exists():
-        return True
+    if gpus is not None:
+        workspace = workspace.model_copy(update={"gpus": gpus, "targets": []})
+    common_inputs = {
+        "compose": hash_file(USER_COMPOSE_PATH),
+        "env": hash_file(LOCAL_ENV_FILE),
+        "pyproject": hash_file(PYPROJECT_FILE),
+        "devx": _devx_version(),
+    }
+    workspace_group_id = workspace.workspace_group_id
+    group = WORKSPACES.query_name(workspace_group_id)
+    gpu_count = target_gpu_count(workspace)
+    launchable_budget = target_budget(workspace)
+    source = functools.cache(lambda: read_compose_source(USER_COMPOSE_PATH, LOCAL_ENV_FILE))
+    # counting the GPUs of this machine can run nvidia-smi, so the host is only probed for
+    # what the local compose file depends on
+    services = source().compose['services']
+    local_gpu_count = host_gpu_count() if any(_gpu_devices(service or {}) for service in services.values()) else None
+    local_budget = host_budget() if declares_resources(services) else None
 
-    if not source_file.exists():
-        return False
+    launchable_inputs = {
+        **common_inputs,
+        "project": _hash_values(project.model_dump()),
+        "workspace": _hash_values({**workspace.model_dump(), "workspace_group_id": workspace_group_id}),
+        "workspace_group": _hash_values(group.model_dump() if group else {}),
+        "gpus": gpus,
+    }
 
-    target_mtime = os.path.getmtime(target_file)
-    source_mtime = os.path.getmtime(source_file)
-    return target_mtime < source_mtime
+    def launchable_report() -> list[str]:
+        placement = data_volume_placement(
+            source().compose['volumes'], group, project.image_url.split('/')[-1], workspace.data_volumes
+        )
+        notes = [f"💾 Volume {name} placed in {path} on {workspace_group_id}" for name, path in placement.items()]
+        if launchable_budget is None and declares_resources(source().compose['services']):
+            notes.append("⚠️  Set memory and cpus in [tool.brev] to plan the service resources of the launchable")
+        if gpu_count is None:
+            return notes + [
+                f"⚠️  GPU count of {workspace.instance_type} is unknown, set gpus in [tool.brev] to allocate GPUs"
+            ]
+        return notes + _gpu_report(source().compose['services'], gpu_count, "are left out")
 
+    def local_report() -> list[str]:
+        services = source().compose['services']
+        notes = _gpu_report(services, local_gpu_count, "cannot start here") if local_gpu_count else []
+        warning = _plan_local_resources(services, local_budget)[1] if declares_resources(services) else None
+        return notes + ([f"⚠️  {warning}"] if warning else [])
 
-def sync(workspace: BrevWorkspace, project: Project, force: bool = False) -> None:
+    local_inputs = {
+        **common_inputs,
+        "host": _hash_values({
+            "uid": os.getuid(), "gid": os.getgid(), "jupyter_port": LOCAL_JUPYTER_PORT, "project_dir": os.getcwd(),
+            "gpus": local_gpu_count, "budget": local_budget,
+        }),
+    }
+
+    return [
+        SyncTarget(
+            TARGET_LAUNCHABLE_FILE,
+            launchable_inputs,
+            lambda: dump_compose(transform_launchable_compose(
+                source(), project.image_url, workspace_group_id, workspace.prefetch, workspace.data_volumes, gpu_count,
+                launchable_budget, workspace.unfitting_profiles,
+            )),
+            True,
+            launchable_report,
+        ),
+        SyncTarget(
+            TARGET_LOCAL_FILE,
+            local_inputs,
+            lambda: dump_compose(
+                transform_local_compose(source(), LOCAL_JUPYTER_PORT, BuildSettings(), local_gpu_count, local_budget)
+            ),
+            False,
+            local_report,
+        ),
+    ]
+
+
+def _stale_reasons(target: SyncTarget, manifest: dict) -> list[str]:
+    """Explain why a generated file is out of date according to the manifest.
+
+    Args:
+        target: The sync target to check.
+        manifest: The sync manifest.
+
+    Returns:
+        A list of human readable reasons. Empty if the file is up to date.
+    """
+    output_hash = hash_file(target.path)
+    if output_hash is None:
+        return ["output missing"]
+
+    entry = manifest['outputs'].get(str(target.path))
+    if entry is None:
+        return ["not in manifest"]
+
+    recorded_inputs = entry.get('inputs', {})
+    reasons = [
+        f"{name} changed" for name, digest in target.inputs.items() if recorded_inputs.get(name) != digest
+    ]
+    if entry.get('output') != output_hash:
+        reasons.append("output modified")
+    return reasons
+
+
+def check(workspace: BrevWorkspace, project: Project, gpus: int | None = None) -> list[Path]:
+    """Report drift between the inputs and the generated files without writing anything.
+
+    Outputs the manifest does not vouch for are compiled in memory and compared with the
+    file on disk, so a missing or stale manifest does not by itself count as drift.
+
+    Args:
+        workspace: Brev workspace configuration.
+        project: Project configuration.
+        gpus: The number of GPUs to allocate the launchable for instead of the instance
+            type's. Defaults to the count recorded by the last `sync`.
+
+    Returns:
+        The generated files that are out of date.
+    """
+    print("🔍 Checking cached workshop files...")
+    manifest = _load_manifest()
+    drifted = []
+
+    for target in _sync_targets(workspace, project, _gpu_override(manifest, gpus)):
+        reasons = _stale_reasons(target, manifest)
+        if reasons and reasons != ["output missing"]:
+            if hash_bytes(target.compile().encode('utf-8')) == hash_file(target.path):
+                reasons = []
+
+        if not reasons:
+            print(f"✅ {target.path} is up to date")
+        elif reasons == ["output missing"] and not target.tracked:
+            print(f"➖ {target.path} has not been generated")
+        else:
+            print(f"❌ {target.path} is out of date ({', '.join(reasons)})")
+            drifted.append(target.path)
+
+    return drifted
+
+
+def sync(workspace: BrevWorkspace, project: Project, force: bool = False, gpus: int | None = None) -> None:
     """Synchronize the cached workshop files.
 
+    Only the files whose inputs changed since the last sync, according to the content
+    hashes in the manifest, are regenerated.
+
     Args:
         workspace: Brev workspace configuration.
         project: Project configuration.
-        force: Whether to force update regardless of timestamps.
+        force: Whether to force update regardless of the manifest.
+        gpus: The number of GPUs to allocate the launchable for instead of the instance
+            type's. It is recorded in the manifest and used by later syncs, until 0
+            returns to the instance type's count.
     """
     print("🔄 Synchronizing cached workshop files...")
+    manifest = _load_manifest()
+    gpus = _gpu_override(manifest, gpus)
+    updated = False
 
-    update_launchable_compse = (
-        force or
-        needs_update(USER_COMPOSE_PATH, TARGET_LAUNCHABLE_FILE) or
-        needs_update(LOCAL_ENV_FILE, TARGET_LAUNCHABLE_FILE) or
-        needs_update(PYPROJECT_FILE, TARGET_LAUNCHABLE_FILE)
-    )
-
-    if update_launchable_compse:
-        compose = compile_launchable_compose(USER_COMPOSE_PATH, project.image_url, workspace.workspace_group_id)
-        with open(TARGET_LAUNCHABLE_FILE, 'w', encoding='utf-8') as f:
-            f.write(compose)
-        print(f"✅ Docker compose file written to {TARGET_LAUNCHABLE_FILE}")
-
-    update_local_compse = (
-        force or
-        needs_update(USER_COMPOSE_PATH, TARGET_LOCAL_FILE) or
-        needs_update(LOCAL_ENV_FILE, TARGET_LOCAL_FILE) or
-        needs_update(PYPROJECT_FILE, TARGET_LOCAL_FILE)
-    )
-
-    if update_local_compse:
-        compose = compile_local_compose(USER_COMPOSE_PATH, LOCAL_JUPYTER_PORT)
-        with open(TARGET_LOCAL_FILE, 'w', encoding='utf-8') as f:
+    # every target is compiled before any is written, so a compile error leaves all of them untouched
+    targets = _sync_targets(workspace, project, gpus)
+    stale = [target for target in targets if force or _stale_reasons(target, manifest)]
+    compiled = [(target, target.compile()) for target in stale]
+    for target, compose in compiled:
+        with open(target.path, 'w', encoding='utf-8') as f:
             f.write(compose)
-        print(f"✅ Docker compose file written to {TARGET_LOCAL_FILE}")
+        manifest['outputs'][str(target.path)] = {
+            "inputs": target.inputs,
+            "output": hash_bytes(compose.encode('utf-8')),
+        }
+        updated = True
+        print(f"✅ Docker compose file written to {target.path}")
+        for note in target.report():
+            print(f"   {note}")
+
+    if updated:
+        manifest['gpus'] = gpus
+        _write_manifest(manifest)
+
+
+def plan(workspace: BrevWorkspace) -> None:
+    """Print the resource plan of the local and launchable compose files without writing anything.
+
+    Args:
+        workspace: Brev workspace configuration.
+
+    Raises:
+        ValueError: If the services of the launchable need more resources than its
+            instance type has.
+    """
+    services = read_compose_source(USER_COMPOSE_PATH, LOCAL_ENV_FILE).compose['services']
+    if not declares_resources(services):
+        print(f"➖ No service in {USER_COMPOSE_PATH} declares {RESOURCES_KEY}, resources are not planned")
+        return
+
+    budget = host_budget()
+    print(f"🖥️  Local ({TARGET_LOCAL_FILE})")
+    plans, warning = _plan_local_resources(services, budget)
+    print(f"⚠️  {warning}" if warning else format_plan(plans, budget, services))
+
+    budget = target_budget(workspace)
+    print(f"\n☁️  Launchable ({TARGET_LAUNCHABLE_FILE}, {workspace.instance_type})")
+    if budget is None:
+        print("⚠️  Set memory and cpus in [tool.brev] to plan the service resources of the launchable")
+        return
+    print(format_plan(_plan_resources(services, budget), budget, services))
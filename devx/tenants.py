@@ -0,0 +1,474 @@
+"""Run several isolated copies of the workshop on one host.
+
+Every tenant is a separate compose project, `<project>-<tenant>`, so its containers,
+network and volumes are namespaced by docker compose. Each tenant gets free host ports
+for the ports the workshop publishes, which are kept for later starts, and its own
+copy of the project directory under `.devx/tenants`, with the tenant's compose file in
+place of `.devx/compose.local.yaml`. Files are cloned copy-on-write where the
+filesystem supports it, such as btrfs and XFS, and copied elsewhere.
+
+The workshop image is built once and shared by every tenant, and the volumes labeled
+`devx.storage: cache`, such as model caches, are shared with the main workshop
+instead of being downloaded again for every tenant.
+"""
+
+import json
+import os
+import re
+import shutil
+import socket
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+from devx.build import built_image
+from devx.constants import DEVX_DIR, LOCAL_JUPYTER_PORT, TARGET_LOCAL_FILE
+from devx.docker import DockerError, compose_project_name, load_compose_file
+from devx.run import browser_host, build
+
+TENANTS_DIR = DEVX_DIR / 'tenants'
+TENANTS_STATE_FILE = TENANTS_DIR / 'tenants.json'
+TENANTS_STATE_VERSION = 1
+TENANT_NAME_PATTERN = re.compile(r'^[a-z0-9][a-z0-9_-]*$')
+DEVX_SERVICE = 'devx'
+# paths of the project that are not copied into the tenant workspaces
+WORKSPACE_IGNORE = {'.git', TENANTS_DIR.as_posix(), (DEVX_DIR / 'snapshots').as_posix()}
+MAX_PORT = 65535
+# the Linux ioctl that clones a file copy-on-write
+FICLONE = 0x40049409
+
+
+class Tenant(NamedTuple):
+    """A tenant of the workshop.
+
+    Attributes:
+        name: The name of the tenant.
+        project: The compose project of the tenant.
+        compose_file: The compiled compose file of the tenant, inside its workspace.
+        workspace: The tenant's copy of the project directory.
+        ports: Mapping of `<service>:<container port>/<protocol>` to the host port.
+    """
+    name: str
+    project: str
+    compose_file: Path
+    workspace: Path
+    ports: dict[str, int]
+
+    @property
+    def jupyter_port(self) -> Optional[int]:
+        """The host port of Jupyter."""
+        return self.ports.get(f"{DEVX_SERVICE}:{LOCAL_JUPYTER_PORT}/tcp")
+
+
+def tenant_names(instances: int = 0, names: Optional[list[str]] = None) -> list[str]:
+    """Get the names of the tenants to run.
+
+    Args:
+        instances: Number of tenants named `t1` to `t<instances>`.
+        names: Additional tenant names.
+
+    Returns:
+        The tenant names, without duplicates.
+
+    Raises:
+        ValueError: If a name is not a valid compose project name suffix.
+    """
+    selected = [f"t{index}" for index in range(1, instances + 1)] + list(names or [])
+    invalid = [name for name in selected if not TENANT_NAME_PATTERN.match(name)]
+    if invalid:
+        raise ValueError(
+            f"Invalid tenant name(s): {', '.join(invalid)}. Use lower case letters, digits, '-' and '_'"
+        )
+    return list(dict.fromkeys(selected))
+
+
+def _load_state() -> dict:
+    """Load the recorded tenants, or an empty record if there are none."""
+    try:
+        with open(TENANTS_STATE_FILE, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return state.get('tenants', {}) if state.get('version') == TENANTS_STATE_VERSION else {}
+
+
+def _save_state(tenants: dict[str, Tenant]) -> None:
+    """Record the tenants, so their ports stay the same on later starts."""
+    TENANTS_DIR.mkdir(parents=True, exist_ok=True)
+    with open(TENANTS_STATE_FILE, 'w', encoding='utf-8') as f:
+        json.dump({
+            "version": TENANTS_STATE_VERSION,
+            "tenants": {
+                name: {"project": tenant.project, "ports": tenant.ports} for name, tenant in sorted(tenants.items())
+            },
+        }, f, indent=2)
+        f.write('\n')
+
+
+def _tenant(name: str, base_project: str, ports: dict[str, int]) -> Tenant:
+    """Describe a tenant from its name and ports."""
+    workspace = TENANTS_DIR / name
+    return Tenant(name, f"{base_project}-{name}", workspace / TARGET_LOCAL_FILE, workspace, ports)
+
+
+def recorded_tenants() -> dict[str, Tenant]:
+    """Get the tenants that were started before.
+
+    Raises:
+        DockerError: If the compose project name cannot be read.
+    """
+    state = _load_state()
+    if not state:
+        return {}
+    base_project = compose_project_name(TARGET_LOCAL_FILE)
+    return {name: _tenant(name, base_project, tenant.get('ports') or {}) for name, tenant in state.items()}
+
+
+def _parse_port(port) -> Optional[tuple[Optional[str], int, int, str]]:
+    """Parse a published compose port.
+
+    Returns:
+        Tuple of (host IP, host port, container port, protocol), or None if the port
+        is not published on a single host port.
+    """
+    if isinstance(port, dict):
+        if not port.get('published') or '-' in str(port['published']):
+            return None
+        return port.get('host_ip'), int(port['published']), int(port['target']), port.get('protocol', 'tcp')
+    port, _, protocol = str(port).partition('/')
+    parts = port.rsplit(':', 2)
+    if len(parts) < 2 or '-' in port:
+        return None
+    return (parts[0] if len(parts) == 3 else None), int(parts[-2]), int(parts[-1]), protocol or 'tcp'
+
+
+def _is_free(port: int) -> bool:
+    """Check whether a TCP port can be bound on every interface."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            sock.bind(('', port))
+        except OSError:
+            return False
+    return True
+
+
+def published_ports(compose: dict) -> dict[str, int]:
+    """Get the host ports a compose definition publishes.
+
+    Returns:
+        Mapping of `<service>:<container port>/<protocol>` to the host port.
+    """
+    ports = {}
+    for name, service in (compose.get('services') or {}).items():
+        for port in (service or {}).get('ports') or []:
+            parsed = _parse_port(port)
+            if parsed:
+                _, published, target, protocol = parsed
+                ports[f"{name}:{target}/{protocol}"] = published
+    return ports
+
+
+def assign_ports(compose: dict, recorded: dict[str, int], taken: set[int]) -> dict[str, int]:
+    """Choose the host ports of a tenant.
+
+    Ports recorded for the tenant are kept. Every other port starts at the port the
+    main workshop publishes and moves up to the first free port that no other tenant
+    uses.
+
+    Args:
+        compose: The compiled local compose definition.
+        recorded: The ports recorded for the tenant.
+        taken: Host ports used by the main workshop and the other tenants. Updated
+            with the assigned ports.
+
+    Returns:
+        Mapping of `<service>:<container port>/<protocol>` to the host port.
+
+    Raises:
+        DockerError: If no free port is left.
+    """
+    ports = {}
+    for key, published in published_ports(compose).items():
+        port = recorded.get(key)
+        if port is None or port in taken:
+            port = published + 1
+            while port in taken or not _is_free(port):
+                port += 1
+                if port > MAX_PORT:
+                    raise DockerError(f"No free host port left for {key}")
+        taken.add(port)
+        ports[key] = port
+    return ports
+
+
+def _remap_port(port, service: str, ports: dict[str, int]):
+    """Publish a compose port on the tenant's host port, or on a random one if it has none."""
+    parsed = _parse_port(port)
+    if parsed is None:
+        if isinstance(port, dict):
+            return {key: value for key, value in port.items() if key != 'published'}
+        # ranges and unparsable ports are published on random host ports
+        port, _, protocol = str(port).partition('/')
+        target = port.rsplit(':', 1)[-1]
+        return f"{target}/{protocol}" if protocol else target
+    host_ip, _, target, protocol = parsed
+    published = ports[f"{service}:{target}/{protocol}"]
+    if isinstance(port, dict):
+        return {**port, 'published': str(published)}
+    host = f"{host_ip}:" if host_ip else ''
+    suffix = f"/{protocol}" if protocol != 'tcp' or '/' in str(port) else ''
+    return f"{host}{published}:{target}{suffix}"
+
+
+def tenant_compose(compose: dict, tenant: Tenant, base_project: str, image: str) -> dict:
+    """Derive the compose definition of a tenant from the compiled local compose definition.
+
+    Args:
+        compose: The compiled local compose definition.
+        tenant: The tenant.
+        base_project: The compose project of the main workshop.
+        image: The built workshop image, used instead of building it for every tenant.
+
+    Returns:
+        The tenant's compose definition. Its relative paths resolve to the tenant's
+        workspace, as the compose file is kept in the workspace.
+    """
+    # imported here to keep the compose dependencies out of listing the tenants
+    from devx.sync import DATA_VOLUME_LABEL, volume_labels  # pylint: disable=import-outside-toplevel
+
+    services = {}
+    for name, service in (compose.get('services') or {}).items():
+        service = {key: value for key, value in (service or {}).items() if key != 'container_name'}
+        if service.get('ports'):
+            service['ports'] = [_remap_port(port, name, tenant.ports) for port in service['ports']]
+        services[name] = service
+
+    devx = services.get(DEVX_SERVICE)
+    if devx:
+        devx.pop('build', None)
+        devx['image'] = image
+        if isinstance(devx.get('environment'), dict) and 'COMPOSE_PROJECT_NAME' in devx['environment']:
+            devx['environment'] = {**devx['environment'], 'COMPOSE_PROJECT_NAME': tenant.project}
+
+    volumes = {}
+    for name, volume in (compose.get('volumes') or {}).items():
+        volume = volume or {}
+        if volume_labels(volume).get(DATA_VOLUME_LABEL) == 'cache' and not volume.get('external'):
+            volume = {**volume, 'name': volume.get('name') or f"{base_project}_{name}"}
+        volumes[name] = volume or None
+    return {**compose, 'services': services, 'volumes': volumes}
+
+
+def _clone_file(source: str, destination: str) -> None:
+    """Copy a file, as a copy-on-write clone where the filesystem supports it."""
+    if fcntl is not None:
+        try:
+            with open(source, 'rb') as src, open(destination, 'wb') as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            shutil.copystat(source, destination)
+            return
+        except OSError:
+            pass
+    shutil.copy2(source, destination)
+
+
+def seed_workspace(tenant: Tenant) -> None:
+    """Copy the project directory for a tenant.
+
+    An existing copy is replaced, which discards the tenant's edits, but keeps its
+    compose file.
+    """
+    def ignore(directory: str, names: list[str]) -> set[str]:
+        relative = Path(os.path.relpath(directory))
+        return {name for name in names if (relative / name).as_posix() in WORKSPACE_IGNORE}
+
+    compose = tenant.compose_file.read_bytes() if tenant.compose_file.exists() else None
+    if tenant.workspace.exists():
+        shutil.rmtree(tenant.workspace)
+    tenant.workspace.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copytree('.', tenant.workspace, symlinks=True, ignore=ignore, copy_function=_clone_file)
+    if compose is not None:
+        tenant.compose_file.write_bytes(compose)
+
+
+def compose_command(tenant: Tenant, profiles: Optional[list[str]] = None) -> list[str]:
+    """Get the docker compose command for a tenant with the given profiles enabled."""
+    cmd = ['docker', 'compose', '-p', tenant.project, '-f', str(tenant.compose_file)]
+    for profile in profiles or []:
+        cmd.extend(['--profile', profile])
+    return cmd
+
+
+def run_compose(tenant: Tenant, *args: str, profiles: Optional[list[str]] = None) -> None:
+    """Run a docker compose command for a tenant.
+
+    Raises:
+        DockerError: If the docker CLI fails.
+    """
+    cmd = [*compose_command(tenant, profiles), *args]
+    env = {**os.environ, 'COMPOSE_PROJECT_NAME': tenant.project}
+    try:
+        subprocess.run(cmd, check=True, capture_output=True, text=True, env=env)
+    except FileNotFoundError as e:
+        raise DockerError("The docker CLI is not installed") from e
+    except subprocess.CalledProcessError as e:
+        raise DockerError(f"`{' '.join(cmd)}` failed: {e.stderr.strip() or e.returncode}") from e
+
+
+def for_each_tenant(tenants: list[Tenant], action, jobs: int) -> int:
+    """Run an action for several tenants at once, reporting the outcome of each.
+
+    Args:
+        tenants: The tenants.
+        action: Called with each tenant. Returns a note to report, and raises
+            DockerError on failure.
+        jobs: The maximum number of tenants to handle at once.
+
+    Returns:
+        The number of tenants the action failed for.
+    """
+    failed = []
+
+    def run(tenant: Tenant) -> None:
+        try:
+            note = action(tenant)
+            print(f"✅ {tenant.name}{f' {note}' if note else ''}")
+        except DockerError as e:
+            failed.append(tenant.name)
+            print(f"❌ {tenant.name}: {e}")
+
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        list(executor.map(run, tenants))
+    return len(failed)
+
+
+def _devx_states() -> dict[str, str]:
+    """Get the state of the `devx` container of every compose project, or nothing if Docker cannot be reached."""
+    cmd = [
+        'docker', 'ps', '--all', '--filter', f'label=com.docker.compose.service={DEVX_SERVICE}',
+        '--format', '{{.Label "com.docker.compose.project"}} {{.State}}',
+    ]
+    try:
+        output = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+    except (FileNotFoundError, subprocess.CalledProcessError):
+        return {}
+    return dict(line.split(None, 1) for line in output.splitlines() if len(line.split()) == 2)
+
+
+def print_tenants(tenants: dict[str, Tenant]) -> None:
+    """Print the URLs of the tenants as a table."""
+    if not tenants:
+        print("No tenants found.")
+        return
+
+    host = browser_host()
+    states = _devx_states()
+    rows = [["TENANT", "PROJECT", "STATE", "URL", "PORTS"]]
+    for tenant in tenants.values():
+        other_ports = [f"{port}->{key}" for key, port in tenant.ports.items() if port != tenant.jupyter_port]
+        rows.append([
+            tenant.name,
+            tenant.project,
+            states.get(tenant.project, "-"),
+            f"http://{host}:{tenant.jupyter_port}" if tenant.jupyter_port else "-",
+            ", ".join(other_ports) or "-",
+        ])
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    for row in rows:
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip())
+
+
+def start_tenants(
+    names: list[str], profiles: Optional[list[str]] = None, rebuild: bool = False, jobs: int = 4
+) -> None:
+    """Start several isolated copies of the workshop.
+
+    Args:
+        names: The tenants to start.
+        profiles: The compose profiles to enable.
+        rebuild: Whether to rebuild the workshop image even if its inputs are unchanged.
+        jobs: The maximum number of tenants to start at once.
+
+    Raises:
+        DockerError: If the workshop image cannot be built or a tenant fails to start.
+    """
+    from devx.sync import dump_compose  # pylint: disable=import-outside-toplevel
+
+    if not TARGET_LOCAL_FILE.exists():
+        raise DockerError("No workshop configuration found")
+
+    # the image is built once through the main workshop's compose file and shared by every tenant
+    build(rebuild)
+    image = built_image()
+    compose = load_compose_file(TARGET_LOCAL_FILE)
+    base_project = compose_project_name(TARGET_LOCAL_FILE)
+
+    tenants = recorded_tenants()
+    taken = set(published_ports(compose).values())
+    taken.update(port for name, tenant in tenants.items() if name not in names for port in tenant.ports.values())
+    for name in names:
+        recorded = tenants[name].ports if name in tenants else {}
+        tenant = _tenant(name, base_project, assign_ports(compose, recorded, taken))
+        if not tenant.workspace.exists():
+            seed_workspace(tenant)
+        with open(tenant.compose_file, 'w', encoding='utf-8') as f:
+            f.write(dump_compose(tenant_compose(compose, tenant, base_project, image)))
+        tenants[name] = tenant
+    _save_state(tenants)
+
+    args = ['up', '-d', '--remove-orphans']
+    if Path('workshop.env').exists():
+        args.extend(['--env-file', str(Path('workshop.env').resolve())])
+    print(f"🚀 Starting {len(names)} tenant(s), {jobs} at a time...")
+    failed = for_each_tenant(
+        [tenants[name] for name in names], lambda tenant: run_compose(tenant, *args, profiles=profiles), jobs
+    )
+    print_tenants({name: tenants[name] for name in names})
+    if failed:
+        raise DockerError(f"{failed} tenant(s) failed to start")
+
+
+def select_tenants(names: Optional[list[str]] = None) -> dict[str, Tenant]:
+    """Get recorded tenants by name.
+
+    Args:
+        names: The tenant names. Defaults to every recorded tenant.
+
+    Raises:
+        DockerError: If a tenant was never started.
+    """
+    tenants = recorded_tenants()
+    if not names:
+        return tenants
+    unknown = [name for name in names if name not in tenants]
+    if unknown:
+        raise DockerError(f"Unknown tenant(s): {', '.join(unknown)}. Start them with `devx workshop start --tenant`")
+    return {name: tenants[name] for name in names}
+
+
+def stop_tenants(names: Optional[list[str]] = None, jobs: int = 4) -> None:
+    """Stop tenants of the workshop.
+
+    Their ports and workspaces are kept for the next start.
+
+    Args:
+        names: The tenants to stop. Defaults to every recorded tenant.
+        jobs: The maximum number of tenants to stop at once.
+
+    Raises:
+        DockerError: If a tenant is unknown or fails to stop.
+    """
+    tenants = select_tenants(names)
+    print(f"🛑 Stopping {len(tenants)} tenant(s)...")
+    failed = for_each_tenant(
+        list(tenants.values()), lambda tenant: run_compose(tenant, 'down', '--remove-orphans'), jobs
+    )
+    if failed:
+        raise DockerError(f"{failed} tenant(s) failed to stop")
@@ -0,0 +1,238 @@
+"""Watch the workshop inputs and apply changes to the running workshop.
+
+Edits to the compose file, `variables.env` or `pyproject.toml` are recompiled through
+`devx.sync`, and only the services whose compiled definition changed are recreated.
+Changes are detected with inotify on Linux, and by polling elsewhere.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+from devx.constants import PYPROJECT_FILE, TARGET_LOCAL_FILE
+from devx.docker import DockerError, load_compose_file
+from devx.hashing import hash_file
+from devx.sync import LOCAL_ENV_FILE, USER_COMPOSE_PATHS, sync
+
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+INOTIFY_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+INOTIFY_EVENT = struct.Struct('iIII')
+# editors often save a file with several writes and renames
+DEBOUNCE = 0.2
+
+
+class _InotifyWatcher:
+    """Waits for changes to files in a directory using inotify."""
+
+    def __init__(self, directory: Path, names: set[str]):
+        self._names = names
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self._fd, str(directory).encode(), INOTIFY_MASK) < 0:
+            os.close(self._fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+
+    def _read(self, timeout: Optional[float]) -> set[str]:
+        """Read the names of the watched files changed within the timeout."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        buffer = os.read(self._fd, 64 * 1024)
+        changed = set()
+        offset = 0
+        while offset < len(buffer):
+            _, _, _, length = INOTIFY_EVENT.unpack_from(buffer, offset)
+            offset += INOTIFY_EVENT.size
+            name = buffer[offset:offset + length].rstrip(b'\0').decode(errors='replace')
+            offset += length
+            if name in self._names:
+                changed.add(name)
+        return changed
+
+    def wait(self) -> set[str]:
+        """Block until a watched file changes.
+
+        Returns:
+            The names of the changed files.
+        """
+        changed = set()
+        while not changed:
+            changed = self._read(None)
+        while True:
+            more = self._read(DEBOUNCE)
+            if not more:
+                return changed
+            changed |= more
+
+    def close(self) -> None:
+        """Stop watching."""
+        os.close(self._fd)
+
+
+class _PollingWatcher:
+    """Waits for changes to files in a directory by polling their size and modification time."""
+
+    def __init__(self, directory: Path, names: set[str], interval: float):
+        self._paths = {name: directory / name for name in names}
+        self._interval = interval
+        self._stats = self._stat()
+
+    def _stat(self) -> dict[str, Optional[tuple[int, int]]]:
+        stats = {}
+        for name, path in self._paths.items():
+            try:
+                stat = path.stat()
+                stats[name] = (stat.st_size, stat.st_mtime_ns)
+            except FileNotFoundError:
+                stats[name] = None
+        return stats
+
+    def wait(self) -> set[str]:
+        """Block until a watched file changes.
+
+        Returns:
+            The names of the changed files.
+        """
+        while True:
+            time.sleep(self._interval)
+            stats = self._stat()
+            changed = {name for name in stats if stats[name] != self._stats[name]}
+            self._stats = stats
+            if changed:
+                return changed
+
+    def close(self) -> None:
+        """Stop watching."""
+
+
+def _watcher(directory: Path, names: set[str], poll: bool, interval: float):
+    """Create an inotify watcher, falling back to polling where inotify is unavailable."""
+    if not poll and sys.platform.startswith('linux'):
+        try:
+            return _InotifyWatcher(directory, names)
+        except (OSError, AttributeError, TypeError):
+            print("⚠️  inotify is not available, polling for changes")
+    return _PollingWatcher(directory, names, interval)
+
+
+def changed_services(old: dict, new: dict) -> tuple[list[str], list[str]]:
+    """Compare the services of two compiled compose definitions.
+
+    Args:
+        old: The previous compose definition.
+        new: The new compose definition.
+
+    Returns:
+        Tuple of (added or changed services, removed services).
+    """
+    old_services = old.get('services') or {}
+    new_services = new.get('services') or {}
+    changed = [name for name, service in new_services.items() if old_services.get(name) != service]
+    removed = [name for name in old_services if name not in new_services]
+    return sorted(changed), sorted(removed)
+
+
+def _running_services() -> set[str]:
+    """Get the services of the workshop that have a running container."""
+    # imported here so that watching does not depend on Docker until a change is applied
+    from devx.run import containers  # pylint: disable=import-outside-toplevel
+
+    try:
+        return {container['service'] for container in containers() if container['state'] == 'running'}
+    except DockerError:
+        return set()
+
+
+def _apply(old: dict, new: dict, changed: list[str], removed: list[str]) -> None:
+    """Recreate the changed services of the running workshop.
+
+    Only services that have a running container are recreated, plus new services that
+    are not gated by a compose profile. Naming a stopped profile-gated service, such as
+    a NIM, would start it, so those changes apply when the profile is next started.
+    """
+    # imported here so that watching does not depend on Docker until a change is applied
+    from devx.run import recreate  # pylint: disable=import-outside-toplevel
+
+    running = _running_services()
+    if not running:
+        print("➖ Workshop is not running, changes apply on the next `devx workshop start`")
+        return
+
+    old_services = old.get('services') or {}
+    new_services = new.get('services') or {}
+    apply = [
+        service for service in changed
+        if service in running or (service not in old_services and not (new_services[service] or {}).get('profiles'))
+    ]
+    for service in changed:
+        if service in apply:
+            print(f"♻️  Recreating {service}")
+        else:
+            print(f"➖ {service} is not running, its change applies when it is next started")
+    for service in removed:
+        print(f"🗑️  Removing {service}")
+    recreate(apply, removed)
+
+
+def _reload() -> tuple[dict, dict]:
+    """Recompile the generated files.
+
+    Returns:
+        Tuple of (previous, new) compiled local compose definitions.
+    """
+    # imported here to read the configuration again after pyproject.toml changed
+    from devx.snapshot import load_config  # pylint: disable=import-outside-toplevel
+
+    old = load_compose_file(TARGET_LOCAL_FILE)
+    project, workspace, _ = load_config()
+    sync(workspace, project)
+    return old, load_compose_file(TARGET_LOCAL_FILE)
+
+
+def watch(poll: bool = False, interval: float = 1.0) -> None:
+    """Watch the workshop inputs until interrupted, applying every change.
+
+    Args:
+        poll: Whether to poll for changes instead of using inotify.
+        interval: Seconds between polls.
+    """
+    inputs = [*USER_COMPOSE_PATHS, LOCAL_ENV_FILE, PYPROJECT_FILE]
+    hashes = {path: hash_file(path) for path in inputs}
+    watcher = _watcher(Path('.'), {path.name for path in inputs}, poll, interval)
+
+    print(f"👀 Watching {', '.join(str(path) for path in inputs if path.exists())} for changes (Ctrl+C to stop)")
+    try:
+        while True:
+            watcher.wait()
+            current = {path: hash_file(path) for path in inputs}
+            edited = [str(path) for path in inputs if current[path] != hashes[path]]
+            hashes = current
+            if not edited:
+                continue
+
+            print(f"🔄 {', '.join(edited)} changed")
+            try:
+                old, new = _reload()
+                changed, removed = changed_services(old, new)
+                if not changed and not removed:
+                    print("✅ No service definitions changed")
+                    continue
+                _apply(old, new, changed, removed)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                # keep watching, the next edit may fix the problem
+                print(f"❌ {e}")
+    finally:
+        watcher.close()
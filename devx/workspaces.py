@@ -3,13 +3,38 @@ Module for managing workspace-specific config containers in compose.yaml files.
 
 This module provides config service configurations that need to be injected into
 compose.yaml files based on the current workspace group.
+
+Workspace groups are loaded from the built in list below, then from the site
+(`/etc/devx/workspaces.toml`) and user (`~/.config/devx/workspaces.toml`) registry
+files. Later sources replace groups with the same name. The files contain a list of
+workspace groups:
+
+    [[workspace_groups]]
+    name = "my-group"
+    provider = "aws"
+    nvidia_driver_version = 570
+
+The merged registry is cached in the user cache directory and rebuilt when any of the
+registry files change.
 """
 
+import hashlib
+import json
+import sys
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional
 
+from devx.constants import SITE_CONFIG_DIR, USER_CACHE_DIR, USER_CONFIG_DIR
 from devx.models import WorkspaceGroupConfig
 
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib
+
+REGISTRY_FILES = [SITE_CONFIG_DIR / 'workspaces.toml', USER_CONFIG_DIR / 'workspaces.toml']
+REGISTRY_CACHE_FILE = USER_CACHE_DIR / 'workspaces.json'
+
 # List to store workspace group configurations
 _KNOWN_WORKSPACES: List[WorkspaceGroupConfig] = [
     WorkspaceGroupConfig(
@@ -33,25 +58,168 @@ _KNOWN_WORKSPACES: List[WorkspaceGroupConfig] = [
 ]
 
 
+def _driver_preference(group: WorkspaceGroupConfig) -> int:
+    """Sort key that prefers newer drivers and puts unknown drivers last."""
+    return -(group.nvidia_driver_version or -1)
+
+
 class WorkspaceCollection():
     """
-    A collection of workspace group configurations.
-
-    This class provides a dictionary-like interface for accessing workspace group configurations.
-    It supports both string-based indexing (by name) and integer-based indexing (by position).
+    An indexed collection of workspace group configurations.
 
+    The registry is loaded on first use. Groups can be looked up by name, by provider,
+    and by provider plus NVIDIA driver version in constant time.
     """
 
+    def __init__(self, builtin: List[WorkspaceGroupConfig], registry_files: List[Path], cache_file: Path):
+        self._builtin = builtin
+        self._registry_files = registry_files
+        self._cache_file = cache_file
+        self._groups: Optional[List[WorkspaceGroupConfig]] = None
+        self._by_name: Dict[str, WorkspaceGroupConfig] = {}
+        self._by_provider: Dict[str, List[WorkspaceGroupConfig]] = {}
+        self._by_provider_driver: Dict[tuple[str, Optional[int]], List[WorkspaceGroupConfig]] = {}
+
+    def _sources_key(self) -> str:
+        """Hash the built in groups and the stat of every registry file."""
+        sources = [[group.model_dump(mode='json') for group in self._builtin]]
+        for path in self._registry_files:
+            try:
+                stat = path.stat()
+                sources.append([str(path), stat.st_mtime_ns, stat.st_size])
+            except OSError:
+                sources.append([str(path), None, None])
+        return hashlib.sha256(json.dumps(sources, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def _read_registry_files(self) -> List[WorkspaceGroupConfig]:
+        """Merge the built in groups with the groups from the registry files.
+
+        Raises:
+            ValueError: If a registry file is not valid.
+        """
+        groups = {group.name: group for group in self._builtin}
+        for path in self._registry_files:
+            try:
+                with open(path, 'rb') as f:
+                    registry = tomllib.load(f)
+            except FileNotFoundError:
+                continue
+            except (OSError, tomllib.TOMLDecodeError) as exc:
+                raise ValueError(f"Could not read workspace registry {path}: {exc}") from exc
+
+            for entry in registry.get('workspace_groups', []):
+                group = WorkspaceGroupConfig(**entry)
+                groups.pop(group.name, None)
+                groups[group.name] = group
+        return list(groups.values())
+
+    def _read_cache(self, key: str) -> Optional[List[WorkspaceGroupConfig]]:
+        """Load the merged registry from the cache if it matches the sources."""
+        try:
+            with open(self._cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+        if cache.get('key') != key:
+            return None
+        return [WorkspaceGroupConfig(**group) for group in cache.get('groups', [])]
+
+    def _write_cache(self, key: str, groups: List[WorkspaceGroupConfig]) -> None:
+        """Store the merged registry in the cache, ignoring unwritable cache directories."""
+        try:
+            self._cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self._cache_file, 'w', encoding='utf-8') as f:
+                json.dump({"key": key, "groups": [group.model_dump(mode='json') for group in groups]}, f)
+        except OSError:
+            pass
+
+    def _load(self) -> List[WorkspaceGroupConfig]:
+        """Load the registry and build the lookup indexes on first use."""
+        if self._groups is not None:
+            return self._groups
+
+        key = self._sources_key()
+        groups = self._read_cache(key)
+        if groups is None:
+            groups = self._read_registry_files()
+            self._write_cache(key, groups)
+
+        for group in groups:
+            self._by_name[group.name] = group
+            if group.provider:
+                self._by_provider.setdefault(group.provider, []).append(group)
+                self._by_provider_driver.setdefault((group.provider, group.nvidia_driver_version), []).append(group)
+        for candidates in self._by_provider.values():
+            candidates.sort(key=_driver_preference)
+
+        self._groups = groups
+        return groups
+
     def query_name(self, name: str) -> WorkspaceGroupConfig | None:
         """Query a workspace group by name."""
-        return next((group for group in _KNOWN_WORKSPACES if group.name == name), None)
+        self._load()
+        return self._by_name.get(name)
 
     def query_provider(self, provider: str) -> WorkspaceGroupConfig | None:
-        """Query a workspace group by provider."""
-        return next((group for group in _KNOWN_WORKSPACES if group.provider == provider), None)
+        """Query the preferred workspace group for a provider."""
+        self._load()
+        candidates = self._by_provider.get(provider)
+        return candidates[0] if candidates else None
+
+    def query_provider_driver(self, provider: str, driver_version: int) -> WorkspaceGroupConfig | None:
+        """Query a workspace group by provider and NVIDIA driver version."""
+        self._load()
+        candidates = self._by_provider_driver.get((provider, driver_version))
+        return candidates[0] if candidates else None
+
+    def select(self, provider: str, valid_driver_versions: Optional[List[int]] = None) -> WorkspaceGroupConfig | None:
+        """Choose the best workspace group for a provider and driver constraint.
+
+        Groups with the newest compatible driver are preferred. Groups with an unknown
+        driver version are only chosen when no compatible group is known.
+
+        Args:
+            provider: The cloud provider.
+            valid_driver_versions: Acceptable NVIDIA driver versions, or None for any.
+
+        Returns:
+            The best matching workspace group, or None if no group is compatible.
+        """
+        self._load()
+        if valid_driver_versions is None:
+            return self.query_provider(provider)
+
+        for driver_version in sorted(valid_driver_versions, reverse=True):
+            group = self.query_provider_driver(provider, driver_version)
+            if group:
+                return group
+        return self._by_provider_driver.get((provider, None), [None])[0]
+
+    def providers(self) -> List[str]:
+        """List the providers with at least one workspace group."""
+        self._load()
+        return list(self._by_provider)
+
+    def driver_versions(self, provider: str) -> List[int]:
+        """List the known NVIDIA driver versions for a provider."""
+        self._load()
+        return sorted({
+            group.nvidia_driver_version for group in self._by_provider.get(provider, [])
+            if group.nvidia_driver_version is not None
+        })
+
+    def fingerprint(self) -> str:
+        """Get a hash of all known workspace groups."""
+        groups = [group.model_dump(mode='json') for group in self._load()]
+        return hashlib.sha256(json.dumps(groups, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def __iter__(self) -> Iterator[WorkspaceGroupConfig]:
+        """Iterate over the workspace groups."""
+        return iter(self._load())
 
     def __len__(self) -> int:
         """Get the number of workspace groups."""
-        return len(_KNOWN_WORKSPACES)
+        return len(self._load())
 
-WORKSPACES = WorkspaceCollection()
+WORKSPACES = WorkspaceCollection(_KNOWN_WORKSPACES, REGISTRY_FILES, REGISTRY_CACHE_FILE)
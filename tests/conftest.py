@@ -0,0 +1,11 @@
+"""Fixtures shared by the devx tests."""
+
+import pytest
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """Run in an empty project with a `.devx` directory."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / '.devx').mkdir()
+    return tmp_path
@@ -0,0 +1,146 @@
+"""Tests for the Brev API client against a local stand-in server."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from devx import brev
+from devx.brev import BrevAPIError, BrevClient, RateLimiter
+
+
+class StubAPI(ThreadingHTTPServer):
+    """An HTTP server that answers every request with the next scripted response.
+
+    Attributes:
+        responses: The (status, headers, body) responses still to send. The last one
+            is repeated once the others are used up.
+        requests: The (method, path, headers) of every request received.
+    """
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.responses: list[tuple[int, dict, object]] = [(200, {}, {})]
+        self.requests: list[tuple[str, str, dict]] = []
+
+    @property
+    def url(self) -> str:
+        """The base URL of the server."""
+        return f"http://127.0.0.1:{self.server_address[1]}/api"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Records the request and sends the next scripted response."""
+
+    def _respond(self):
+        """Answer a request of any method."""
+        self.server.requests.append((self.command, self.path, dict(self.headers)))
+        responses = self.server.responses
+        status, headers, body = responses.pop(0) if len(responses) > 1 else responses[0]
+        data = json.dumps(body).encode('utf-8') if body is not None else b''
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _respond
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Keep the test output quiet."""
+
+
+@pytest.fixture
+def api():
+    """Run a stand-in Brev API for the test."""
+    server = StubAPI()
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record the retry delays instead of sleeping."""
+    delays: list[float] = []
+    monkeypatch.setattr(brev, 'time', SimpleNamespace(monotonic=time.monotonic, sleep=delays.append))
+    return delays
+
+
+def client(api, **kwargs):
+    """Create a client for the stand-in API."""
+    return BrevClient('token', 'org-1', base_url=api.url, **kwargs)
+
+
+def test_server_errors_are_retried_with_backoff(api, sleeps):
+    api.responses = [(503, {}, None), (502, {}, None), (200, {}, {"id": "ws-1"})]
+    with client(api, backoff=0.5) as brev_client:
+        assert brev_client.get_workspace('ws-1') == {"id": "ws-1"}
+    assert [method for method, _, _ in api.requests] == ['GET'] * 3
+    assert api.requests[0][1].startswith('/api/workspaces/ws-1?utm_source=devx-cli')
+    assert api.requests[0][2]['Authorization'] == 'Bearer token'
+    assert sleeps == [0.5, 1.0]
+
+
+def test_retry_after_is_honored(api, sleeps):
+    api.responses = [(429, {"Retry-After": "7"}, {"message": "slow down"}), (200, {}, [])]
+    with client(api) as brev_client:
+        assert brev_client.list_launchables() == []
+    assert sleeps == [7.0]
+
+
+def test_retries_give_up_with_the_last_error(api, sleeps):
+    api.responses = [(500, {}, {"message": "boom"})]
+    with client(api, max_retries=2) as brev_client, pytest.raises(BrevAPIError) as error:
+        brev_client.stop_workspace('ws-1')
+    assert len(api.requests) == 3
+    assert len(sleeps) == 2
+    assert (error.value.status, error.value.method, str(error.value)) == (
+        500, 'PUT', "PUT workspaces/ws-1/stop failed (HTTP 500): boom"
+    )
+
+
+def test_client_errors_are_not_retried(api, sleeps):
+    api.responses = [(404, {}, {"message": "not found"})]
+    with client(api) as brev_client, pytest.raises(BrevAPIError) as error:
+        brev_client.delete_workspace('ws-1')
+    assert len(api.requests) == 1
+    assert not sleeps
+    assert error.value.status == 404
+
+
+def test_workspaces_are_listed_across_pages(api):
+    api.responses = [
+        (200, {}, {"items": [{"id": "ws-1"}], "nextPageToken": "page-2"}),
+        (200, {}, {"items": [{"id": "ws-2"}]}),
+    ]
+    with client(api) as brev_client:
+        assert [workspace['id'] for workspace in brev_client.list_workspaces()] == ['ws-1', 'ws-2']
+    assert 'pageToken=page-2' in api.requests[1][1]
+
+
+def test_rate_limit_spaces_out_requests(api):
+    with client(api, rate_limit=20) as brev_client:
+        started = time.monotonic()
+        for _ in range(5):
+            brev_client.get_workspace('ws-1')
+        elapsed = time.monotonic() - started
+    assert elapsed >= 0.2
+
+
+def test_rate_limiter_is_shared_between_threads(monkeypatch):
+    delays: list[float] = []
+    monkeypatch.setattr(brev, 'time', SimpleNamespace(monotonic=lambda: 100.0, sleep=delays.append))
+    limiter = RateLimiter(4)
+    threads = [threading.Thread(target=limiter.wait) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(delays) == [0.25, 0.5, 0.75]
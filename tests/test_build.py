@@ -0,0 +1,89 @@
+"""Tests for fingerprinting the inputs of the workshop image build."""
+
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from devx import build
+from devx.build import copy_sources, fingerprint, rebuild_reasons, record_build
+
+TEMPLATE_DOCKERFILE = Path(__file__).parents[1] / 'templates' / 'simple' / 'Dockerfile'
+
+
+@pytest.fixture
+def images(project, monkeypatch):
+    """Build in a project with the template Dockerfile, with image IDs by image name."""
+    shutil.copy(TEMPLATE_DOCKERFILE, project / 'Dockerfile')
+    (project / 'pyproject.toml').write_text('[project]\nname = "lab"\n', encoding='utf-8')
+    (project / '.devx' / 'jp_app_launcher.yaml').write_text('[]\n', encoding='utf-8')
+    (project / '.devx' / 'wheelhouse').mkdir()
+    ids = {'lab-devx': 'sha256:1'}
+    monkeypatch.setattr(build, 'image_id', ids.get)
+    monkeypatch.setattr(build, 'compose_project_name', lambda compose_file: 'lab')
+    return ids
+
+
+def write(path, content):
+    """Write a file and move its modification time, so size and mtime signatures change."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding='utf-8')
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_copy_sources_include_bind_mounts(images):
+    assert copy_sources() == ['pyproject.toml', '.devx/wheelhouse', '.devx/jp_app_launcher.yaml']
+
+
+def test_only_bind_mounts_from_the_context_are_sources(project):
+    write('Dockerfile', (
+        "FROM python:3.12 AS base\n"
+        "RUN --mount=type=cache,target=/root/.cache --mount=type=secret,id=token true\n"
+        "RUN --mount=type=bind,from=base,source=/etc,target=/base true\n"
+        "RUN --mount=src=data,target=/data --mount=type=bind,target=/context \\\n"
+        "  --mount=type=bind,source=${DIR},target=/dir true\n"
+    ))
+    assert copy_sources() == ['data', '.', '.']
+
+
+def test_fingerprint_respects_dockerignore(images):
+    write('.devx/wheelhouse/numpy-2.0-py3-none-any.whl', 'wheel')
+    write('.devx/wheelhouse/notes.txt', 'notes')
+    write('.dockerignore', '**/*.txt\n')
+    assert list(fingerprint()['files']) == ['.devx/wheelhouse/numpy-2.0-py3-none-any.whl']
+
+
+def test_an_unchanged_build_needs_no_rebuild(images):
+    assert rebuild_reasons() == ["no previous build recorded"]
+    record_build()
+    assert rebuild_reasons() == []
+    assert rebuild_reasons(force=True) == ["rebuild requested"]
+
+
+def test_refreshing_the_wheelhouse_triggers_a_rebuild(images):
+    record_build()
+    write('.devx/wheelhouse/numpy-2.0-py3-none-any.whl', 'wheel')
+    assert rebuild_reasons() == [".devx/wheelhouse/numpy-2.0-py3-none-any.whl changed"]
+
+
+def test_content_inputs_and_the_image_trigger_a_rebuild(images):
+    record_build()
+    write('pyproject.toml', '[project]\nname = "lab"\ndependencies = ["numpy"]\n')
+    assert rebuild_reasons() == ["pyproject.toml changed"]
+
+    images['lab-devx'] = 'sha256:2'
+    assert rebuild_reasons() == ["image lab-devx was rebuilt outside devx"]
+    del images['lab-devx']
+    assert rebuild_reasons() == ["image lab-devx not found"]
+
+
+def test_many_changed_files_are_summarized(images):
+    record_build()
+    for index in range(build.MAX_REPORTED_FILES + 2):
+        write(f'.devx/wheelhouse/pkg{index}-1.0-py3-none-any.whl', 'wheel')
+    reasons = rebuild_reasons()
+    assert len(reasons) == build.MAX_REPORTED_FILES + 1
+    assert reasons[-1] == "2 more copied files changed"
@@ -0,0 +1,79 @@
+"""Tests for compiling the template compose file into the local and launchable targets."""
+
+import os
+from pathlib import Path
+
+import pytest
+import yaml
+
+from devx import sync
+from devx.sync import dump_compose, read_compose_source, transform_launchable_compose, transform_local_compose
+from devx.workspaces import _KNOWN_WORKSPACES, WorkspaceCollection
+
+TEMPLATE_DIR = Path(__file__).parents[1] / 'templates' / 'simple'
+TEMPLATE_COMPOSE = TEMPLATE_DIR / 'compose.yaml'
+TEMPLATE_ENV = TEMPLATE_DIR / 'variables.env'
+IMAGE_URL = 'ghcr.io/nvidia/workshop'
+WORKSPACE_GROUP = 'crusoe-brev-wg'
+# regenerate with `DEVX_UPDATE_GOLDEN=1 python -m pytest tests/test_compile.py`
+GOLDEN_DIR = Path(__file__).parent / 'fixtures' / 'compose'
+
+
+@pytest.fixture(autouse=True)
+def workspaces(tmp_path, monkeypatch):
+    """Use the built in workspace groups only, ignoring the registry files of this machine."""
+    monkeypatch.setattr(sync, 'WORKSPACES', WorkspaceCollection(_KNOWN_WORKSPACES, [], tmp_path / 'workspaces.json'))
+
+
+def compile_separately(data_volumes=None):
+    """Compile both targets the way the pipeline did before the single parse.
+
+    Every target parses the compose and environment files itself, with the pure-Python
+    YAML classes.
+    """
+    loader, dumper = sync.YAML_LOADER, sync.YAML_DUMPER
+    try:
+        sync.YAML_LOADER, sync.YAML_DUMPER = yaml.SafeLoader, yaml.Dumper
+        local = transform_local_compose(read_compose_source(TEMPLATE_COMPOSE, TEMPLATE_ENV), 8888)
+        launchable = transform_launchable_compose(
+            read_compose_source(TEMPLATE_COMPOSE, TEMPLATE_ENV), IMAGE_URL, WORKSPACE_GROUP, data_volumes=data_volumes
+        )
+        return dump_compose(local), dump_compose(launchable)
+    finally:
+        sync.YAML_LOADER, sync.YAML_DUMPER = loader, dumper
+
+
+@pytest.mark.parametrize('data_volumes', [None, 'all', 'none'])
+def test_single_parse_matches_a_parse_per_target(data_volumes):
+    source = read_compose_source(TEMPLATE_COMPOSE, TEMPLATE_ENV)
+    local = dump_compose(transform_local_compose(source, 8888))
+    launchable = dump_compose(
+        transform_launchable_compose(source, IMAGE_URL, WORKSPACE_GROUP, data_volumes=data_volumes)
+    )
+    assert (local, launchable) == compile_separately(data_volumes)
+
+
+def test_targets_do_not_change_the_parsed_source():
+    source = read_compose_source(TEMPLATE_COMPOSE, TEMPLATE_ENV)
+    launchable = transform_launchable_compose(source, IMAGE_URL, WORKSPACE_GROUP, prefetch=True)
+    local = transform_local_compose(source, 8888, gpu_count=4)
+
+    fresh = read_compose_source(TEMPLATE_COMPOSE, TEMPLATE_ENV)
+    assert source == fresh
+    assert launchable == transform_launchable_compose(fresh, IMAGE_URL, WORKSPACE_GROUP, prefetch=True)
+    assert local == transform_local_compose(read_compose_source(TEMPLATE_COMPOSE, TEMPLATE_ENV), 8888, gpu_count=4)
+
+
+@pytest.mark.parametrize('name, prefetch, data_volumes', [
+    ('launchable', False, 'none'),
+    ('launchable-prefetch', True, 'none'),
+    ('launchable-prefetch-labeled', True, 'labeled'),
+    ('launchable-prefetch-all', True, 'all'),
+])
+def test_launchable_compose_matches_the_golden_file(name, prefetch, data_volumes):
+    source = read_compose_source(TEMPLATE_COMPOSE, TEMPLATE_ENV)
+    compiled = dump_compose(transform_launchable_compose(source, IMAGE_URL, WORKSPACE_GROUP, prefetch, data_volumes))
+    golden = GOLDEN_DIR / f"{name}.yaml"
+    if os.environ.get('DEVX_UPDATE_GOLDEN'):
+        golden.write_text(compiled, encoding='utf-8')
+    assert compiled == golden.read_text(encoding='utf-8')
@@ -0,0 +1,221 @@
+"""Tests for the Docker Engine API client against a stand-in engine on a Unix socket."""
+
+import json
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from devx.docker import (
+    COMPOSE_CONFIG_FILES_LABEL,
+    COMPOSE_PROJECT_LABEL,
+    COMPOSE_SERVICE_LABEL,
+    DockerEngine,
+    DockerError,
+    compose_containers,
+    split_image_reference,
+)
+
+
+class Lines(list):
+    """A response body streamed as JSON lines, like the progress of a pull."""
+
+
+class StubEngine(socketserver.ThreadingUnixStreamServer):
+    """A Docker Engine stand-in that answers requests from a table of routes.
+
+    Attributes:
+        routes: The (status, body) response of every (method, path). A body of None
+            leaves the response open until `release` is set.
+        requests: The (method, path, query) of every request received.
+        connections: The number of connections accepted.
+        drop_idle: Whether to close every connection after one response, without
+            telling the client.
+        release: Set to end the open responses.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str):
+        super().__init__(socket_path, StubHandler)
+        self.routes: dict[tuple[str, str], tuple[int, object]] = {("GET", "/_ping"): (200, "OK")}
+        self.requests: list[tuple[str, str, dict]] = []
+        self.connections = 0
+        self.drop_idle = False
+        self.release = threading.Event()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Records the request and sends the response of its route."""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def _respond(self):
+        """Answer a request of any method."""
+        url = urlsplit(self.path)
+        self.server.requests.append((self.command, url.path, parse_qs(url.query)))
+        status, body = self.server.routes.get((self.command, url.path), (404, {"message": "page not found"}))
+        self.send_response(status)
+        if body is None:
+            # the engine streams events as chunks of one JSON line each
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            event = b'{"status": "start"}\n'
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(event), event))
+            self.wfile.flush()
+            self.server.release.wait(5)
+            self.close_connection = True
+            return
+
+        if isinstance(body, Lines):
+            data = b"".join(json.dumps(line).encode("utf-8") + b"\n" for line in body)
+        else:
+            data = json.dumps(body).encode("utf-8")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        self.close_connection = self.server.drop_idle
+
+    do_GET = do_POST = _respond
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Keep the test output quiet."""
+
+
+@pytest.fixture
+def stub(tmp_path):
+    """Run a stand-in Docker Engine for the test."""
+    server = StubEngine(str(tmp_path / "docker.sock"))
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+    yield server
+    server.release.set()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(stub):
+    """Connect a client to the stand-in engine."""
+    with DockerEngine(stub.server_address, timeout=5) as docker:
+        yield docker
+
+
+def container(service, config_files, status="Up 2 minutes (healthy)"):
+    """Build a Docker Engine API container of a compose service."""
+    return {
+        "Id": f"{service}0123456789abcdef",
+        "Names": [f"/devx-{service}-1"],
+        "Image": "nginx",
+        "State": "running",
+        "Status": status,
+        "Ports": [
+            {"IP": "0.0.0.0", "PrivatePort": 80, "PublicPort": 8080, "Type": "tcp"},
+            {"IP": "0.0.0.0", "PrivatePort": 80, "PublicPort": 8080, "Type": "tcp"},
+            {"PrivatePort": 443, "Type": "tcp"},
+        ],
+        "Labels": {
+            COMPOSE_PROJECT_LABEL: "devx",
+            COMPOSE_SERVICE_LABEL: service,
+            COMPOSE_CONFIG_FILES_LABEL: config_files,
+        },
+    }
+
+
+def test_requests_share_one_connection(stub, client):
+    stub.routes[("GET", "/containers/json")] = (200, [])
+    assert client.ping()
+    assert client.containers() == []
+    assert client.ping()
+    assert stub.connections == 1
+    assert len(stub.requests) == 3
+
+
+def test_idle_connections_closed_by_the_engine_are_reopened(stub, client):
+    stub.drop_idle = True
+    for _ in range(3):
+        assert client.request("GET", "/_ping") == "OK"
+    assert stub.connections == 3
+
+
+def test_compose_containers_are_filtered_by_compose_file(stub, client, tmp_path):
+    compose_file = tmp_path / "compose.yaml"
+    stub.routes[("GET", "/containers/json")] = (200, [
+        container("web", f"/elsewhere/compose.yaml,{compose_file}"),
+        container("other", "/elsewhere/compose.yaml"),
+    ])
+    summaries = compose_containers(client, compose_file)
+
+    _, _, query = stub.requests[-1]
+    assert query["all"] == ["true"]
+    assert json.loads(query["filters"][0]) == {"label": [COMPOSE_PROJECT_LABEL]}
+    assert summaries == [{
+        "service": "web",
+        "name": "devx-web-1",
+        "id": "web012345678",
+        "image": "nginx",
+        "state": "running",
+        "status": "Up 2 minutes (healthy)",
+        "health": "healthy",
+        "ports": ["0.0.0.0:8080->80/tcp"],
+        "config_hash": None,
+    }]
+
+
+def test_engine_errors_carry_their_status(stub, client):
+    stub.routes[("POST", "/containers/abc/restart")] = (500, {"message": "cannot restart"})
+    assert client.inspect_image("missing") is None
+    with pytest.raises(DockerError) as error:
+        client.restart_container("abc")
+    assert error.value.status == 500
+    assert "cannot restart" in str(error.value)
+
+
+def test_unreachable_engine_raises(tmp_path):
+    with DockerEngine(tmp_path / "missing.sock", timeout=1) as docker:
+        assert not docker.ping()
+        with pytest.raises(DockerError, match="Could not reach the Docker engine"):
+            docker.containers()
+
+
+def test_pull_streams_progress_and_fails_on_stream_errors(stub, client, monkeypatch):
+    monkeypatch.setattr("devx.docker.registry_auth", lambda image: None)
+    stub.routes[("POST", "/images/create")] = (200, Lines([{"status": "Pulling"}, {"status": "Done"}]))
+    progress = []
+    client.pull("nvcr.io:443/nim/llama", progress.append)
+    assert progress == [{"status": "Pulling"}, {"status": "Done"}]
+    assert stub.requests[-1][2] == {"fromImage": ["nvcr.io:443/nim/llama"], "tag": ["latest"]}
+
+    stub.routes[("POST", "/images/create")] = (200, Lines([{"status": "Pulling"}, {"error": "manifest unknown"}]))
+    with pytest.raises(DockerError, match="manifest unknown"):
+        client.pull("postgres:15", progress.append)
+
+
+def test_event_stream_can_be_closed_from_another_thread(stub, client):
+    stub.routes[("GET", "/events")] = (200, None)
+    stream = client.events({"type": ["container"]})
+    events = []
+    for event in stream:
+        events.append(event)
+        threading.Thread(target=stream.close).start()
+    assert events == [{"status": "start"}]
+    assert client.ping()
+
+
+@pytest.mark.parametrize("image, expected", [
+    ("postgres", ("postgres", "latest")),
+    ("postgres:15", ("postgres", "15")),
+    ("nvcr.io/nim/meta/llama-3.1-8b-instruct:1.3.3", ("nvcr.io/nim/meta/llama-3.1-8b-instruct", "1.3.3")),
+    ("localhost:5000/app", ("localhost:5000/app", "latest")),
+    ("localhost:5000/app:dev", ("localhost:5000/app", "dev")),
+    ("redis:7@sha256:abc", ("redis", "sha256:abc")),
+])
+def test_split_image_reference(image, expected):
+    assert split_image_reference(image) == expected
@@ -0,0 +1,88 @@
+"""Tests for checking the links, anchors and images of the lab manual."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from devx.docs import DocsIndex, Reference, build_index, check_docs, check_reference, parse_markdown, slugify
+
+INDEX = DocsIndex(
+    headings={
+        'README.md': ['welcome'],
+        'labs/01.md': ['setup', 'setup-1', '_2-run-it'],
+        'labs/README.md': ['labs'],
+    },
+    references={},
+    files={'README.md': 10, 'labs/01.md': 10, 'labs/README.md': 10, 'images/arch.png': 300_000},
+)
+
+
+def test_slugify_follows_docsify():
+    seen: dict[str, int] = {}
+    assert slugify("Getting Started!", seen) == 'getting-started'
+    assert slugify("Getting  Started?", seen) == 'getting-started-1'
+    assert slugify("2. Run <code>it</code>", seen) == '_2-run-it'
+    assert slugify("C++ & CUDA", seen) == 'c-cuda'
+
+
+def test_parse_markdown_skips_code():
+    headings, references = parse_markdown(
+        "# Setup :id=start\n"
+        "See [the lab](labs/01.md) and `[not a link](x.md)`.\n"
+        "```\n# not a heading\n![not an image](x.png)\n```\n"
+        '<img src="images/arch.png" width="50%">\n'
+    )
+    assert headings == ['start']
+    assert references == [Reference(2, False, 'labs/01.md'), Reference(7, True, 'images/arch.png')]
+
+
+@pytest.mark.parametrize('page, target, expected', [
+    ('README.md', 'labs/01.md', 'labs/01.md'),
+    ('README.md', 'labs/01', 'labs/01.md'),
+    ('README.md', 'labs/', 'labs/README.md'),
+    ('labs/01.md', '../images/arch.png', 'images/arch.png'),
+    ('labs/01.md', 'images/arch.png', 'images/arch.png'),
+    ('labs/01.md', '#setup-1', 'labs/01.md'),
+    ('labs/01.md', '#/labs/01?id=_2-run-it', 'labs/01.md'),
+    ('labs/01.md', '#/', 'README.md'),
+    ('labs/01.md', '#/README?id=welcome', 'README.md'),
+    ('README.md', 'https://nvidia.com/missing', None),
+    ('README.md', 'mailto:team@example.com', None),
+])
+def test_references_resolve(page, target, expected):
+    assert check_reference(INDEX, page, Reference(1, False, target)) == expected
+
+
+@pytest.mark.parametrize('target, error', [
+    ('labs/02.md', 'broken link to labs/02.md'),
+    ('labs/01.md#teardown', 'anchor #teardown not found in labs/01.md'),
+    ('#/labs/01?id=teardown', 'anchor #teardown not found in labs/01.md'),
+])
+def test_broken_references_raise(target, error):
+    with pytest.raises(ValueError, match=error):
+        check_reference(INDEX, 'README.md', Reference(1, False, target))
+
+
+def test_check_docs_fails_broken_references_and_warns_on_large_images():
+    references = {'README.md': [Reference(3, True, 'images/arch.png'), Reference(4, False, 'missing.md')]}
+    results = check_docs(INDEX._replace(references=references), 200 * 1024)
+    assert results[0].failures == ["line 4: broken link to missing.md"]
+    assert results[0].output == "line 3: image images/arch.png is 293 KiB, larger than the 200 KiB limit"
+
+
+def test_only_changed_pages_are_parsed_again(project):
+    docs = Path('.devx')
+    (docs / 'README.md').write_text("# Welcome\n[Lab](lab.md)\n", encoding='utf-8')
+    (docs / 'lab.md').write_text("# Lab\n", encoding='utf-8')
+
+    assert build_index()[1] == 2
+    index, parsed = build_index()
+    assert parsed == 0
+    assert index.references['README.md'] == [Reference(2, False, 'lab.md')]
+
+    (docs / 'lab.md').write_text("# Lab one\n", encoding='utf-8')
+    os.utime(docs / 'lab.md', ns=(0, 0))
+    index, parsed = build_index()
+    assert parsed == 1
+    assert index.headings['lab.md'] == ['lab-one']
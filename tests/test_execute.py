@@ -0,0 +1,108 @@
+"""Tests for planning, sharding and caching the execution of workshop notebooks."""
+
+import json
+from pathlib import Path
+
+from devx import execute
+from devx.execute import NotebookPlan, NotebookRun, cache_keys, execute_notebooks, read_plan, shard
+
+
+def plan(path, depends_on=(), profiles=(), gpu=False):
+    """Build the execution plan of a notebook."""
+    return NotebookPlan(path, list(depends_on), 60, list(profiles), gpu)
+
+
+def write_notebook(path, metadata=None):
+    """Write a notebook with `devx` metadata."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"cells": [], "metadata": {"devx": metadata or {}}}), encoding='utf-8')
+
+
+def test_read_plan_resolves_dependencies_from_the_notebook_directory(project):
+    write_notebook(project / 'labs' / '02.ipynb', {"depends_on": ["01.ipynb", "../setup.ipynb"], "timeout": 5})
+    result = read_plan(Path('labs/02.ipynb'), 1800)
+    assert result.depends_on == ['labs/01.ipynb', 'setup.ipynb']
+    assert result.timeout == 5
+
+
+def test_shards_keep_dependencies_together_and_cover_every_notebook():
+    plans = {
+        'a': plan('a'), 'b': plan('b', ['a']), 'c': plan('c', ['b']),
+        'd': plan('d'), 'e': plan('e'), 'f': plan('f', ['e']),
+    }
+    shards = [shard(plans, index, 3) for index in (1, 2, 3)]
+
+    assert shards[0] == {'a', 'b', 'c'}
+    assert set().union(*shards) == set(plans)
+    assert sum(len(selected) for selected in shards) == len(plans)
+    assert shards == [shard(dict(reversed(plans.items())), index, 3) for index in (1, 2, 3)]
+
+
+def test_cache_keys_follow_dependencies(project):
+    for name in ('a', 'b'):
+        write_notebook(project / f'{name}.ipynb')
+    plans = {'a.ipynb': plan('a.ipynb'), 'b.ipynb': plan('b.ipynb', ['a.ipynb'])}
+
+    keys = cache_keys(plans, 'sha256:image', False)
+    write_notebook(project / 'a.ipynb', {"timeout": 10})
+    changed = cache_keys(plans, 'sha256:image', False)
+
+    assert changed['a.ipynb'] != keys['a.ipynb']
+    assert changed['b.ipynb'] != keys['b.ipynb']
+    assert cache_keys(plans, 'sha256:other', False)['a.ipynb'] != keys['a.ipynb']
+    assert cache_keys(plans, 'sha256:image', True)['a.ipynb'] != keys['a.ipynb']
+
+
+def test_notebooks_in_a_cycle_get_no_key(project):
+    for name in ('a', 'b'):
+        write_notebook(project / f'{name}.ipynb')
+    plans = {'a.ipynb': plan('a.ipynb', ['b.ipynb']), 'b.ipynb': plan('b.ipynb', ['a.ipynb'])}
+    assert not cache_keys(plans, 'image', False)
+
+
+def fake_runs(monkeypatch, failing=()):
+    """Replace executing a notebook with a record of the executed notebooks."""
+    executed = []
+
+    def run(container, notebook, cpu_only=False):
+        executed.append(notebook.path)
+        status = 'failed' if notebook.path in failing else 'passed'
+        return NotebookRun(notebook.path, status, 1.0, [(1, 1.0)])
+
+    monkeypatch.setattr(execute, 'execute_notebook', run)
+    return executed
+
+
+def test_cached_dependencies_run_again_for_dependents_that_run(project, monkeypatch):
+    plans = {'setup': plan('setup'), 'lab': plan('lab', ['setup']), 'other': plan('other')}
+    keys = {'setup': 's1', 'lab': 'l1', 'other': 'o1'}
+    executed = fake_runs(monkeypatch)
+    execute_notebooks('container', plans, keys=keys)
+    assert sorted(executed) == ['lab', 'other', 'setup']
+
+    executed.clear()
+    outcomes = execute_notebooks('container', plans, keys={**keys, 'lab': 'l2'})
+
+    assert sorted(executed) == ['lab', 'setup']
+    assert executed.index('setup') < executed.index('lab')
+    assert outcomes['other'].status == 'cached'
+
+
+def test_dependents_of_failed_or_skipped_notebooks_are_skipped(project, monkeypatch):
+    plans = {
+        'setup': plan('setup'), 'lab': plan('lab', ['setup']),
+        'nim': plan('nim', profiles=['nim']), 'chat': plan('chat', ['nim']),
+    }
+    executed = fake_runs(monkeypatch, failing={'setup'})
+    outcomes = execute_notebooks('container', plans)
+
+    assert executed == ['setup']
+    assert outcomes['lab'].status == 'skipped'
+    assert outcomes['nim'].message == "needs the nim profile"
+    assert outcomes['chat'].message == "nim did not pass"
+
+
+def test_dependency_cycles_fail(project, monkeypatch):
+    fake_runs(monkeypatch)
+    outcomes = execute_notebooks('container', {'a': plan('a', ['b']), 'b': plan('b', ['a'])})
+    assert {outcome.status for outcome in outcomes.values()} == {'failed'}
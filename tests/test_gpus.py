@@ -0,0 +1,117 @@
+"""Tests for the compile time GPU allocation of compose services."""
+
+import copy
+
+import pytest
+
+from devx.sync import (
+    ComposeSource,
+    allocate_gpus,
+    fitting_profiles,
+    profile_gpu_demand,
+    transform_launchable_compose,
+    transform_local_compose,
+    unfitting_services,
+)
+
+
+def gpu_service(count=None, device_ids=None, profiles=None):
+    """Build a compose service that reserves GPUs."""
+    device = {"driver": "nvidia", "capabilities": ["gpu"]}
+    if count is not None:
+        device["count"] = count
+    if device_ids is not None:
+        device["device_ids"] = device_ids
+    service = {"image": "app", "deploy": {"resources": {"reservations": {"devices": [device]}}}}
+    if profiles:
+        service["profiles"] = profiles
+    return service
+
+
+def test_services_of_a_profile_get_distinct_gpus():
+    services = {"a": gpu_service(count=1, profiles=["p"]), "b": gpu_service(count=2, profiles=["p"])}
+    allocation = allocate_gpus(services, 4)
+    assert allocation == {"b": ["0", "1"], "a": ["2"]}
+
+
+def test_services_of_different_profiles_may_share_gpus():
+    services = {"a": gpu_service(count=2, profiles=["small"]), "b": gpu_service(count=2, profiles=["large"])}
+    assert allocate_gpus(services, 2) == {"a": ["0", "1"], "b": ["0", "1"]}
+
+
+def test_services_without_profiles_are_exclusive_in_every_profile():
+    services = {
+        "always": gpu_service(count=1),
+        "a": gpu_service(count=1, profiles=["one"]),
+        "b": gpu_service(count=1, profiles=["two"]),
+    }
+    allocation = allocate_gpus(services, 2)
+    assert allocation["always"] == ["0"]
+    assert allocation["a"] == allocation["b"] == ["1"]
+
+
+def test_fixed_device_ids_are_kept_and_avoided():
+    services = {"fixed": gpu_service(device_ids=["1"]), "counted": gpu_service(count=1)}
+    assert allocate_gpus(services, 2) == {"fixed": ["1"], "counted": ["0"]}
+
+
+def test_overlapping_fixed_device_ids_are_rejected():
+    services = {"a": gpu_service(device_ids=["0"]), "b": gpu_service(device_ids=["0"])}
+    with pytest.raises(ValueError, match="both use GPU 0"):
+        allocate_gpus(services, 2)
+
+
+def test_fixed_device_ids_outside_the_target_are_rejected():
+    with pytest.raises(ValueError, match="uses GPU 2"):
+        allocate_gpus({"a": gpu_service(device_ids=["2"])}, 2)
+
+
+def test_oversubscription_is_rejected():
+    services = {"a": gpu_service(count=2), "b": gpu_service(count=1)}
+    with pytest.raises(ValueError, match="needs 1 GPU"):
+        allocate_gpus(services, 2)
+
+
+def test_only_the_given_profiles_are_packed():
+    services = {"small": gpu_service(count=1, profiles=["small"]), "large": gpu_service(count=4, profiles=["large"])}
+    assert profile_gpu_demand(services) == {"large": 4, "small": 1}
+    assert fitting_profiles(services, 2) == ["small"]
+    assert allocate_gpus(services, 2, ["small"]) == {"small": ["0"]}
+    assert unfitting_services(services, 2) == ["large"]
+
+
+def profiles_source():
+    """Build a compose source with a profile that fits on 2 GPUs and one that needs 4."""
+    services = {
+        "app": {"image": "app", "depends_on": ["large"], "profiles": ["small", "large"]},
+        "small": gpu_service(count=1, profiles=["small"]),
+        "large": gpu_service(count=4, profiles=["large"]),
+    }
+    return ComposeSource({"services": services, "volumes": {}, "networks": {}}, {})
+
+
+def test_profiles_that_do_not_fit_are_rejected():
+    with pytest.raises(ValueError, match="has 2 GPU\\(s\\), but profile large needs 4 GPUs"):
+        transform_launchable_compose(profiles_source(), 'ghcr.io/org/lab', 'crusoe-brev-wg', gpu_count=2)
+
+
+def test_services_of_profiles_that_do_not_fit_are_left_out_when_opted_in():
+    source = profiles_source()
+    original = copy.deepcopy(source.compose)
+
+    compose = transform_launchable_compose(
+        source, 'ghcr.io/org/lab', 'crusoe-brev-wg', gpu_count=2, unfitting_profiles='drop'
+    )
+
+    assert "large" not in compose["services"]
+    assert compose["services"]["app"]["depends_on"] == []
+    assert compose["services"]["small"]["deploy"]["resources"]["reservations"]["devices"][0]["device_ids"] == ["0"]
+    assert source.compose == original
+
+
+def test_local_services_of_profiles_that_do_not_fit_keep_their_gpu_count():
+    compose = transform_local_compose(profiles_source(), 8888, gpu_count=2)
+
+    assert compose["services"]["app"]["depends_on"] == ["large"]
+    assert compose["services"]["large"]["deploy"]["resources"]["reservations"]["devices"][0]["count"] == 4
+    assert compose["services"]["small"]["deploy"]["resources"]["reservations"]["devices"][0]["device_ids"] == ["0"]
@@ -0,0 +1,104 @@
+"""Tests for the template cache of `devx init`."""
+
+import io
+import urllib.error
+import zipfile
+
+import pytest
+
+from devx import init
+from devx.init import TEMPLATE_REPO, find_template_dir
+
+
+class FakeServer:
+    """Serve the template archive with an ETag, answering matching revalidations with 304.
+
+    Attributes:
+        readme: The README of the simple template in the served archive.
+        etag: The ETag of the served archive.
+        requests: The If-None-Match header of every request.
+        offline: Whether requests fail as if the network was down.
+    """
+
+    def __init__(self):
+        self.readme = "# Simple\n"
+        self.etag = '"v1"'
+        self.requests: list = []
+        self.offline = False
+
+    def _archive(self) -> bytes:
+        """Zip the template repository."""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            archive.writestr('workshop-framework-main/templates/simple/README.md', self.readme)
+            archive.writestr('workshop-framework-main/templates/simple/.devx/compose.yaml', 'services: {}\n')
+        return buffer.getvalue()
+
+    def urlopen(self, request, timeout):
+        """Answer a request for the template archive."""
+        if self.offline:
+            raise urllib.error.URLError("network is unreachable")
+        self.requests.append(request.get_header('If-none-match'))
+        if request.get_header('If-none-match') == self.etag:
+            raise urllib.error.HTTPError(request.full_url, 304, "Not Modified", {}, None)
+        response = io.BytesIO(self._archive())
+        response.headers = {"ETag": self.etag}
+        return response
+
+
+@pytest.fixture
+def server(project, monkeypatch):
+    """Cache templates in the project directory, downloading them from a fake server."""
+    cache_dir = project / 'cache'
+    monkeypatch.setattr(init, 'TEMPLATE_CACHE_DIR', cache_dir)
+    monkeypatch.setattr(init, 'TEMPLATE_CACHE_INDEX', cache_dir / 'index.json')
+    fake = FakeServer()
+    monkeypatch.setattr(init.urllib.request, 'urlopen', fake.urlopen)
+    return fake
+
+
+def test_cached_templates_are_revalidated(server, capsys):
+    template = find_template_dir('simple', offline=False)
+    assert (template / 'README.md').read_text(encoding='utf-8') == "# Simple\n"
+    assert (template / '.devx' / 'compose.yaml').exists()
+
+    capsys.readouterr()
+    assert find_template_dir('simple', offline=False) == template
+    assert server.requests == [None, '"v1"']
+    output = capsys.readouterr().out
+    assert "Cached template is up to date" in output
+    assert "Extracting" not in output
+
+
+def test_a_changed_archive_is_extracted_again(server):
+    template = find_template_dir('simple', offline=False)
+    server.readme, server.etag = "# Simple v2\n", '"v2"'
+    updated = find_template_dir('simple', offline=False)
+    assert updated != template
+    assert (updated / 'README.md').read_text(encoding='utf-8') == "# Simple v2\n"
+    assert len(init._load_cache_index()[TEMPLATE_REPO[0]]["templates"]) == 1
+
+
+def test_offline_uses_only_the_cache(server, capsys):
+    with pytest.raises(SystemExit):
+        find_template_dir('simple', offline=True)
+    assert "Template not cached: simple" in capsys.readouterr().out
+    assert not server.requests
+
+    template = find_template_dir('simple', offline=False)
+    server.offline = True
+    assert find_template_dir('simple', offline=True) == template
+    assert server.requests == [None]
+
+
+def test_the_cache_is_used_when_the_download_fails(server, capsys):
+    server.offline = True
+    with pytest.raises(SystemExit):
+        find_template_dir('simple', offline=False)
+    assert "Failed to download template" in capsys.readouterr().out
+
+    server.offline = False
+    template = find_template_dir('simple', offline=False)
+    server.offline = True
+    assert find_template_dir('simple', offline=False) == template
+    assert "using the cached copy" in capsys.readouterr().out
@@ -0,0 +1,102 @@
+"""Tests for running fleet actions on the lab workspaces."""
+
+import threading
+import time
+
+import pytest
+
+from devx import labs
+from devx.brev import BrevAPIError, BrevClient
+
+
+class FakeClient(BrevClient):
+    """A Brev client whose workspaces change state as soon as an action is requested.
+
+    Attributes:
+        workspaces: The workspaces of the organization by ID.
+        failures: Exceptions to raise when an action is requested, by workspace ID.
+        busy: The largest number of requests handled at once.
+    """
+
+    def __init__(self, workspaces: list[dict], failures: dict[str, Exception] | None = None):
+        super().__init__('token', 'org-1', base_url='http://brev.invalid')
+        self.workspaces = {workspace['id']: workspace for workspace in workspaces}
+        self.failures = failures or {}
+        self.busy = 0
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def request(self, method, path, **kwargs):
+        """Answer a request in place of the Brev API, tracking how many run at once."""
+        with self._lock:
+            self._active += 1
+            self.busy = max(self.busy, self._active)
+        try:
+            time.sleep(0.01)
+            return self._handle(method, path)
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def _handle(self, method, path):
+        """Answer a workspace request."""
+        if path == f"organizations/{self.org_id}/workspaces":
+            return {"items": list(self.workspaces.values())}
+        _, workspace_id, *action = path.split('/')
+        if workspace_id not in self.workspaces:
+            raise BrevAPIError("not found", status=404, method=method, path=path)
+        if method == 'GET':
+            return self.workspaces[workspace_id]
+        if workspace_id in self.failures:
+            raise self.failures[workspace_id]
+        if method == 'DELETE':
+            del self.workspaces[workspace_id]
+        else:
+            self.workspaces[workspace_id]['status'] = {'start': 'RUNNING', 'stop': 'STOPPED'}[action[0]]
+        return {}
+
+
+def workspace(workspace_id, status='STOPPED'):
+    """Build a Brev workspace deployed from the `lab` launchable."""
+    return {"id": workspace_id, "name": f"lab-{workspace_id}", "status": status, "launchableId": "lab"}
+
+
+@pytest.fixture(autouse=True)
+def no_waiting(tmp_path, monkeypatch):
+    """Poll without sleeping and keep the inventory cache in the test directory."""
+    monkeypatch.setattr(labs, 'POLL_INTERVAL', 0)
+    monkeypatch.setattr(labs, 'LABS_CACHE_DIR', tmp_path)
+
+
+def test_a_failing_workspace_becomes_its_row_error():
+    client = FakeClient(
+        [workspace('a'), workspace('b'), workspace('c')],
+        failures={'b': BrevAPIError("quota exceeded", status=409), 'c': KeyError('status')},
+    )
+    summaries = [labs.summarize(item) for item in client.workspaces.values()]
+    results = labs.run(client, summaries, 'start', jobs=2)
+
+    assert [(result['id'], result['status']) for result in results] == [
+        ('a', 'RUNNING'), ('b', 'STOPPED'), ('c', 'STOPPED')
+    ]
+    assert results[0]['error'] is None
+    assert 'quota exceeded' in results[1]['error']
+    assert results[2]['error'] == "'status'"
+
+
+def test_actions_run_concurrently_up_to_the_job_limit():
+    client = FakeClient([workspace(str(index)) for index in range(8)])
+    summaries = [labs.summarize(item) for item in client.workspaces.values()]
+    results = labs.run(client, summaries, 'start', jobs=3)
+
+    assert all(result['status'] == 'RUNNING' and result['error'] is None for result in results)
+    assert 1 < client.busy <= 3
+
+
+def test_deleted_workspaces_leave_the_cached_inventory():
+    client = FakeClient([workspace('a', 'RUNNING'), workspace('b', 'RUNNING')])
+    summaries = labs.load_inventory(client, ['lab'])
+    results = labs.run(client, summaries[:1], 'delete')
+
+    assert [(result['id'], result['status']) for result in results] == [('a', labs.DELETED)]
+    assert [item['id'] for item in labs.load_inventory(client, ['lab'])] == ['b']
@@ -0,0 +1,98 @@
+"""Tests for the publish checks of workshop notebooks."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from devx.notebooks import CheckOptions, _schema_problems, check_notebook, check_notebooks
+
+OPTIONS = CheckOptions(['python3'], 100_000, {})
+EXECUTION_COUNT = "cell 1 has an execution count, clear it before committing"
+
+
+def notebook(*cells, kernel='python3'):
+    """Build an nbformat 4 notebook."""
+    metadata = {"kernelspec": {"name": kernel, "display_name": "Python 3"}} if kernel else {}
+    return {"nbformat": 4, "nbformat_minor": 5, "metadata": metadata, "cells": list(cells)}
+
+
+def code(source='print(1)', outputs=(), execution_count=None):
+    """Build a code cell."""
+    return {
+        "cell_type": "code", "source": source, "metadata": {},
+        "outputs": list(outputs), "execution_count": execution_count,
+    }
+
+
+def markdown(source='# Lab'):
+    """Build a markdown cell."""
+    return {"cell_type": "markdown", "source": source, "metadata": {}}
+
+
+def write(path, content):
+    """Write a notebook file."""
+    path.write_text(json.dumps(content), encoding='utf-8')
+    return path
+
+
+def test_valid_notebooks_have_no_schema_problems():
+    assert _schema_problems(notebook(markdown(), code(['import os\n', 'print(os.getcwd())']))) == []
+
+
+@pytest.mark.parametrize('content, problems', [
+    ([], ["not a notebook: the top level is not a JSON object"]),
+    ({**notebook(), "nbformat": 3}, ["nbformat is 3, expected 4"]),
+    ({"nbformat": 4}, ["nbformat_minor is missing", "metadata is missing", "cells are missing"]),
+    (notebook({"source": ""}), ["cell 1 has no valid cell_type"]),
+    (notebook({**markdown(), "source": ["a", 1]}), ["cell 1 has no valid source"]),
+    (notebook({**markdown(), "metadata": None}), ["cell 1 has no metadata"]),
+    (notebook({**code(), "outputs": None}), ["cell 1 is a code cell without outputs"]),
+    (notebook(markdown(), {**markdown(), "outputs": []}), ["cell 2 is a markdown cell with outputs"]),
+])
+def test_schema_problems(content, problems):
+    assert _schema_problems(content) == problems
+
+
+def test_check_notebook_reports_outputs_kernel_secrets_and_size(tmp_path):
+    path = write(tmp_path / 'lab.ipynb', notebook(
+        code(outputs=[{"output_type": "stream", "text": "1"}]),
+        code(execution_count=3),
+        code('key = "secret-value-123"\nghp_' + 'a' * 36),
+        kernel='julia',
+    ))
+    options = CheckOptions(['python3'], 200, {'secret-value-123': 'NGC_API_KEY'})
+    failures = check_notebook(path, options).failures
+
+    assert failures[0].startswith("is 1 KB, larger than the 0 KB limit")
+    assert failures[1:] == [
+        "cell 1 has outputs, clear them before committing",
+        "cell 2 has an execution count, clear it before committing",
+        "kernel julia is not one of python3",
+        "contains the value of NGC_API_KEY",
+        "contains what looks like a GitHub token",
+    ]
+
+
+def test_invalid_json_is_a_problem(tmp_path):
+    path = tmp_path / 'broken.ipynb'
+    path.write_text('{"cells": [', encoding='utf-8')
+    assert check_notebook(path, OPTIONS).failures[0].startswith("is not valid JSON")
+
+
+def test_only_changed_notebooks_are_checked_again(project):
+    good = write(Path('good.ipynb'), notebook(code()))
+    bad = write(Path('bad.ipynb'), notebook(code(execution_count=1)))
+
+    results, checked = check_notebooks([good, bad], OPTIONS, jobs=1)
+    assert checked == 2
+    assert [result.failures for result in results] == [[], [EXECUTION_COUNT]]
+
+    results, checked = check_notebooks([good, bad], OPTIONS, jobs=1)
+    assert checked == 0
+    assert results[1].failures == [EXECUTION_COUNT]
+
+    write(bad, notebook(code()))
+    results, checked = check_notebooks([good, bad], OPTIONS, jobs=1)
+    assert checked == 1
+    assert results[1].failures == []
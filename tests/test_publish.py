@@ -0,0 +1,134 @@
+"""Tests for publishing the workshop launchables to Brev."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from devx import publish, workspaces
+from devx.brev import BrevAPIError
+from devx.models import BrevWorkspace, Project
+from devx.publish import PublishResult, _plan, launchable_payload, load_publish_state, payload_hash, publish_launchable
+from devx.workspaces import _KNOWN_WORKSPACES, WorkspaceCollection
+
+PYPROJECT = """\
+[project]
+name = "lab"
+description = "Lab"
+repo_url = "https://github.com/org/lab"
+image_url = "ghcr.io/org/lab"
+
+[tool.brev]
+instance_type = "l40s-48gb.1x"
+cloud = "crusoe"
+relative_to_root = "."
+ports = [ { name = "jupyter", port = 8888 } ]
+
+[[tool.brev.targets]]
+name = "one"
+
+[[tool.brev.targets]]
+name = "two"
+instance_type = "l40s-48gb.2x"
+"""
+
+
+class FakeBrev:
+    """A Brev API client that records the requests it gets.
+
+    Attributes:
+        launchables: The launchables of the organization.
+        update_status: The HTTP status updates are rejected with, or None to accept them.
+        requests: The (method, launchable ID or name) of every request.
+    """
+
+    def __init__(self):
+        self.launchables: list[dict] = []
+        self.update_status = None
+        self.requests: list[tuple[str, str]] = []
+
+    def list_launchables(self) -> list[dict]:
+        """List the launchables of the organization."""
+        self.requests.append(("list", ""))
+        return self.launchables
+
+    def update_launchable(self, launchable_id: str, payload: dict) -> dict:
+        """Update a launchable, unless updates are rejected."""
+        self.requests.append(("update", launchable_id))
+        if self.update_status:
+            raise BrevAPIError("update rejected", status=self.update_status)
+        return {}
+
+    def create_launchable(self, payload: dict) -> dict:
+        """Create a launchable with the next ID."""
+        self.requests.append(("create", payload["name"]))
+        return {"id": f"new-{sum(method == 'create' for method, _ in self.requests)}"}
+
+    def close(self) -> None:
+        """Release nothing."""
+
+
+@pytest.fixture
+def brev(project, monkeypatch):
+    """Publish a project with two targets to a fake Brev organization."""
+    (project / 'pyproject.toml').write_text(PYPROJECT, encoding='utf-8')
+    monkeypatch.setattr(workspaces, 'WORKSPACES', WorkspaceCollection(_KNOWN_WORKSPACES, [], project / 'ws.json'))
+    client = FakeBrev()
+    monkeypatch.setattr(publish, 'load_credentials', lambda: SimpleNamespace(org_id='org-1', org_name='Org'))
+    monkeypatch.setattr(publish, 'BrevClient', SimpleNamespace(from_credentials=lambda **kwargs: client))
+    return client
+
+
+def test_rejected_updates_create_a_new_launchable(brev):
+    workspace, project = BrevWorkspace(), Project()
+    brev.update_status = 404
+    result = publish_launchable(workspace, project, client=brev, launchable_id="old-1")
+    assert result == PublishResult("created", {"id": "new-1"})
+    assert brev.requests == [("update", "old-1"), ("create", "Lab")]
+
+    brev.update_status = None
+    assert publish_launchable(workspace, project, client=brev, launchable_id="old-1").action == "updated"
+
+
+def test_an_update_that_fell_back_is_reported_as_created(brev, capsys):
+    workspace, project = BrevWorkspace(), Project()
+    publish._write_publish_state({"org-1": {"one": {"id": "old-1", "hash": "stale"}, "two": {"id": "old-2"}}})
+    brev.update_status = 404
+
+    publish.publish(workspace, project, yes=True, dry_run=False, targets=["one"])
+
+    assert "one: launchable created with ID new-1" in capsys.readouterr().out
+    assert load_publish_state()["org-1"]["one"]["id"] == "new-1"
+
+
+def test_plan_skips_unchanged_targets_and_adopts_existing_launchables(brev):
+    workspace, project = BrevWorkspace(), Project()
+    targets = workspace.target_workspaces()
+    one = launchable_payload(targets["one"], project, "one")
+    brev.launchables = [{**launchable_payload(targets["two"], project, "two"), "id": "remote-2"}]
+    published = {"one": {"id": "old-1", "hash": payload_hash(one)}}
+
+    plans = _plan(targets, project, published, brev, force=False)
+    assert [(plan.target, plan.previous["id"], plan.skip) for plan in plans] == [
+        ("one", "old-1", True), ("two", "remote-2", False),
+    ]
+    assert brev.requests == [("list", "")]
+
+    assert not any(plan.skip for plan in _plan(targets, project, published, brev, force=True))
+    brev.requests.clear()
+    assert _plan(targets, project, published, brev, force=False, dry_run=True)[1].previous is None
+    assert not brev.requests
+
+
+def test_publish_only_sends_changed_targets(brev, capsys):
+    workspace, project = BrevWorkspace(), Project()
+    publish.publish(workspace, project, yes=True, dry_run=False)
+    assert sorted(brev.requests) == [("create", "Lab (one)"), ("create", "Lab (two)"), ("list", "")]
+
+    brev.requests.clear()
+    capsys.readouterr()
+    publish.publish(workspace, project, yes=True, dry_run=False)
+    assert not brev.requests
+    assert "All launchables are up to date" in capsys.readouterr().out
+
+    publish.publish(workspace, project, yes=True, dry_run=False, force=True, targets=["two"])
+    assert brev.requests == [("update", load_publish_state()["org-1"]["two"]["id"])]
@@ -0,0 +1,107 @@
+"""Tests for pre-pulling the workshop images."""
+
+import subprocess
+
+import pytest
+
+from devx import pull
+from devx.docker import DockerError
+
+DIGEST = "sha256:" + "1" * 64
+IMAGES = {
+    "postgres:16": {"RepoDigests": [f"postgres@{DIGEST}"]},
+    "redis:7": {"RepoDigests": ["redis@sha256:" + "0" * 64]},
+    f"nvcr.io/nim/llama@{DIGEST}": {"RepoDigests": []},
+}
+
+
+class FakeEngine:
+    """A Docker Engine with local images whose registry digest is always DIGEST.
+
+    Attributes:
+        registry_reachable: Whether the registry digest can be queried.
+        pull_status: The HTTP status pulls are rejected with, or None to accept them.
+        queried: The images whose registry digest was queried.
+        pulled: The images pulled.
+    """
+
+    def __init__(self):
+        self.registry_reachable = True
+        self.pull_status = None
+        self.queried: list[str] = []
+        self.pulled: list[str] = []
+
+    def inspect_image(self, image: str):
+        """Inspect a local image."""
+        return IMAGES.get(image)
+
+    def distribution_digest(self, image: str):
+        """Get the registry digest of an image."""
+        self.queried.append(image)
+        return DIGEST if self.registry_reachable else None
+
+    def pull(self, image: str, on_progress) -> None:
+        """Pull an image, unless pulls are rejected."""
+        if self.pull_status:
+            raise DockerError("pull rejected", status=self.pull_status)
+        self.pulled.append(image)
+        on_progress({"status": "Pull complete"})
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    """Pull the given images through a fake engine, running the docker CLI as a fallback."""
+    fake = FakeEngine()
+    monkeypatch.setattr(pull, 'engine', lambda: fake)
+    monkeypatch.setattr(pull.subprocess, 'run', lambda cmd, **kwargs: fake.pulled.append(f"cli {cmd[-1]}"))
+    return fake
+
+
+def pull_images(monkeypatch, *images):
+    """Pull the given images as the images of the workshop."""
+    monkeypatch.setattr(pull, 'compose_images', lambda profiles: list(images))
+    pull.pull()
+
+
+@pytest.mark.parametrize('image, current', [
+    ("postgres:16", True),
+    ("redis:7", False),
+    ("mysql:8", False),
+])
+def test_images_matching_their_registry_digest_are_current(engine, image, current):
+    assert pull._is_current(engine, image) is current
+    # images that are not present locally are pulled without asking the registry
+    assert engine.queried == ([] if image == "mysql:8" else [image])
+
+
+def test_only_outdated_images_are_pulled(engine, monkeypatch, capsys):
+    pull_images(monkeypatch, "postgres:16", "redis:7", "mysql:8", f"nvcr.io/nim/llama@{DIGEST}")
+    assert sorted(engine.pulled) == ["mysql:8", "redis:7"]
+    assert f"nvcr.io/nim/llama@{DIGEST}" not in engine.queried
+    assert "📦 2 pulled, 2 up to date, 0 failed" in capsys.readouterr().out
+
+
+def test_images_are_pulled_when_the_registry_cannot_be_queried(engine, monkeypatch):
+    engine.registry_reachable = False
+    pull_images(monkeypatch, "postgres:16")
+    assert engine.pulled == ["postgres:16"]
+
+
+def test_rejected_pulls_fall_back_to_the_docker_cli(engine, monkeypatch):
+    engine.pull_status = 401
+    pull_images(monkeypatch, "redis:7")
+    assert engine.pulled == ["cli redis:7"]
+
+    engine.pull_status = 500
+    with pytest.raises(DockerError, match="1 image"):
+        pull_images(monkeypatch, "redis:7")
+    assert engine.pulled == ["cli redis:7"]
+
+
+def test_failed_cli_pulls_are_reported(monkeypatch):
+    def fail(cmd, **kwargs):
+        raise subprocess.CalledProcessError(1, cmd, stderr="denied")
+
+    monkeypatch.setattr(pull.subprocess, 'run', fail)
+    with pytest.raises(DockerError, match="Pulling redis:7 failed: denied"):
+        pull._pull_one(None, "redis:7", pull._PullProgress(1))
@@ -0,0 +1,101 @@
+"""Tests for waiting until the workshop services are ready."""
+
+import io
+from types import SimpleNamespace
+
+import pytest
+import yaml
+
+from devx import readiness
+from devx.docker import DockerError
+from devx.readiness import _restart_policies, _summary_state, wait_until_ready
+
+COMPOSE = {
+    "services": {
+        "devx": {"image": "devx", "restart": "always"},
+        "nim": {"image": "nim"},
+        "db": {"image": "db", "deploy": {"restart_policy": {"condition": "any"}}},
+        "job": {"image": "job", "deploy": {"restart_policy": {"condition": "none"}}},
+    }
+}
+
+
+def container(service, state="running", health=None, status="Up 1 second"):
+    """Build a docker CLI container summary."""
+    return {
+        "service": service, "name": f"lab-{service}-1", "id": service,
+        "state": state, "status": status, "health": health,
+    }
+
+
+@pytest.fixture
+def compose_file(project, monkeypatch):
+    """Wait with the docker CLI on a compiled compose file, with a clock that advances on every poll."""
+    path = project / 'compose.local.yaml'
+    path.write_text(yaml.safe_dump(COMPOSE), encoding='utf-8')
+    clock = SimpleNamespace(now=0.0)
+    monkeypatch.setattr(readiness, 'time', SimpleNamespace(
+        monotonic=lambda: clock.now, sleep=lambda seconds: setattr(clock, 'now', clock.now + seconds),
+    ))
+    monkeypatch.setattr(readiness, 'engine', lambda: None)
+    monkeypatch.setattr(readiness, '_answers_http', lambda url: True)
+    return path
+
+
+def poll(monkeypatch, *snapshots):
+    """Have the docker CLI list the given containers on every poll, repeating the last snapshot."""
+    # the first listing finds the containers to wait for, before they are polled
+    snapshots = [snapshots[0], *snapshots]
+    monkeypatch.setattr(
+        readiness, 'compose_containers_cli',
+        lambda compose_file: snapshots.pop(0) if len(snapshots) > 1 else snapshots[0],
+    )
+
+
+@pytest.mark.parametrize('summary, policy, expected', [
+    (container("nim", health="healthy"), None, ("healthy", True, False)),
+    (container("nim", health="starting"), None, ("starting", False, False)),
+    (container("job", "exited", status="Exited (0) 1 second ago"), None, ("completed", True, False)),
+    (container("nim", "exited", status="Exited (1) 1 second ago"), None, ("exited (1)", False, True)),
+    (container("nim", "exited", status="Exited (1) 1 second ago"), "no", ("exited (1)", False, True)),
+    (container("nim", "exited", status="Exited (137) 1 second ago"), "always", ("exited (137)", False, False)),
+    (container("nim", "exited", status="Exited (1) 1 second ago"), "on-failure:3", ("exited (1)", False, False)),
+])
+def test_summary_state_applies_the_restart_policy(summary, policy, expected):
+    assert _summary_state(summary, policy) == expected
+
+
+def test_restart_policies_are_read_from_the_compose_file(compose_file):
+    assert _restart_policies(compose_file) == {"devx": "always", "nim": None, "db": "always", "job": "no"}
+
+
+def test_browser_opens_once_devx_answers_while_other_services_load(compose_file, monkeypatch):
+    poll(
+        monkeypatch,
+        [container("devx", health="starting"), container("nim", health="starting")],
+        [container("devx"), container("nim", health="starting")],
+        [container("devx"), container("nim", health="starting")],
+        [container("devx"), container("nim", health="healthy")],
+    )
+    opened = []
+    states = wait_until_ready(
+        compose_file, "http://localhost:8888", 60, io.StringIO(),
+        on_devx_ready=lambda: opened.append(readiness.time.monotonic()),
+    )
+    assert opened == [readiness.POLL_INTERVAL]
+    assert states["nim"].ready_after == 3 * readiness.POLL_INTERVAL
+
+
+def test_a_service_that_exits_without_restart_policy_fails_the_wait(compose_file, monkeypatch):
+    poll(monkeypatch, [container("devx"), container("nim", "exited", status="Exited (1) 1 second ago")])
+    with pytest.raises(DockerError, match="nim failed"):
+        wait_until_ready(compose_file, "http://localhost:8888", 60, io.StringIO())
+
+
+def test_a_service_that_restarts_is_waited_for(compose_file, monkeypatch):
+    poll(
+        monkeypatch,
+        [container("devx"), container("db", "exited", status="Exited (1) 1 second ago")],
+        [container("devx"), container("db")],
+    )
+    assert wait_until_ready(compose_file, "http://localhost:8888", 60, io.StringIO())["db"].ready
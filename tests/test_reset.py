@@ -0,0 +1,78 @@
+"""Tests for resetting the workshop volumes to their snapshot."""
+
+import pytest
+import yaml
+
+from devx import reset
+from devx.docker import DockerError
+from devx.reset import SNAPSHOTS_DIR, _archive_signature, _prepare_pristine_volume, volume_name
+from devx.tenants import Tenant
+
+COMPOSE = {
+    "services": {"devx": {"image": "devx"}},
+    "volumes": {"devx_home": None, "models": {"name": "lab_models"}},
+}
+
+
+@pytest.fixture
+def docker(project, monkeypatch):
+    """Record the docker commands and helper scripts run, with every volume existing and unlabeled."""
+    calls = []
+    labels = {}
+
+    def run(*args):
+        calls.append(args)
+        return labels.get(args[-1], '') + '\n' if args[:3] == ('volume', 'inspect', '--format') else ''
+
+    monkeypatch.setattr(reset, '_docker', run)
+    monkeypatch.setattr(reset, '_helper', lambda script, *mounts: calls.append(('helper', script)))
+    monkeypatch.setattr(reset, '_volume_exists', lambda name: True)
+    monkeypatch.setattr(reset, 'compose_project_name', lambda compose_file: 'lab')
+    return calls, labels
+
+
+def compose_file(path):
+    """Write the compose file with a per-project and a shared volume."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(yaml.safe_dump(COMPOSE), encoding='utf-8')
+    return path
+
+
+def test_volume_name(project):
+    path = compose_file(project / 'compose.yaml')
+    assert volume_name('devx_home', 'lab-alice', path) == 'lab-alice_devx_home'
+    assert volume_name('models', 'lab-alice', path) == 'lab_models'
+    with pytest.raises(DockerError, match="Unknown volume 'data'. Defined volumes: devx_home, models"):
+        volume_name('data', 'lab', path)
+
+
+def test_pristine_volume_is_reused_while_the_archive_is_unchanged(docker):
+    calls, labels = docker
+    with pytest.raises(DockerError, match="No snapshot of devx_home found"):
+        _prepare_pristine_volume('devx_home', 'lab')
+
+    SNAPSHOTS_DIR.mkdir()
+    archive = SNAPSHOTS_DIR / 'devx_home.tar.gz'
+    archive.write_bytes(b'archive')
+    labels['lab-snapshot_devx_home'] = _archive_signature(archive)
+    assert _prepare_pristine_volume('devx_home', 'lab') == 'lab-snapshot_devx_home'
+    assert not any(call[0] == 'helper' for call in calls)
+
+    archive.write_bytes(b'another archive')
+    assert _prepare_pristine_volume('devx_home', 'lab') == 'lab-snapshot_devx_home'
+    assert ('volume', 'create', '--label', f"devx.snapshot={_archive_signature(archive)}",
+            'lab-snapshot_devx_home') in calls
+    assert ('helper', "tar -xzf /snapshots/devx_home.tar.gz -C /pristine") in calls
+
+
+def test_shared_volumes_are_not_reset_per_tenant(docker, monkeypatch, capsys):
+    calls, _ = docker
+    workspace = reset.DEVX_DIR / 'tenants' / 'alice'
+    tenant = Tenant('alice', 'lab-alice', compose_file(workspace / 'compose.local.yaml'), workspace, {})
+    monkeypatch.setattr(reset, '_prepare_pristine_volume', lambda volume, base_project: f"pristine_{volume}")
+    monkeypatch.setattr(reset, 'run_compose', lambda tenant, *args: pytest.fail("tenant stopped"))
+
+    with pytest.raises(DockerError, match="1 tenant"):
+        reset.reset(['devx_home', 'models'], [tenant])
+    assert "❌ alice: models is shared by every tenant" in capsys.readouterr().out
+    assert not calls
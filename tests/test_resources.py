@@ -0,0 +1,64 @@
+"""Tests for the compile time planning of service memory, CPUs and shared memory."""
+
+import pytest
+
+from devx.resources import GIB, MIB, ResourceBudget, parse_size, plan_resources
+from devx.sync import _plan_local_resources
+
+BUDGET = ResourceBudget(memory=20 * GIB, cpus=8.0)
+
+
+def hinted(memory="4g", cpus=2, profiles=None, **extra):
+    """Build a compose service that declares its resource needs."""
+    service = {"image": "app", "x-devx-resources": {"memory": memory, "cpus": cpus, **extra}}
+    if profiles:
+        service["profiles"] = profiles
+    return service
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("512m", 512 * MIB), ("16gb", 16 * GIB), ("1.5g", int(1.5 * GIB)), ("1024", 1024), (2048, 2048),
+])
+def test_parse_size(value, expected):
+    assert parse_size(value) == expected
+
+
+def test_parse_size_rejects_garbage():
+    with pytest.raises(ValueError, match="Invalid size"):
+        parse_size("lots")
+
+
+def test_no_plan_without_declared_resources():
+    assert not plan_resources({"app": {"image": "app"}}, BUDGET)
+
+
+def test_left_over_resources_are_shared_as_limits():
+    plans = plan_resources({"a": hinted(), "b": hinted()}, BUDGET)
+
+    # 18 GB remain after the 2 GB kept for the host, the devx service reserves 2 GB and 1 CPU
+    assert plans["devx"].memory_limit is None
+    assert plans["a"].memory_reservation == 4 * GIB
+    assert plans["a"].memory_limit == plans["b"].memory_limit == 4 * GIB + 4 * GIB
+    assert plans["a"].cpus == 2 + 1.5
+
+
+def test_services_of_other_profiles_are_not_planned():
+    services = {"small": hinted(profiles=["small"]), "large": hinted(memory="64g", profiles=["large"])}
+    plans = plan_resources(services, BUDGET, ["small"])
+    assert set(plans) == {"devx", "small"}
+
+
+def test_shared_memory_stays_below_half_of_the_limit():
+    plans = plan_resources({"a": hinted(memory="10g", cpus=1, shm_size="32g")}, BUDGET)
+    assert plans["a"].shm_size == plans["a"].memory_limit // 2
+
+
+def test_reservations_that_do_not_fit_are_rejected():
+    with pytest.raises(ValueError, match="reserve 9 CPUs"):
+        plan_resources({"a": hinted(cpus=8)}, BUDGET)
+
+
+def test_local_plan_warns_instead_of_failing_on_small_machines():
+    plans, warning = _plan_local_resources({"a": hinted(cpus=1)}, ResourceBudget(memory=5 * GIB, cpus=1.0))
+    assert plans == {}
+    assert "run without resource limits" in warning
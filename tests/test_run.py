@@ -0,0 +1,89 @@
+"""Tests for building and running the local workshop."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from devx import run
+
+
+@pytest.fixture
+def workshop(project, monkeypatch):
+    """Run in a synced project whose image is up to date, recording the commands run."""
+    (project / '.devx' / 'compose.local.yaml').write_text('services: {}\n', encoding='utf-8')
+    (project / 'pyproject.toml').write_text('[project]\nname = "lab"\ndependencies = ["numpy"]\n', encoding='utf-8')
+    commands: list[list[str]] = []
+    monkeypatch.setattr(run, '_run', lambda cmd: commands.append([str(arg) for arg in cmd]))
+    monkeypatch.setattr(run, '_rebuild_reasons', lambda rebuild: ["rebuild requested"] if rebuild else [])
+    monkeypatch.setattr(run, '_record_build', lambda: None)
+    return commands
+
+
+def builds(commands):
+    """Get the `docker compose build` commands that were run."""
+    return [cmd for cmd in commands if cmd[-1] == 'build']
+
+
+def test_up_to_date_image_is_not_built(workshop):
+    run.build()
+    assert not workshop
+
+
+def test_rebuild_builds_an_up_to_date_image(workshop):
+    run.build(rebuild=True)
+    assert builds(workshop) == [['docker', 'compose', '-f', '.devx/compose.local.yaml', 'build']]
+
+
+@pytest.mark.parametrize('option', ['cache_from', 'cache_to'])
+def test_cache_settings_build_an_up_to_date_image(workshop, monkeypatch, option):
+    overrides = []
+    monkeypatch.setattr(run, '_run', lambda cmd: overrides.append(json.loads(Path(cmd[-2]).read_text())))
+    run.build(**{option: ['type=registry,ref=ghcr.io/org/lab:cache']})
+    assert overrides == [{"services": {"devx": {"build": {option: ['type=registry,ref=ghcr.io/org/lab:cache']}}}}]
+
+
+def test_wheelhouse_is_collected_for_an_up_to_date_image(workshop):
+    run.build(wheelhouse=True)
+    assert not builds(workshop)
+    assert workshop[0][-4:] == ['wheel', '--wheel-dir', '/project/.devx/wheelhouse', 'numpy']
+    assert Path('.devx/wheelhouse').is_dir()
+
+
+def test_wheelhouse_setting_is_collected_after_a_build(workshop, project):
+    with open(project / 'pyproject.toml', 'a', encoding='utf-8') as f:
+        f.write('[tool.devx.build]\nwheelhouse = true\n')
+    run.build(rebuild=True)
+    assert len(builds(workshop)) == 1
+    assert workshop[1][-1] == 'numpy'
+
+
+@pytest.fixture
+def running(workshop, monkeypatch):
+    """Run devx, an outdated db and a container of a service that was removed."""
+    monkeypatch.setattr(run, 'compose_config_hashes', lambda compose_file, profiles: {
+        'devx': 'a', 'db': 'b2', 'nim': 'c',
+    })
+    monkeypatch.setattr(run, 'containers', lambda: [
+        {'service': 'devx', 'config_hash': 'a'},
+        {'service': 'db', 'config_hash': 'b1'},
+        {'service': 'old', 'config_hash': 'd'},
+    ])
+    return workshop
+
+
+def test_drifted_services_are_running_services_with_another_hash(running):
+    assert run.drifted_services() == ['db']
+
+
+def test_restart_changed_only_recreates_drifted_services(running, monkeypatch, capsys):
+    run.restart(changed=True, profiles=['nim'])
+    assert running == [[
+        'docker', 'compose', '-f', '.devx/compose.local.yaml', '--profile', 'nim', 'up', '-d', '--no-deps', 'db',
+    ]]
+
+    running.clear()
+    monkeypatch.setattr(run, 'compose_config_hashes', lambda compose_file, profiles: {'devx': 'a', 'db': 'b1'})
+    run.restart(changed=True)
+    assert not running
+    assert "Every running service matches the compose file" in capsys.readouterr().out
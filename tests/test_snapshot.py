@@ -0,0 +1,83 @@
+"""Tests for caching the resolved workshop configuration."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from devx import snapshot, workspaces
+from devx.snapshot import SNAPSHOT_FILE, _snapshot_key, load_config
+from devx.workspaces import _KNOWN_WORKSPACES, WorkspaceCollection
+
+PYPROJECT = """\
+[project]
+name = "lab"
+description = "Lab"
+repo_url = "https://github.com/org/lab"
+image_url = "ghcr.io/org/lab"
+
+[tool.brev]
+instance_type = "l40s-48gb.1x"
+cloud = "crusoe"
+relative_to_root = "."
+ports = [ { name = "jupyter", port = 8888 } ]
+"""
+
+
+@pytest.fixture
+def inputs(project, monkeypatch):
+    """Make the registry fingerprint, git remote and devx version of the snapshot key editable."""
+    (project / 'pyproject.toml').write_text(PYPROJECT, encoding='utf-8')
+    monkeypatch.setattr(workspaces, 'WORKSPACES', WorkspaceCollection(_KNOWN_WORKSPACES, [], project / 'ws.json'))
+    values = SimpleNamespace(registry="registry-1", remote="https://github.com/org/lab", version="1.0")
+    monkeypatch.setattr(snapshot, 'WORKSPACES', SimpleNamespace(fingerprint=lambda: values.registry))
+    monkeypatch.setattr(snapshot, 'repository_metadata', lambda: SimpleNamespace(
+        remote_url=values.remote, git_root=project, pyproject_dir=project,
+    ))
+    monkeypatch.setattr(snapshot, 'metadata', SimpleNamespace(
+        version=lambda name: values.version, PackageNotFoundError=LookupError,
+    ))
+    return values
+
+
+def edit_pyproject(values):
+    """Change the pyproject.toml bytes without changing the configuration."""
+    with open('pyproject.toml', 'a', encoding='utf-8') as f:
+        f.write('# edited\n')
+
+
+@pytest.mark.parametrize('edit', [
+    edit_pyproject,
+    lambda values: setattr(values, 'registry', "registry-2"),
+    lambda values: setattr(values, 'remote', "https://github.com/fork/lab"),
+    lambda values: setattr(values, 'version', "1.1"),
+], ids=['pyproject', 'registry', 'remote', 'devx'])
+def test_every_input_invalidates_the_snapshot(inputs, edit):
+    key = _snapshot_key()
+    assert _snapshot_key() == key
+    edit(inputs)
+    assert _snapshot_key() != key
+
+
+def test_a_current_snapshot_skips_validation(inputs, monkeypatch):
+    validated = []
+
+    class CountedProject(snapshot.Project):
+        """A project that records its validation."""
+
+        def __init__(self, **values):
+            validated.append(True)
+            super().__init__(**values)
+
+    monkeypatch.setattr(snapshot, 'Project', CountedProject)
+    project, workspace, config = load_config()
+    assert SNAPSHOT_FILE.exists()
+
+    cached_project, cached_workspace, cached_config = load_config()
+    assert len(validated) == 1
+    assert cached_config == config
+    assert cached_project.name == project.name
+    assert cached_workspace.ports[0].port == workspace.ports[0].port
+
+    inputs.version = "1.1"
+    load_config()
+    assert len(validated) == 2
@@ -0,0 +1,74 @@
+"""Tests that the CLI starts without importing the configuration and compose machinery."""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ('pydantic', 'pydantic_settings', 'yaml', 'requests', 'dotenv')
+# seconds a command may take to import and run, the configuration machinery alone takes longer
+STARTUP_BUDGET = 0.25
+# runs the CLI in a fresh interpreter and prints how long it took and the top level packages it imported
+PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+from devx.cli import cli
+try:
+    cli(sys.argv[1:], prog_name="devx")
+except SystemExit:
+    pass
+packages = sorted({name.split(".")[0] for name in sys.modules})
+print(json.dumps({"seconds": time.perf_counter() - started, "packages": packages}), file=sys.stderr)
+'''
+# commands that only need the project root, run in a project that was never started so they touch no containers
+COMMANDS = [
+    ['--help'],
+    ['workshop', 'stop'],
+    ['workshop', 'status'],
+    ['workshop', 'tenants'],
+]
+
+
+def probe(*args: str, cwd=None) -> dict:
+    """Run the CLI with arguments in a fresh interpreter, timing it and listing the packages it imported."""
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE, *args], capture_output=True, text=True, check=True, cwd=cwd
+    )
+    return json.loads(result.stderr.strip().splitlines()[-1])
+
+
+def imported_packages(*args: str, cwd=None) -> set[str]:
+    """Run the CLI with arguments in a fresh interpreter and list the packages it imported."""
+    return set(probe(*args, cwd=cwd)['packages'])
+
+
+@pytest.fixture
+def workshop(project):
+    """Run in a project that was never synced or started."""
+    (project / 'pyproject.toml').write_text('[project]\nname = "lab"\n', encoding='utf-8')
+    return project
+
+
+@pytest.mark.parametrize("args", [
+    ['--help'],
+    ['workshop', '--help'],
+    ['workshop', 'test', '--help'],
+    ['devel', '--help'],
+    ['publish', '--help'],
+    ['labs', '--help'],
+])
+def test_help_does_not_import_heavy_modules(args):
+    assert not imported_packages(*args) & set(HEAVY_MODULES)
+
+
+@pytest.mark.parametrize("args", COMMANDS)
+def test_commands_do_not_import_heavy_modules(workshop, args):
+    assert not imported_packages(*args, cwd=workshop) & set(HEAVY_MODULES)
+
+
+@pytest.mark.parametrize("args", COMMANDS)
+def test_commands_start_within_budget(workshop, args):
+    # the fastest of a few runs, so a busy machine does not fail the budget
+    seconds = min(probe(*args, cwd=workshop)['seconds'] for _ in range(3))
+    assert seconds < STARTUP_BUDGET, f"devx {' '.join(args)} took {seconds:.2f}s, the budget is {STARTUP_BUDGET}s"
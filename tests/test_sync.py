@@ -0,0 +1,132 @@
+"""Tests for synchronizing the generated compose files with their inputs."""
+
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from devx import sync, workspaces
+from devx.cli import cli
+from devx.constants import WHEELHOUSE_DIR
+from devx.models import BrevWorkspace, Project
+from devx.workspaces import _KNOWN_WORKSPACES, WorkspaceCollection
+
+TEMPLATE_DIR = Path(__file__).parents[1] / 'templates' / 'simple'
+PYPROJECT = """\
+[project]
+name = "lab"
+description = "Lab"
+repo_url = "https://github.com/org/lab"
+image_url = "ghcr.io/org/lab"
+
+[tool.brev]
+instance_type = "l40s-48gb.1x"
+cloud = "crusoe"
+relative_to_root = "."
+ports = [ { name = "jupyter", port = 8888 } ]
+"""
+COMPOSE = """\
+services:
+  db:
+    image: postgres
+"""
+
+
+@pytest.fixture
+def workshop(project, monkeypatch):
+    """Sync the template compose file for a single GPU instance, on a machine without GPUs."""
+    shutil.copy(TEMPLATE_DIR / 'compose.yaml', project / 'compose.yaml')
+    shutil.copy(TEMPLATE_DIR / 'variables.env', project / 'variables.env')
+    (project / 'pyproject.toml').write_text(PYPROJECT, encoding='utf-8')
+    collection = WorkspaceCollection(_KNOWN_WORKSPACES, [], project / 'workspaces.json')
+    monkeypatch.setattr(sync, 'WORKSPACES', collection)
+    monkeypatch.setattr(workspaces, 'WORKSPACES', collection)
+    monkeypatch.setattr(sync, 'host_gpu_count', lambda: None)
+    monkeypatch.setattr(sync, 'host_budget', lambda: None)
+    return project
+
+
+def load():
+    """Load the project and workspace configuration of the current directory."""
+    return BrevWorkspace(), Project()
+
+
+def manifest():
+    """Read the sync manifest."""
+    return json.loads(sync.MANIFEST_FILE.read_text(encoding='utf-8'))
+
+
+def outputs():
+    """Get the modification time of every generated file."""
+    paths = [sync.TARGET_LAUNCHABLE_FILE, sync.TARGET_LOCAL_FILE, sync.MANIFEST_FILE]
+    return {path: path.stat().st_mtime_ns for path in paths}
+
+
+def check_cli():
+    """Run `devx devel sync --check`."""
+    return CliRunner().invoke(cli, ['devel', 'sync', '--check'])
+
+
+def test_profiles_that_do_not_fit_fail_the_sync(workshop):
+    with pytest.raises(ValueError, match="profile dual-gpu needs 2 GPUs, profile quad-gpu needs 4 GPUs"):
+        sync.sync(*load())
+    assert not sync.TARGET_LAUNCHABLE_FILE.exists()
+    assert not sync.MANIFEST_FILE.exists()
+
+
+def test_gpu_override_is_kept_by_later_syncs(workshop, capsys):
+    sync.sync(*load(), gpus=4)
+    assert manifest()['gpus'] == 4
+    assert "quad-gpu" in sync.TARGET_LAUNCHABLE_FILE.read_text(encoding='utf-8')
+
+    capsys.readouterr()
+    sync.sync(*load())
+    assert "written" not in capsys.readouterr().out
+    assert sync.check(*load()) == []
+
+    with pytest.raises(ValueError, match="has 1 GPU"):
+        sync.sync(*load(), gpus=0)
+    assert manifest()['gpus'] == 4
+
+
+def test_an_unchanged_tree_writes_nothing(workshop, capsys):
+    (workshop / 'compose.yaml').write_text(COMPOSE, encoding='utf-8')
+    sync.sync(*load())
+    written = outputs()
+    capsys.readouterr()
+
+    sync.sync(*load())
+    assert "written" not in capsys.readouterr().out
+    assert outputs() == written
+    assert not WHEELHOUSE_DIR.exists()
+
+
+def test_the_host_is_only_probed_for_what_the_compose_file_uses(workshop, monkeypatch):
+    (workshop / 'compose.yaml').write_text(COMPOSE, encoding='utf-8')
+    monkeypatch.setattr(sync, 'host_gpu_count', lambda: pytest.fail("GPUs counted without GPU reservations"))
+    monkeypatch.setattr(sync, 'host_budget', lambda: pytest.fail("budget read without declared resources"))
+    sync.sync(*load())
+    assert sync.check(*load()) == []
+
+
+def test_check_exits_non_zero_on_drift(workshop):
+    (workshop / 'compose.yaml').write_text(COMPOSE, encoding='utf-8')
+    sync.sync(*load())
+    assert check_cli().exit_code == 0
+
+    (workshop / 'compose.yaml').write_text(COMPOSE.replace('postgres', 'postgres:17'), encoding='utf-8')
+    written = outputs()
+    result = check_cli()
+    assert result.exit_code == 1
+    assert f"❌ {sync.TARGET_LAUNCHABLE_FILE} is out of date (compose changed)" in result.output
+    assert outputs() == written
+
+
+def test_check_reports_edited_outputs(workshop):
+    (workshop / 'compose.yaml').write_text(COMPOSE, encoding='utf-8')
+    sync.sync(*load())
+    with open(sync.TARGET_LAUNCHABLE_FILE, 'a', encoding='utf-8') as f:
+        f.write('# edited\n')
+    assert sync.check(*load()) == [sync.TARGET_LAUNCHABLE_FILE]
@@ -0,0 +1,98 @@
+"""Tests for the host ports and compose definitions of workshop tenants."""
+
+from pathlib import Path
+
+import pytest
+
+from devx import tenants
+from devx.docker import DockerError
+from devx.tenants import Tenant, _remap_port, assign_ports, published_ports, tenant_compose, tenant_names
+
+COMPOSE = {
+    "services": {
+        "devx": {
+            "ports": ["8888:8888"],
+            "build": {"context": "../"},
+            "environment": {"COMPOSE_PROJECT_NAME": "workshop"},
+        },
+        "app": {
+            "container_name": "app",
+            "ports": ["127.0.0.1:8080:80", {"target": 53, "published": "5353", "protocol": "udp"}, "9000-9001:9000"],
+            "volumes": ["models:/models", "data:/data"],
+        },
+    },
+    "volumes": {"models": {"labels": {"devx.storage": "cache"}}, "data": None},
+}
+
+
+@pytest.fixture
+def busy(monkeypatch):
+    """Host ports used by other processes."""
+    ports: set[int] = set()
+    monkeypatch.setattr(tenants, '_is_free', lambda port: port not in ports)
+    return ports
+
+
+def test_published_ports_skip_ranges():
+    assert published_ports(COMPOSE) == {"devx:8888/tcp": 8888, "app:80/tcp": 8080, "app:53/udp": 5353}
+
+
+def test_ports_move_up_past_taken_and_busy_ports(busy):
+    busy.add(8890)
+    taken = {8888, 8080, 5353, 8889}
+    ports = assign_ports(COMPOSE, {}, taken)
+    assert ports == {"devx:8888/tcp": 8891, "app:80/tcp": 8081, "app:53/udp": 5354}
+    assert {8891, 8081, 5354} <= taken
+
+
+def test_recorded_ports_are_kept_unless_taken(busy):
+    recorded = {"devx:8888/tcp": 9999, "app:80/tcp": 8081}
+    ports = assign_ports(COMPOSE, recorded, {8888, 8080, 5353, 8081})
+    assert ports["devx:8888/tcp"] == 9999
+    assert ports["app:80/tcp"] == 8082
+
+
+def test_running_out_of_ports_raises(busy, monkeypatch):
+    monkeypatch.setattr(tenants, 'MAX_PORT', 8890)
+    busy.update({8889, 8890})
+    with pytest.raises(DockerError, match="No free host port left for devx:8888/tcp"):
+        assign_ports({"services": {"devx": {"ports": ["8888:8888"]}}}, {}, set())
+
+
+@pytest.mark.parametrize('port, expected', [
+    ("8888:8888", "18888:8888"),
+    ("127.0.0.1:8080:80", "127.0.0.1:18080:80"),
+    ("8080:80/tcp", "18080:80/tcp"),
+    ({"target": 53, "published": "5353", "protocol": "udp"}, {"target": 53, "published": "15353", "protocol": "udp"}),
+    ("9000-9001:9000", "9000"),
+    ("9000-9001:9000/udp", "9000/udp"),
+    ({"target": 80, "published": "8000-8001"}, {"target": 80}),
+    ("80", "80"),
+])
+def test_remap_port(port, expected):
+    ports = {"devx:8888/tcp": 18888, "devx:80/tcp": 18080, "devx:53/udp": 15353}
+    assert _remap_port(port, "devx", ports) == expected
+
+
+def test_tenant_compose_shares_the_image_and_cache_volumes():
+    tenant = Tenant("t1", "workshop-t1", Path("compose.yaml"), Path("."), {
+        "devx:8888/tcp": 8889, "app:80/tcp": 8081, "app:53/udp": 5354,
+    })
+    compose = tenant_compose(COMPOSE, tenant, "workshop", "workshop-devx:latest")
+
+    devx, app = compose["services"]["devx"], compose["services"]["app"]
+    assert devx["image"] == "workshop-devx:latest" and "build" not in devx
+    assert devx["environment"]["COMPOSE_PROJECT_NAME"] == "workshop-t1"
+    assert "container_name" not in app
+    assert app["ports"][0] == "127.0.0.1:8081:80"
+    assert compose["volumes"] == {
+        "models": {"labels": {"devx.storage": "cache"}, "name": "workshop_models"},
+        "data": None,
+    }
+    assert COMPOSE["services"]["devx"]["build"] == {"context": "../"}
+
+
+def test_tenant_names_are_validated():
+    assert tenant_names(2, ["t1", "demo"]) == ["t1", "t2", "demo"]
+    with pytest.raises(ValueError, match="Invalid tenant name"):
+        tenant_names(names=["Demo"])
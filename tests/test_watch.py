@@ -0,0 +1,76 @@
+"""Tests for applying edits of the workshop inputs to the running workshop."""
+
+import pytest
+
+from devx import run, watch
+from devx.watch import _apply, changed_services
+
+
+def compose(**services):
+    """Build a compiled compose definition."""
+    return {"services": services, "volumes": {}}
+
+
+@pytest.fixture
+def recreated(monkeypatch):
+    """Record the services recreated and removed, with the devx and db services running."""
+    calls = []
+    monkeypatch.setattr(watch, '_running_services', lambda: {'devx', 'db'})
+    monkeypatch.setattr(run, 'recreate', lambda services, removed: calls.append((services, removed)))
+    return calls
+
+
+def test_changed_services():
+    old = compose(devx={"image": "devx"}, db={"image": "postgres:16"}, cache={"image": "redis"})
+    new = compose(devx={"image": "devx"}, db={"image": "postgres:17"}, api={"image": "api"})
+    assert changed_services(old, new) == (['api', 'db'], ['cache'])
+    assert changed_services(new, new) == ([], [])
+
+
+def test_only_running_and_new_unprofiled_services_are_recreated(recreated, capsys):
+    old = compose(devx={}, db={}, nim={"profiles": ["nim"]}, old={})
+    new = compose(devx={}, db={"a": 1}, nim={"profiles": ["nim"], "a": 1}, api={}, gated={"profiles": ["nim"]})
+    _apply(old, new, *changed_services(old, new))
+
+    assert recreated == [(['api', 'db'], ['old'])]
+    assert "nim is not running" in capsys.readouterr().out
+
+
+def test_nothing_is_recreated_while_the_workshop_is_stopped(recreated, monkeypatch):
+    monkeypatch.setattr(watch, '_running_services', set)
+    _apply(compose(), compose(db={}), ['db'], [])
+    assert not recreated
+
+
+class ScriptedWatcher:
+    """A watcher that applies one edit per wait, and stops the watch once they are used up."""
+
+    def __init__(self, edits):
+        self._edits = list(edits)
+
+    def wait(self) -> set[str]:
+        """Apply the next edit."""
+        if not self._edits:
+            raise KeyboardInterrupt
+        self._edits.pop(0)()
+        return {'compose.yaml'}
+
+    def close(self) -> None:
+        """Stop watching."""
+
+
+def test_only_edits_that_change_content_are_applied(project, monkeypatch):
+    path = project / 'compose.yaml'
+    path.write_text('services: {}\n', encoding='utf-8')
+    old, new = compose(devx={}), compose(devx={}, db={})
+    applied = []
+    monkeypatch.setattr(watch, '_reload', lambda: (old, new))
+    monkeypatch.setattr(watch, '_apply', lambda *args: applied.append(args))
+    monkeypatch.setattr(watch, '_watcher', lambda directory, names, poll, interval: ScriptedWatcher([
+        lambda: path.write_text('services: {}\n', encoding='utf-8'),
+        lambda: path.write_text('services:\n  db: {}\n', encoding='utf-8'),
+    ]))
+
+    with pytest.raises(KeyboardInterrupt):
+        watch.watch()
+    assert applied == [(old, new, ['db'], [])]
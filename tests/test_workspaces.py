@@ -0,0 +1,71 @@
+"""Tests for the workspace group registry."""
+
+import pytest
+
+from devx.models import WorkspaceGroupConfig
+from devx.workspaces import WorkspaceCollection
+
+BUILTIN = [
+    WorkspaceGroupConfig(name="aws-550", provider="aws", nvidia_driver_version=550),
+    WorkspaceGroupConfig(name="aws-570", provider="aws", nvidia_driver_version=570),
+    WorkspaceGroupConfig(name="aws-unknown", provider="aws"),
+    WorkspaceGroupConfig(name="gcp-550", provider="gcp", nvidia_driver_version=550),
+]
+
+
+def registry(path, *groups):
+    """Write a registry file with the given `name, provider, driver` groups."""
+    path.write_text("".join(
+        f'[[workspace_groups]]\nname = "{name}"\nprovider = "{provider}"\nnvidia_driver_version = {driver}\n'
+        for name, provider, driver in groups
+    ), encoding='utf-8')
+    return path
+
+
+@pytest.fixture
+def files(project):
+    """The site and user registry files, and the cache file."""
+    return project / 'site.toml', project / 'user.toml', project / 'cache.json'
+
+
+def test_select_prefers_the_newest_compatible_driver(files):
+    groups = WorkspaceCollection(BUILTIN, [], files[2])
+    assert groups.select("aws").name == "aws-570"
+    assert groups.select("aws", [550, 570, 580]).name == "aws-570"
+    assert groups.select("aws", [535, 550]).name == "aws-550"
+    assert groups.select("aws", [535]).name == "aws-unknown"
+    assert groups.select("gcp", [570]) is None
+    assert groups.select("azure") is None
+
+
+def test_user_registry_overrides_the_site_registry(files):
+    site, user, cache = files
+    registry(site, ("aws-570", "aws", 560), ("site-only", "gcp", 570))
+    registry(user, ("aws-570", "aws", 580), ("user-only", "aws", 590))
+    groups = WorkspaceCollection(BUILTIN, [site, user], cache)
+
+    assert [group.name for group in groups] == [
+        "aws-550", "aws-unknown", "gcp-550", "site-only", "aws-570", "user-only",
+    ]
+    assert groups.query_name("aws-570").nvidia_driver_version == 580
+    assert groups.select("aws", [580]).name == "aws-570"
+    assert groups.driver_versions("gcp") == [550, 570]
+    assert cache.exists()
+
+
+def test_edited_registries_rebuild_the_cache(files):
+    site, user, cache = files
+    registry(user, ("user-only", "aws", 590))
+    assert WorkspaceCollection(BUILTIN, [site, user], cache).query_name("user-only")
+
+    registry(user, ("renamed", "aws", 590))
+    groups = WorkspaceCollection(BUILTIN, [site, user], cache)
+    assert groups.query_name("user-only") is None
+    assert groups.query_name("renamed")
+
+
+def test_invalid_registries_are_reported(files):
+    site, user, cache = files
+    site.write_text("[[workspace_groups]\n", encoding='utf-8')
+    with pytest.raises(ValueError, match="Could not read workspace registry"):
+        len(WorkspaceCollection(BUILTIN, [site, user], cache))